@@ -24,6 +24,7 @@ export default function App() {
     homeActions,
     allActions,
     scoreTimeline,
+    scoreSeries,
     awayPlayerTimeline,
     homePlayerTimeline,
     numQs,
@@ -77,6 +78,7 @@ export default function App() {
           homePlayers={homeActions}
           allActions={allActions}
           scoreTimeline={scoreTimeline}
+          scoreSeries={scoreSeries}
           awayPlayerTimeline={awayPlayerTimeline}
           homePlayerTimeline={homePlayerTimeline}
           numQs={numQs}
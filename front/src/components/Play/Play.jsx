@@ -35,6 +35,7 @@ export default function Play({
   homePlayers, 
   allActions, 
   scoreTimeline, 
+  scoreSeries,
   awayPlayerTimeline, 
   homePlayerTimeline, 
   numQs, 
@@ -64,6 +65,7 @@ export default function Play({
       homePlayers,
       allActions,
       scoreTimeline,
+      scoreSeries,
       awayPlayerTimeline,
       homePlayerTimeline,
       numQs,
@@ -78,6 +80,7 @@ export default function Play({
     homePlayers,
     allActions,
     scoreTimeline,
+    scoreSeries,
     awayPlayerTimeline,
     homePlayerTimeline,
     numQs,
@@ -94,6 +97,7 @@ export default function Play({
       homePlayers,
       allActions,
       scoreTimeline,
+      scoreSeries,
       awayPlayerTimeline,
       homePlayerTimeline,
       numQs,
@@ -107,6 +111,7 @@ export default function Play({
     homePlayers: displayHomePlayers,
     allActions: displayAllActions,
     scoreTimeline: displayScoreTimeline,
+    scoreSeries: displayScoreSeries,
     awayPlayerTimeline: displayAwayPlayerTimeline,
     homePlayerTimeline: displayHomePlayerTimeline,
     numQs: displayNumQs,
@@ -275,6 +280,7 @@ export default function Play({
           
           <ScoreGraph 
             scoreTimeline={displayScoreTimeline}
+            scoreSeries={displayScoreSeries}
             lastAction={displayLastAction}
             width={width}
             leftMargin={leftMargin}
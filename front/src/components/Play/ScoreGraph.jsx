@@ -1,8 +1,51 @@
 import { useMemo } from 'react';
 import { timeToSeconds } from '../../helpers/utils';
 
+// Closest two drawn points may sit, in px, before a coarser level is used.
+const MIN_POINT_SPACING_PX = 3;
+
+function secondsFromStart(period, clock) {
+  const secondsRemaining = timeToSeconds(clock);
+  if (period <= 4) {
+    // Regulation: Periods 1-4
+    return (period - 1) * 12 * 60 + 12 * 60 - secondsRemaining;
+  }
+  // Overtime: Periods 5+
+  return 4 * 12 * 60 + 5 * (period - 4) * 60 - secondsRemaining;
+}
+
+/**
+ * [[secondsFromStart, away - home], ...] to draw at this width. Uses the
+ * poller's scoreSeries (see build_score_series in playbyplay_processing.py)
+ * when present: the exact series if its points fit MIN_POINT_SPACING_PX
+ * apart, otherwise the finest bucketed level whose buckets are that wide,
+ * drawn with each bucket's lead so the peaks survive.
+ */
+function graphPoints(scoreTimeline, scoreSeries, pxPerSecond) {
+  if (!scoreSeries) {
+    return (scoreTimeline || []).map((t) => [
+      secondsFromStart(t.period, t.clock),
+      Number(t.away) - Number(t.home),
+    ]);
+  }
+  const { t, away, home, levels = [] } = scoreSeries;
+  const drawWidth = pxPerSecond * scoreSeries.lastSecond;
+  const level = t.length * MIN_POINT_SPACING_PX <= drawWidth
+    ? null
+    : levels.find((l) => l.bucket * pxPerSecond >= MIN_POINT_SPACING_PX) || levels[levels.length - 1];
+  if (!level) {
+    return t.map((second, i) => [second, away[i] - home[i]]);
+  }
+  const points = level.lead.map((lead, i) => [i * level.bucket, lead]);
+  // End on the real margin rather than the last bucket's peak.
+  const last = level.margin.length - 1;
+  if (last >= 0) points.push([scoreSeries.lastSecond, level.margin[last]]);
+  return points;
+}
+
 export default function ScoreGraph({ 
   scoreTimeline, 
+  scoreSeries,
   lastAction,
   width, 
   leftMargin, 
@@ -14,7 +57,8 @@ export default function ScoreGraph({
 }) {
 
   const { pospoints, negpoints } = useMemo(() => {
-    if (!scoreTimeline || scoreTimeline.length === 0) {
+    const points = graphPoints(scoreTimeline, scoreSeries, (qWidth * 4) / (4 * 12 * 60));
+    if (points.length === 0) {
       return { pospoints: '', negpoints: '' };
     }
 
@@ -25,22 +69,9 @@ export default function ScoreGraph({
     let negpointsArr = [`${leftMargin},300`];
     let pos = true; // Tracks if we are currently in positive (Away lead) territory
 
-    scoreTimeline.forEach((t) => {
-      const scoreDiff = Number(t.away) - Number(t.home);
-
-      // Calculate X based on period and clock
-      let x2;
-      const secondsRemaining = timeToSeconds(t.clock);
-      
-      if (t.period <= 4) {
-        // Regulation: Periods 1-4
-        const secondsPassed = (t.period - 1) * 12 * 60 + 12 * 60 - secondsRemaining;
-        x2 = (secondsPassed / (4 * 12 * 60)) * (qWidth * 4);
-      } else {
-        // Overtime: Periods 5+
-        const secondsPassed = 4 * 12 * 60 + 5 * (t.period - 4) * 60 - secondsRemaining;
-        x2 = (secondsPassed / (4 * 12 * 60)) * (qWidth * 4);
-      }
+    points.forEach(([secondsPassed, scoreDiff]) => {
+      // Calculate X based on elapsed game time
+      const x2 = (secondsPassed / (4 * 12 * 60)) * (qWidth * 4);
 
       let y1 = starty;
       // Calculate Y based on score differential, scaled to max lead
@@ -82,14 +113,7 @@ export default function ScoreGraph({
 
     // Close the shape at the last recorded action
     if (lastAction) {
-      const secondsRemaining = timeToSeconds(lastAction.clock);
-      let lastX;
-      
-      if (lastAction.period <= 4) {
-        lastX = (((lastAction.period - 1) * 12 * 60 + 12 * 60 - secondsRemaining) / (4 * 12 * 60)) * (qWidth * 4);
-      } else {
-        lastX = ((4 * 12 * 60 + 5 * (lastAction.period - 4) * 60 - secondsRemaining) / (4 * 12 * 60)) * (qWidth * 4);
-      }
+      const lastX = (secondsFromStart(lastAction.period, lastAction.clock) / (4 * 12 * 60)) * (qWidth * 4);
 
       // Extend the graph to the final second
       if (pos) {
@@ -108,7 +132,7 @@ export default function ScoreGraph({
       pospoints: pospointsArr.join(' '), 
       negpoints: negpointsArr.join(' ') 
     };
-  }, [scoreTimeline, lastAction, width, leftMargin, qWidth, maxY]);
+  }, [scoreTimeline, scoreSeries, lastAction, width, leftMargin, qWidth, maxY]);
 
   if (!showScoreDiff) {
     return null;
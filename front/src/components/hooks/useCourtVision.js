@@ -49,12 +49,15 @@ export function useCourtVision() {
     fetchBoth,
     fetchPlayByPlay,
     fetchBox,
+    applyPlayByPlayPatch,
+    applyBoxPatch,
     resetLoadingStates,
   } = useGameData();
 
   // === PROCESSED TIMELINES ===
   const {
     scoreTimeline,
+    scoreSeries,
     homePlayerTimeline,
     awayPlayerTimeline,
     allActions,
@@ -87,15 +90,18 @@ export function useCourtVision() {
   });
 
   // === WEBSOCKET HANDLERS ===
-  const handlePlayByPlayUpdate = useCallback((key, version) => {
+  // Prefer the delta carried by the update; fall back to refetching the whole object
+  const handlePlayByPlayUpdate = useCallback(async (key, version, update) => {
+    if (await applyPlayByPlayPatch(update)) return;
     const url = `${PREFIX}/${encodeURIComponent(key)}?v=${version}`;
     fetchPlayByPlay(url, gameIdRef.current, () => wsCloseRef.current());
-  }, [fetchPlayByPlay]);
+  }, [fetchPlayByPlay, applyPlayByPlayPatch]);
 
-  const handleBoxUpdate = useCallback((key, version) => {
+  const handleBoxUpdate = useCallback(async (key, version, update) => {
+    if (await applyBoxPatch(update)) return;
     const url = `${PREFIX}/${encodeURIComponent(key)}?v=${version}`;
     fetchBox(url);
-  }, [fetchBox]);
+  }, [fetchBox, applyBoxPatch]);
 
   const handleDateUpdate = useCallback((data, scheduleDate) => {
     setGames(data);
@@ -206,6 +212,7 @@ export function useCourtVision() {
     homeActions,
     allActions,
     scoreTimeline,
+    scoreSeries,
     awayPlayerTimeline,
     homePlayerTimeline,
     numQs,
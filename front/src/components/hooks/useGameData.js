@@ -1,6 +1,7 @@
 import { useState, useRef, useCallback } from 'react';
 import { PREFIX } from '../../environment';
 import { GAME_NOT_STARTED_MESSAGE } from '../../helpers/gameSelectionUtils';
+import { applyPatch, canApplyPatch, loadPatch } from '../../helpers/patches';
 
 /**
  * Hook for fetching and managing game data (box score and play-by-play)
@@ -18,9 +19,11 @@ export function useGameData() {
   const [isPlayLoading, setIsPlayLoading] = useState(true);
   
   const latestBoxRef = useRef(box);
+  const latestPlayRef = useRef(playByPlay);
 
   // Keep refs in sync
   latestBoxRef.current = box;
+  latestPlayRef.current = playByPlay;
 
   /**
    * Fetch both box score and play-by-play data for a game
@@ -169,6 +172,53 @@ export function useGameData() {
     }
   }, []);
 
+  /**
+   * Apply a WS delta to the play-by-play payload we hold.
+   * Resolves false when the update can't be applied (caller should refetch the full object).
+   */
+  const applyPlayByPlayPatch = useCallback(async (update) => {
+    const current = latestPlayRef.current;
+    if (!canApplyPatch(current, update)) return false;
+
+    try {
+      const patch = await loadPatch(update);
+      if (latestPlayRef.current !== current) return false;
+      const next = { ...applyPatch(current, patch.ops), contentVersion: update.contentVersion };
+      const last = next?.lastAction ?? null;
+      // End-of-game handling (final box refetch, WS close) lives in the full fetch path.
+      if (last?.status?.trim().startsWith('Final')) return false;
+
+      latestPlayRef.current = next;
+      setNumQs(next?.numPeriods ?? 4);
+      setLastAction(last);
+      setPlayByPlay(next);
+      return true;
+    } catch (err) {
+      console.error('Error applying play-by-play patch:', err);
+      return false;
+    }
+  }, []);
+
+  /**
+   * Apply a WS delta to the box score we hold. Resolves false when a full refetch is needed.
+   */
+  const applyBoxPatch = useCallback(async (update) => {
+    const current = latestBoxRef.current;
+    if (!canApplyPatch(current, update)) return false;
+
+    try {
+      const patch = await loadPatch(update);
+      if (latestBoxRef.current !== current) return false;
+      const next = { ...applyPatch(current, patch.ops), contentVersion: update.contentVersion };
+      latestBoxRef.current = next;
+      setBox(next);
+      return true;
+    } catch (err) {
+      console.error('Error applying box score patch:', err);
+      return false;
+    }
+  }, []);
+
   /**
    * Reset loading states when game changes
    */
@@ -196,6 +246,8 @@ export function useGameData() {
     fetchBoth,
     fetchPlayByPlay,
     fetchBox,
+    applyPlayByPlayPatch,
+    applyBoxPatch,
     resetLoadingStates,
   };
 }
@@ -1,5 +1,13 @@
 import { useMemo } from 'react';
 import { timeToSeconds } from '../../helpers/utils';
+import { decodePlayByPlayV2 } from '../../helpers/playByPlayV2';
+
+function normalizePlayByPlay(data) {
+  if (data && typeof data === 'object' && data.schemaVersion === 2 && data.rows) {
+    return decodePlayByPlayV2(data);
+  }
+  return data;
+}
 
 function isProcessedPlayByPlayPayload(data) {
   return (
@@ -62,7 +70,7 @@ function filterPlayerActions(playerMap, statOn) {
  * Hook for transforming raw play-by-play data into UI-ready timelines and actions.
  * Extracts heavy data processing logic from the view component.
  * 
- * @param {Array|Object} playByPlay - Raw play-by-play array OR pre-processed payload from S3
+ * @param {Array|Object} playByPlay - Raw play-by-play array OR pre-processed payload from S3 (schemaVersion 1 or 2)
  * @param {number|null} homeTeamId - ID of the home team
  * @param {number|null} awayTeamId - ID of the away team
  * @param {Object|null} lastAction - The last action in the play-by-play data
@@ -71,9 +79,11 @@ function filterPlayerActions(playerMap, statOn) {
  */
 export function useGameTimeline(playByPlay, homeTeamId, awayTeamId, lastAction, statOn) {
   return useMemo(() => {
-    if (!isProcessedPlayByPlayPayload(playByPlay)) {
+    const payload = normalizePlayByPlay(playByPlay);
+    if (!isProcessedPlayByPlayPayload(payload)) {
       return {
         scoreTimeline: [],
+        scoreSeries: null,
         homePlayerTimeline: {},
         awayPlayerTimeline: {},
         allActions: [],
@@ -82,14 +92,15 @@ export function useGameTimeline(playByPlay, homeTeamId, awayTeamId, lastAction,
       };
     }
 
-    const allActions = playByPlay.allActions || buildAllActionsFromPlayers(playByPlay.awayActions, playByPlay.homeActions);
+    const allActions = payload.allActions || buildAllActionsFromPlayers(payload.awayActions, payload.homeActions);
     return {
-      scoreTimeline: playByPlay.scoreTimeline || [],
-      homePlayerTimeline: playByPlay.homePlayerTimeline || {},
-      awayPlayerTimeline: playByPlay.awayPlayerTimeline || {},
+      scoreTimeline: payload.scoreTimeline || [],
+      scoreSeries: payload.scoreSeries || null,
+      homePlayerTimeline: payload.homePlayerTimeline || {},
+      awayPlayerTimeline: payload.awayPlayerTimeline || {},
       allActions,
-      awayActions: filterPlayerActions(playByPlay.awayActions, statOn),
-      homeActions: filterPlayerActions(playByPlay.homeActions, statOn),
+      awayActions: filterPlayerActions(payload.awayActions, statOn),
+      homeActions: filterPlayerActions(payload.homeActions, statOn),
     };
   }, [playByPlay, statOn]);
 }
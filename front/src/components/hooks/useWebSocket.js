@@ -54,12 +54,20 @@ export function useWebSocket({
       }
     
       try {
-        if (msg.key?.includes("playByPlayData")) {
-          onPlayByPlayUpdate?.(msg.key, msg.version);
-        } else if (msg.key?.includes("boxData")) {
-          onBoxUpdate?.(msg.key, msg.version);
-        } else if (msg.type === "date") {
+        if (msg.type === "date") {
           onDateUpdate?.(msg.data, msg.date);
+          return;
+        }
+        // Game updates arrive flat, or combined as `updates` when several objects changed together
+        const updates = msg.updates
+          ? msg.updates.map((update) => ({ gameId: msg.gameId, ...update }))
+          : [msg];
+        for (const update of updates) {
+          if (update.key?.includes("playByPlayData")) {
+            onPlayByPlayUpdate?.(update.key, update.version, update);
+          } else if (update.key?.includes("boxData")) {
+            onBoxUpdate?.(update.key, update.version, update);
+          }
         }
       } catch (err) {
         console.error("Error handling WS message", msg, err);
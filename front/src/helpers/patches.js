@@ -0,0 +1,86 @@
+/**
+ * Client side of the poller's JSON deltas (see functions/nba-game-poller/nba_game_poller/patches.py).
+ *
+ * Ops:
+ *   { op: 'set', path, value }             replace (or add) the value at path
+ *   { op: 'append', path, from, values }   extend the array at path, which must have length `from`
+ *   { op: 'remove', path }                 delete an object key
+ */
+
+import { PREFIX } from '../environment';
+
+/**
+ * True when `update` carries a delta whose base is the version we currently hold
+ */
+export function canApplyPatch(doc, update) {
+  if (!doc || typeof doc !== 'object' || !doc.contentVersion) return false;
+  if (!update?.baseVersion || !update?.contentVersion) return false;
+  if (!update.patch && !update.patchKey) return false;
+  return doc.contentVersion === update.baseVersion;
+}
+
+/**
+ * Resolve the patch for a WS update: inline, or fetched by key when it was too large to inline
+ */
+export async function loadPatch(update) {
+  if (update.patch) return update.patch;
+  const res = await fetch(`${PREFIX}/${encodeURIComponent(update.patchKey)}`);
+  if (!res.ok) throw new Error(`Patch fetch failed: ${res.status}`);
+  return res.json();
+}
+
+function copyContainer(value) {
+  return Array.isArray(value) ? value.slice() : { ...value };
+}
+
+/**
+ * Apply ops without mutating `doc`; only containers along each op's path are copied,
+ * so untouched branches keep their identity (and React memoization keeps working).
+ * Throws if an op doesn't fit the document.
+ */
+export function applyPatch(doc, ops) {
+  let root = doc;
+  const copied = new Set();
+
+  const writable = (value) => {
+    if (copied.has(value)) return value;
+    const copy = copyContainer(value);
+    copied.add(copy);
+    return copy;
+  };
+
+  for (const op of ops || []) {
+    const path = op.path || [];
+    if (op.op === 'set' && path.length === 0) {
+      root = op.value;
+      continue;
+    }
+
+    root = writable(root);
+    let parent = root;
+    const depth = op.op === 'append' ? path.length : path.length - 1;
+    for (let i = 0; i < depth; i += 1) {
+      const child = parent[path[i]];
+      if (child === null || typeof child !== 'object') {
+        throw new Error(`Patch path not found: ${path.join('.')}`);
+      }
+      parent[path[i]] = writable(child);
+      parent = parent[path[i]];
+    }
+
+    if (op.op === 'append') {
+      if (!Array.isArray(parent) || parent.length !== op.from) {
+        throw new Error(`Patch append base mismatch: ${path.join('.')}`);
+      }
+      parent.push(...op.values);
+    } else if (op.op === 'set') {
+      parent[path[path.length - 1]] = op.value;
+    } else if (op.op === 'remove') {
+      delete parent[path[path.length - 1]];
+    } else {
+      throw new Error(`Unknown patch op: ${op.op}`);
+    }
+  }
+
+  return root;
+}
@@ -0,0 +1,116 @@
+/**
+ * Client side of the columnar play-by-play payload, schemaVersion 2
+ * (see functions/nba-game-poller/nba_game_poller/playbyplay_columnar.py).
+ *
+ * Expands it back to the schemaVersion 1 shape the timeline hooks consume. Every
+ * list that refers to the same row shares one action object.
+ */
+
+const DICT_COLUMNS = new Set([
+  'personId',
+  'teamId',
+  'actionType',
+  'subType',
+  'descriptor',
+  'qualifiers',
+  'playerName',
+  'playerNameI',
+  'teamTricode',
+  'shotResult',
+  'location',
+  'area',
+  'areaDetail',
+  'side',
+]);
+const CLOCK_COLUMNS = new Set(['clock']);
+const DELTA_COLUMNS = new Set(['actionNumber', 'actionId', 'orderNumber']);
+
+const decoded = new WeakMap();
+
+export function secondsToClock(seconds) {
+  const hundredths = Math.round(seconds * 100);
+  const minutes = Math.floor(hundredths / 6000);
+  const secs = ((hundredths % 6000) / 100).toFixed(2).padStart(5, '0');
+  return `PT${String(minutes).padStart(2, '0')}M${secs}S`;
+}
+
+function decodeClock(value) {
+  return typeof value === 'number' ? secondsToClock(value) : value;
+}
+
+function decodeRows(table) {
+  const columns = table?.columns || {};
+  const dicts = table?.dicts || {};
+  const rows = Array.from({ length: table?.count || 0 }, () => ({}));
+  Object.entries(columns).forEach(([key, column]) => {
+    let lastInt = 0;
+    column.forEach((raw, row) => {
+      if (raw === null || raw === undefined) return;
+      let value = raw;
+      if (CLOCK_COLUMNS.has(key)) {
+        value = decodeClock(raw);
+      } else if (DELTA_COLUMNS.has(key) && Number.isInteger(raw)) {
+        lastInt += raw;
+        value = lastInt;
+      } else if (DICT_COLUMNS.has(key)) {
+        value = dicts[key][raw];
+      }
+      rows[row][key] = value;
+    });
+  });
+  return rows;
+}
+
+function decodePlaytimes(flat) {
+  return Object.fromEntries(
+    Object.entries(flat || {}).map(([name, values]) => {
+      const stints = [];
+      for (let i = 0; i < values.length; i += 3) {
+        const stint = { start: decodeClock(values[i + 1]), period: values[i] };
+        if (values[i + 2] !== null) stint.end = decodeClock(values[i + 2]);
+        stints.push(stint);
+      }
+      return [name, stints];
+    })
+  );
+}
+
+/**
+ * Expand a schemaVersion 2 payload to schemaVersion 1. Memoized per payload object.
+ */
+export function decodePlayByPlayV2(payload) {
+  if (decoded.has(payload)) return decoded.get(payload);
+
+  const rows = decodeRows(payload.rows);
+  const pick = (indices) => (indices || []).map((i) => rows[i]);
+  const pickMap = (map) =>
+    Object.fromEntries(Object.entries(map || {}).map(([name, indices]) => [name, pick(indices)]));
+
+  const timeline = payload.scoreTimeline || {};
+  const away = timeline.away || [];
+  const result = {
+    schemaVersion: 1,
+    gameId: payload.gameId,
+    generatedAt: payload.generatedAt,
+    awayTeamId: payload.awayTeamId,
+    homeTeamId: payload.homeTeamId,
+    numPeriods: payload.numPeriods,
+    lastAction: payload.lastAction,
+    scoreTimeline: away.map((awayScore, i) => ({
+      away: awayScore,
+      home: timeline.home[i],
+      clock: decodeClock(timeline.clock[i]),
+      period: timeline.period[i],
+    })),
+    awayActions: pickMap(payload.awayActions),
+    homeActions: pickMap(payload.homeActions),
+    awayPlayerTimeline: decodePlaytimes(payload.awayPlayerTimeline),
+    homePlayerTimeline: decodePlaytimes(payload.homePlayerTimeline),
+  };
+  if (payload.scoreSeries) result.scoreSeries = payload.scoreSeries;
+  if (payload.allActions) result.allActions = pick(payload.allActions);
+  if (payload.actions) result.actions = pick(payload.actions);
+
+  decoded.set(payload, result);
+  return result;
+}
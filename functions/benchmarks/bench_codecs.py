@@ -0,0 +1,162 @@
+"""
+Compression ratio, encode time and decode time per payload codec.
+
+    python functions/benchmarks/bench_codecs.py [--corpus DIR] [--repeat N] [--json]
+    python functions/benchmarks/bench_codecs.py --corpus DIR --train-dict out.dict
+
+The corpus is a directory of recorded games: raw play-by-play feeds (an action
+list, or {"actions": [...]}) or box score JSON. Each feed is benchmarked as
+stored and as the processed v1 and v2 payloads the poller publishes.
+
+zstd rows are only reported when compression.zstd is available. Dictionary rows
+are trained leave-one-out, so each game is compressed with a dictionary built
+from the other games. They need a corpus of at least two games.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../nba-game-poller")))
+
+from nba_game_poller.payload_codecs import GzipCodec, ZstdCodec, train_zstd_dictionary, zstd_available  # noqa: E402
+from nba_game_poller.playbyplay_columnar import encode_playbyplay_v2  # noqa: E402
+from nba_game_poller.playbyplay_processing import infer_team_ids_from_actions, process_playbyplay_payload  # noqa: E402
+
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "../tests/fixtures")
+
+
+def load_corpus(directory):
+    """{game name: {variant: encoded JSON bytes}}"""
+    corpus = {}
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), "r", encoding="utf-8") as f:
+            doc = json.load(f)
+        variants = {"raw": json.dumps(doc).encode("utf-8")}
+        actions = doc.get("actions") if isinstance(doc, dict) else doc
+        if isinstance(actions, list) and actions:
+            away_team_id, home_team_id = infer_team_ids_from_actions(actions)
+            if away_team_id and home_team_id:
+                v1 = process_playbyplay_payload(
+                    game_id=name[: -len(".json")],
+                    actions=actions,
+                    away_team_id=away_team_id,
+                    home_team_id=home_team_id,
+                    include_actions=False,
+                    include_all_actions=False,
+                )
+                variants["pbp-v1"] = json.dumps(v1).encode("utf-8")
+                variants["pbp-v2"] = json.dumps(encode_playbyplay_v2(v1, actions)).encode("utf-8")
+        corpus[name] = variants
+    return corpus
+
+
+def codec_factories():
+    factories = {
+        "gzip-6": lambda _dictionary: GzipCodec(level=6),
+        "gzip-9": lambda _dictionary: GzipCodec(level=9),
+    }
+    if zstd_available():
+        for level in (3, 9, 19):
+            factories[f"zstd-{level}"] = lambda _dictionary, level=level: ZstdCodec(level=level)
+            factories[f"zstd-{level}+dict"] = lambda dictionary, level=level: (
+                ZstdCodec(level=level, dictionary=dictionary) if dictionary is not None else None
+            )
+    return factories
+
+
+def _timed(fn, arg, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(arg)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return out, statistics.median(samples)
+
+
+def run(corpus, repeat=5):
+    """One result row per (codec, variant), aggregated over the corpus."""
+    totals = {}
+    for game, variants in corpus.items():
+        dictionaries = {}
+        if zstd_available() and len(corpus) > 1:
+            for variant in variants:
+                samples = [v[variant] for g, v in corpus.items() if g != game and variant in v]
+                if samples:
+                    dictionaries[variant] = train_zstd_dictionary(samples)
+
+        for codec_name, factory in codec_factories().items():
+            for variant, data in variants.items():
+                codec = factory(dictionaries.get(variant))
+                if codec is None:
+                    continue
+                compressed, encode_ms = _timed(codec.compress, data, repeat)
+                restored, decode_ms = _timed(codec.decompress, compressed, repeat)
+                assert restored == data, f"{codec_name} did not round-trip {game} {variant}"
+                row = totals.setdefault((codec_name, variant), {"raw": 0, "compressed": 0, "encodeMs": 0.0, "decodeMs": 0.0})
+                row["raw"] += len(data)
+                row["compressed"] += len(compressed)
+                row["encodeMs"] += encode_ms
+                row["decodeMs"] += decode_ms
+
+    return [
+        {
+            "codec": codec_name,
+            "variant": variant,
+            "games": len(corpus),
+            **row,
+            "ratio": round(row["raw"] / row["compressed"], 2),
+            "encodeMs": round(row["encodeMs"], 2),
+            "decodeMs": round(row["decodeMs"], 2),
+        }
+        for (codec_name, variant), row in totals.items()
+    ]
+
+
+def print_table(results):
+    print(f"{'codec':<16}{'variant':<9}{'raw':>11}{'compressed':>12}{'ratio':>8}{'encode ms':>11}{'decode ms':>11}")
+    for r in sorted(results, key=lambda r: (r["variant"], r["compressed"])):
+        print(
+            f"{r['codec']:<16}{r['variant']:<9}{r['raw']:>11}{r['compressed']:>12}"
+            f"{r['ratio']:>8.2f}{r['encodeMs']:>11.2f}{r['decodeMs']:>11.2f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="directory of recorded game JSON files")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repetitions per measurement (median is reported)")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--train-dict", metavar="PATH", help="train a zstd dictionary on the whole corpus and write it to PATH")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error(f"no .json games in {args.corpus}")
+
+    if args.train_dict:
+        if not zstd_available():
+            parser.error("--train-dict needs compression.zstd (Python 3.14+)")
+        samples = [data for variants in corpus.values() for data in variants.values()]
+        dictionary = train_zstd_dictionary(samples)
+        with open(args.train_dict, "wb") as f:
+            f.write(dictionary.dict_content)
+        print(f"Wrote dictionary {dictionary.dict_id} ({len(dictionary.dict_content)} bytes) to {args.train_dict}")
+        return
+
+    if not zstd_available():
+        print("compression.zstd unavailable: reporting gzip only", file=sys.stderr)
+    results = run(corpus, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Cold-start cost per Lambda task: handler import, first invocation, warm invocation.
+
+    python functions/benchmarks/bench_cold_start.py [--repeat N] [--json]
+
+Every sample starts fresh interpreters, as a new Lambda container would. One
+times `import boto3` (the runtime's share) and then the handler module import.
+Another loads the handler under moto and invokes it twice: the first call is
+the rest of the cold start, the second a warm invocation. Both record which
+AWS clients were built along the way.
+
+moto answers in-process, so the invocation times leave out round trips to
+AWS. What remains is client construction and the handler's own work.
+"""
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+BUCKET = "bench-data"
+GAMES_TABLE = "NBA_Games"
+CONN_TABLE = "GameConnections"
+RULE_NAME = "bench-poller-rule"
+GAME_ID = "0022400001"
+
+ENV = {
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "AWS_REGION": "us-east-1",
+    "DATA_BUCKET": BUCKET,
+    "DDB_TABLE": GAMES_TABLE,
+    "POLLER_RULE_NAME": RULE_NAME,
+    "LAMBDA_ARN": "arn:aws:lambda:us-east-1:123456789012:function:bench",
+    "SCHEDULER_ROLE_ARN": "arn:aws:iam::123456789012:role/bench",
+    "CONN_TABLE": CONN_TABLE,
+    "WS_API_ENDPOINT": "https://bench.execute-api.us-east-1.amazonaws.com/production",
+}
+
+# name: (handler file, handler function, what the invocation exercises)
+SCENARIOS = {
+    "poller": ("nba-game-poller", "main_handler", "poller task on a day with no games left (query, disable rule)"),
+    "manager": ("nba-game-poller", "main_handler", "manager task scheduling the kickoff"),
+    "enable_poller": ("nba-game-poller", "main_handler", "kickoff task enabling the poller rule"),
+    "send_unwatched": ("ws-sendGameUpdate-handler", "handler", "S3 event for a game nobody is watching"),
+    "send_watched": ("ws-sendGameUpdate-handler", "handler", "S3 event for a game with one subscriber"),
+}
+FIELDS = ("boto3ImportMs", "importMs", "firstInvokeMs", "coldStartMs", "warmInvokeMs")
+
+
+def _ms(start):
+    return (time.perf_counter() - start) * 1000.0
+
+
+def _load(name):
+    path = os.path.join(ROOT, SCENARIOS[name][0], "lambda_function.py")
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _track_clients():
+    """Service names of the botocore clients built from here on (resources build one too)."""
+    import botocore.session
+
+    built = []
+    create_client = botocore.session.Session.create_client
+
+    def tracking(self, service_name, *args, **kwargs):
+        built.append(service_name)
+        return create_client(self, service_name, *args, **kwargs)
+
+    botocore.session.Session.create_client = tracking
+    return built
+
+
+def _setup(name, module):
+    """Creates what the scenario's invocation reads. Returns its event."""
+    import boto3
+
+    boto3.client("events").put_rule(Name=RULE_NAME, ScheduleExpression="rate(1 minute)")
+    s3 = boto3.client("s3")
+    s3.create_bucket(Bucket=BUCKET)
+    dynamodb = boto3.resource("dynamodb")
+    dynamodb.create_table(
+        TableName=GAMES_TABLE,
+        KeySchema=[{"AttributeName": "PK", "KeyType": "HASH"}, {"AttributeName": "SK", "KeyType": "RANGE"}],
+        AttributeDefinitions=[{"AttributeName": a, "AttributeType": "S"} for a in ("PK", "SK", "date", "id")],
+        GlobalSecondaryIndexes=[{
+            "IndexName": "ByDate",
+            "KeySchema": [{"AttributeName": "date", "KeyType": "HASH"}, {"AttributeName": "id", "KeyType": "RANGE"}],
+            "Projection": {"ProjectionType": "ALL"},
+        }],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    dynamodb.create_table(
+        TableName=CONN_TABLE,
+        KeySchema=[{"AttributeName": "connectionId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "connectionId", "AttributeType": "S"},
+            {"AttributeName": "gameId", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": "gameId-index",
+            "KeySchema": [{"AttributeName": "gameId", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "ALL"},
+        }],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+    if name in ("poller", "manager", "enable_poller"):
+        if name == "manager":
+            # Tip-off later today, so the manager schedules a kickoff instead of enabling now.
+            tip_off = datetime.now(ZoneInfo("America/New_York")) + timedelta(hours=3)
+            date_str = module.get_nba_date()
+            dynamodb.Table(GAMES_TABLE).put_item(Item={
+                "PK": f"GAME#{GAME_ID}", "SK": f"DATE#{date_str}", "id": GAME_ID, "date": date_str,
+                "starttime": tip_off.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            })
+        return {"task": name}
+
+    key = f"data/boxData/{GAME_ID}.json.gz"
+    etag = s3.put_object(Bucket=BUCKET, Key=key, Body=b"{}")["ETag"]
+    if name == "send_watched":
+        dynamodb.Table(CONN_TABLE).put_item(Item={"connectionId": "c1", "gameId": GAME_ID})
+    return {"Records": [{"s3": {"bucket": {"name": BUCKET}, "object": {"key": key, "eTag": etag, "sequencer": "01"}}}]}
+
+
+def child_import(name):
+    start = time.perf_counter()
+    import boto3  # noqa: F401
+    boto3_ms = _ms(start)
+
+    built = _track_clients()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(open(os.devnull, "w")):
+        _load(name)
+    return {"boto3ImportMs": boto3_ms, "importMs": _ms(start), "importClients": built}
+
+
+def child_invoke(name):
+    from moto import mock_aws
+
+    with mock_aws(), contextlib.redirect_stdout(open(os.devnull, "w")):
+        module = _load(name)
+        event = _setup(name, module)
+        handler = getattr(module, SCENARIOS[name][1])
+
+        built = _track_clients()
+        start = time.perf_counter()
+        handler(event, None)
+        first_ms = _ms(start)
+        invoke_clients = list(built)
+
+        start = time.perf_counter()
+        handler(event, None)
+        warm_ms = _ms(start)
+    return {"firstInvokeMs": first_ms, "warmInvokeMs": warm_ms, "invokeClients": invoke_clients}
+
+
+def _run_child(name, phase):
+    env = {**os.environ, **ENV}
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.join(ROOT, "nba-game-poller"), os.path.join(ROOT, "shared-layer/python"), env.get("PYTHONPATH", "")]
+    )
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", name, "--phase", phase],
+        env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(names, repeat=5):
+    results = {}
+    for name in names:
+        samples = []
+        for _ in range(repeat):
+            sample = {**_run_child(name, "import"), **_run_child(name, "invoke")}
+            sample["coldStartMs"] = sample["importMs"] + sample["firstInvokeMs"]
+            samples.append(sample)
+        results[name] = {
+            "description": SCENARIOS[name][2],
+            **{field: statistics.median(s[field] for s in samples) for field in FIELDS},
+            "importClients": list(dict.fromkeys(samples[0]["importClients"])),
+            "invokeClients": list(dict.fromkeys(samples[0]["invokeClients"])),
+        }
+    return {"repeat": repeat, "results": results}
+
+
+def print_report(report):
+    print(f"median of {report['repeat']} fresh interpreters; ms")
+    print(f"{'task':<16}{'boto3':>8}{'import':>8}{'first':>8}{'cold':>8}{'warm':>8}  clients built (import | first call)")
+    for name, r in report["results"].items():
+        clients = f"{','.join(r['importClients']) or '-'} | {','.join(r['invokeClients']) or '-'}"
+        print(
+            f"{name:<16}{r['boto3ImportMs']:>8.0f}{r['importMs']:>8.0f}{r['firstInvokeMs']:>8.0f}"
+            f"{r['coldStartMs']:>8.0f}{r['warmInvokeMs']:>8.1f}  {clients}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tasks", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", choices=sorted(SCENARIOS), help=argparse.SUPPRESS)
+    parser.add_argument("--phase", choices=("import", "invoke"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = child_import(args.child) if args.phase == "import" else child_invoke(args.child)
+        print(json.dumps(result))
+        return 0
+
+    report = run(args.tasks, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Decode and encode time per JSON codec on recorded feeds and the payloads built from them.
+
+    python functions/benchmarks/bench_json.py [--corpus DIR] [--repeat N] [--json]
+
+Uses the corpus layout of bench_codecs.py: each recorded feed is measured as
+stored, as the processed v1 and v2 play-by-play payloads, plus a synthetic date
+scoreboard with DynamoDB Decimal scores (what the fan-out handlers send).
+
+Rows per codec:
+
+- stdlib: what the Lambdas did before nba_shared.jsoncodec, i.e. `json.loads`,
+  and `json.dumps(...).encode()` after a to_native pass over the Decimals
+- jsoncodec-json: nba_shared.jsoncodec on its stdlib fallback
+- jsoncodec-orjson: nba_shared.jsoncodec on orjson, when it is installed
+
+Both jsoncodec backends write identical bytes, so their sizes match.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+from decimal import Decimal
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../nba-game-poller")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../shared-layer/python")))
+
+from bench_codecs import DEFAULT_CORPUS, load_corpus  # noqa: E402
+from nba_shared import jsoncodec  # noqa: E402
+from nba_shared.jsoncodec import to_native  # noqa: E402
+
+
+def _stdlib_codec():
+    """nba_shared.jsoncodec loaded without orjson."""
+    spec = importlib.util.spec_from_file_location("jsoncodec_stdlib", jsoncodec.__file__)
+    module = importlib.util.module_from_spec(spec)
+    saved = sys.modules.get("orjson")
+    sys.modules["orjson"] = None
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        if saved is None:
+            del sys.modules["orjson"]
+        else:
+            sys.modules["orjson"] = saved
+    return module
+
+
+def _legacy_dumps(doc):
+    if isinstance(doc, dict) and doc.get("type") == "date":
+        doc = {**doc, "data": [{k: to_native(v) for k, v in g.items()} for g in doc["data"]]}
+    return json.dumps(doc).encode("utf-8")
+
+
+def codecs():
+    """{name: (loads, dumps -> bytes)}"""
+    fallback = _stdlib_codec()
+    found = {
+        "stdlib": (json.loads, _legacy_dumps),
+        "jsoncodec-json": (fallback.loads, fallback.dumps_bytes),
+    }
+    if jsoncodec.BACKEND == "orjson":
+        found["jsoncodec-orjson"] = (jsoncodec.loads, jsoncodec.dumps_bytes)
+    return found
+
+
+def date_scoreboard(games=15):
+    """A date payload as gameDateUpdates builds it from DynamoDB items."""
+    return {"type": "date", "data": [
+        {
+            "id": f"00224{i:05d}", "homescore": Decimal(100 + i), "awayscore": Decimal(98 - i),
+            "hometeam": "BOS", "awayteam": "LAL", "starttime": "2025-01-01T19:30:00Z",
+            "clock": "PT04M12.00S", "status": "Q3 4:12", "date": "2025-01-01",
+            "homerecord": "30-12", "awayrecord": "25-17",
+        }
+        for i in range(games)
+    ]}
+
+
+def _best_ms(fn, arg, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn(arg)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return out, min(samples), statistics.median(samples)
+
+
+def run(corpus, repeat=20):
+    """One row per (codec, variant), summed over the corpus."""
+    docs = {}
+    for variants in corpus.values():
+        for variant, data in variants.items():
+            docs.setdefault(variant, []).append(json.loads(data))
+    docs["date"] = [date_scoreboard()]
+
+    rows = []
+    for name, (loads, dumps) in codecs().items():
+        for variant, items in docs.items():
+            row = {"codec": name, "variant": variant, "docs": len(items), "bytes": 0,
+                   "encodeMs": 0.0, "encodeMedianMs": 0.0, "decodeMs": 0.0, "decodeMedianMs": 0.0}
+            for doc in items:
+                encoded, best, median = _best_ms(dumps, doc, repeat)
+                row["bytes"] += len(encoded)
+                row["encodeMs"] += best
+                row["encodeMedianMs"] += median
+                decoded, best, median = _best_ms(loads, encoded, repeat)
+                assert decoded == json.loads(_legacy_dumps(doc)), f"{name} did not round-trip {variant}"
+                row["decodeMs"] += best
+                row["decodeMedianMs"] += median
+            rows.append({k: round(v, 3) if isinstance(v, float) else v for k, v in row.items()})
+    return {"backend": jsoncodec.BACKEND, "repeat": repeat, "results": rows}
+
+
+def print_table(report):
+    print(f"jsoncodec backend: {report['backend']}; best of {report['repeat']} (median in parentheses), ms")
+    print(f"{'variant':<9}{'codec':<18}{'bytes':>10}{'decode':>18}{'encode':>18}")
+    for r in sorted(report["results"], key=lambda r: (r["variant"], r["codec"])):
+        decode = f"{r['decodeMs']:.3f} ({r['decodeMedianMs']:.3f})"
+        encode = f"{r['encodeMs']:.3f} ({r['encodeMedianMs']:.3f})"
+        print(f"{r['variant']:<9}{r['codec']:<18}{r['bytes']:>10}{decode:>18}{encode:>18}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="directory of recorded game JSON files")
+    parser.add_argument("--repeat", type=int, default=20, help="timing repetitions per measurement")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        parser.error(f"no .json games in {args.corpus}")
+    if jsoncodec.BACKEND != "orjson":
+        print("orjson unavailable: reporting the stdlib fallback only", file=sys.stderr)
+    report = run(corpus, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Per-stage timings and peak memory for playbyplay_processing on synthetic games.
+
+    python functions/benchmarks/bench_playbyplay.py                      # print a table
+    python functions/benchmarks/bench_playbyplay.py --output out.json    # machine-readable results
+    python functions/benchmarks/bench_playbyplay.py --check              # fail on regressions vs the baseline
+    python functions/benchmarks/bench_playbyplay.py --update-baseline
+
+Each stage runs on the same inputs `process_playbyplay_payload` would hand it.
+Timings come from --repeat runs with GC paused, like timeit. Peak memory is
+measured separately with tracemalloc, because tracing slows the timed runs.
+
+--check exits 1 when a stage's fastest run is over --threshold times the
+baseline's and also over --min-delta-ms slower. The minimum is the least noisy
+estimate, and the absolute floor keeps tiny stages from failing on jitter.
+Both runs also time a fixed calibration workload, and baseline timings are
+scaled by the ratio, so a slower or busier machine doesn't read as a regression.
+Profiles that look slower are measured again before the check fails.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../nba-game-poller")))
+
+from nba_game_poller.playbyplay_processing import (  # noqa: E402
+    apply_playtimes_action,
+    build_playbyplay_payload,
+    count_periods,
+    create_players,
+    create_playtimes,
+    end_playtimes,
+    process_playbyplay_payload,
+    process_score_timeline,
+    sort_actions,
+)
+from synthetic_games import AWAY_TEAM, HOME_TEAM, PROFILES, generate_game  # noqa: E402
+
+
+RESULTS_SCHEMA_VERSION = 1
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines/playbyplay.json")
+
+
+def _playtimes(actions, players):
+    away_playtimes = create_playtimes(players["awayPlayers"])
+    home_playtimes = create_playtimes(players["homePlayers"])
+    current_q = 1
+    for a in actions:
+        current_q = apply_playtimes_action(a, current_q, away_playtimes, home_playtimes, AWAY_TEAM[0], HOME_TEAM[0])
+    return end_playtimes(away_playtimes, actions[-1]), end_playtimes(home_playtimes, actions[-1])
+
+
+def stages(actions):
+    """(name, zero-arg callable) per stage, with inputs prepared up front."""
+    away_team_id, home_team_id = AWAY_TEAM[0], HOME_TEAM[0]
+    players = create_players(actions, away_team_id, home_team_id)
+    player_actions = [a for acts in players["awayPlayers"].values() for a in acts]
+    player_actions += [a for acts in players["homePlayers"].values() for a in acts]
+    away_playtimes, home_playtimes = _playtimes(actions, players)
+    score_timeline = process_score_timeline(actions)
+
+    return [
+        ("process_score_timeline", lambda: process_score_timeline(actions)),
+        ("create_players", lambda: create_players(actions, away_team_id, home_team_id)),
+        ("update_playtimes", lambda: _playtimes(actions, players)),
+        ("sort_actions", lambda: sort_actions(player_actions)),
+        ("build_payload", lambda: build_playbyplay_payload(
+            game_id="bench",
+            away_team_id=away_team_id,
+            home_team_id=home_team_id,
+            num_periods=count_periods(actions[-1]),
+            last_action=actions[-1],
+            score_timeline=score_timeline,
+            away_players=players["awayPlayers"],
+            home_players=players["homePlayers"],
+            away_playtimes=away_playtimes,
+            home_playtimes=home_playtimes,
+            actions=actions,
+        )),
+        ("process_playbyplay_payload", lambda: process_playbyplay_payload(
+            game_id="bench", actions=actions, away_team_id=away_team_id, home_team_id=home_team_id,
+        )),
+    ]
+
+
+def measure(fn, repeat):
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000.0)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "medianMs": round(statistics.median(samples), 3),
+        "minMs": round(min(samples), 3),
+        "peakKiB": round(peak / 1024, 1),
+    }
+
+
+def _calibration_workload():
+    rows = [{"period": i % 7, "clock": f"PT{i % 12:02d}M{i % 60:02d}.00S", "n": str(i)} for i in range(5000)]
+    index = {}
+    for row in rows:
+        index.setdefault(row["period"], []).append(row)
+    return sorted(rows, key=lambda r: (r["period"], r["clock"]))
+
+
+def run(profiles=None, seed=0, repeat=20):
+    calibration = measure(_calibration_workload, repeat)
+    results = {}
+    for profile in profiles or PROFILES:
+        actions = generate_game(profile, seed)
+        results[profile] = {
+            "actions": len(actions),
+            "stages": {name: measure(fn, repeat) for name, fn in stages(actions)},
+        }
+    return {
+        "schemaVersion": RESULTS_SCHEMA_VERSION,
+        "python": platform.python_version(),
+        "seed": seed,
+        "repeat": repeat,
+        "calibrationMs": calibration["minMs"],
+        "results": results,
+    }
+
+
+def find_regressions(current, baseline, threshold=1.5, min_delta_ms=0.5):
+    """
+    Stages whose fastest run slowed past both limits, as (profile, stage,
+    baseline ms scaled to this machine, current ms).
+    """
+    scale = 1.0
+    if current.get("calibrationMs") and baseline.get("calibrationMs"):
+        scale = current["calibrationMs"] / baseline["calibrationMs"]
+    regressions = []
+    for profile, entry in current["results"].items():
+        base_stages = (baseline.get("results", {}).get(profile) or {}).get("stages", {})
+        for stage, timing in entry["stages"].items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            expected = base["minMs"] * scale
+            if timing["minMs"] > expected * threshold and timing["minMs"] - expected > min_delta_ms:
+                regressions.append((profile, stage, round(expected, 3), timing["minMs"]))
+    return regressions
+
+
+def print_table(report):
+    print(f"{'profile':<14}{'actions':>8}  {'stage':<28}{'median ms':>10}{'min ms':>10}{'peak KiB':>10}")
+    for profile, entry in report["results"].items():
+        for stage, timing in entry["stages"].items():
+            print(
+                f"{profile:<14}{entry['actions']:>8}  {stage:<28}"
+                f"{timing['medianMs']:>10.3f}{timing['minMs']:>10.3f}{timing['peakKiB']:>10.1f}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES), help="profile(s) to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", metavar="PATH", help="write results JSON to PATH")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--check", action="store_true", help="exit 1 if any stage regressed against --baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite --baseline with these results")
+    parser.add_argument("--threshold", type=float, default=1.5, help="allowed slowdown factor (default 1.5)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    report = run(args.profile, seed=args.seed, repeat=args.repeat)
+    print_table(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"Baseline written to {args.baseline}")
+    if args.check:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = find_regressions(report, baseline, args.threshold, args.min_delta_ms)
+        if regressions:
+            # A single busy moment can slow one stage; only report what a second run of the profile repeats.
+            rerun = run(sorted({profile for profile, *_ in regressions}), seed=args.seed, repeat=args.repeat)
+            regressions = find_regressions(rerun, baseline, args.threshold, args.min_delta_ms)
+        for profile, stage, before, after in regressions:
+            print(f"REGRESSION {profile}/{stage}: {before:.3f} ms -> {after:.3f} ms")
+        if regressions:
+            return 1
+        print("No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Per-action cost of player attribution, by description parsing vs the roster index.
+
+    python functions/benchmarks/bench_roster.py [--profile NAME] [--repeat N] [--json]
+
+Times the two passes that name players on synthetic games: filing actions
+under players (create_players) and the playtime state machines. Rows:
+
+- descriptions: no index, every action re-derives its player's name and
+  substitutions and assists parse theirs from the description (the pre-roster path)
+- roster: a PlayerIndex from the synthetic box score, as the poller builds it
+
+Building the index is timed separately; the poller does it once per box score.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../nba-game-poller")))
+
+from nba_game_poller.playbyplay_processing import (  # noqa: E402
+    apply_playtimes_action,
+    create_players,
+    create_playtimes,
+)
+from nba_game_poller.roster_index import PlayerIndex, roster_from_boxscore  # noqa: E402
+from synthetic_games import AWAY_TEAM, HOME_TEAM, PROFILES, generate_boxscore, generate_game  # noqa: E402
+
+
+def attribute(actions, index):
+    """Both attribution passes of process_playbyplay_payload."""
+    away_team_id, home_team_id = AWAY_TEAM[0], HOME_TEAM[0]
+    players = create_players(actions, away_team_id, home_team_id, index)
+    away_playtimes = create_playtimes(players["awayPlayers"])
+    home_playtimes = create_playtimes(players["homePlayers"])
+    current_q = 1
+    for a in actions:
+        current_q = apply_playtimes_action(
+            a, current_q, away_playtimes, home_playtimes, away_team_id, home_team_id, index
+        )
+    return players
+
+
+def _best_ms(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return min(samples), statistics.median(samples)
+
+
+def run(profiles=None, seed=0, repeat=20):
+    roster = roster_from_boxscore(generate_boxscore())
+    build_ms, _ = _best_ms(lambda: PlayerIndex(roster), repeat)
+    index = PlayerIndex(roster)
+
+    def with_roster(actions):
+        # Empty the key memo each run, as a full rebuild starts with one.
+        index.keys.clear()
+        return attribute(actions, index)
+
+    results = {}
+    for profile in profiles or PROFILES:
+        actions = generate_game(profile, seed)
+        modes = {
+            "descriptions": lambda: attribute(actions, None),
+            "roster": lambda: with_roster(actions),
+        }
+        results[profile] = {"actions": len(actions)}
+        for mode, fn in modes.items():
+            best, median = _best_ms(fn, repeat)
+            results[profile][mode] = {
+                "minMs": round(best, 3),
+                "medianMs": round(median, 3),
+                "usPerAction": round(best * 1000.0 / len(actions), 3),
+            }
+    return {"seed": seed, "repeat": repeat, "indexBuildMs": round(build_ms, 3), "results": results}
+
+
+def print_table(report):
+    print(f"PlayerIndex build: {report['indexBuildMs']:.3f} ms; best of {report['repeat']}")
+    print(f"{'profile':<14}{'actions':>8}  {'descriptions us/action':>24}{'roster us/action':>20}")
+    for profile, r in report["results"].items():
+        print(
+            f"{profile:<14}{r['actions']:>8}  {r['descriptions']['usPerAction']:>24.3f}"
+            f"{r['roster']['usPerAction']:>20.3f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", action="append", choices=sorted(PROFILES), help="profile(s) to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.profile, seed=args.seed, repeat=args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_table(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
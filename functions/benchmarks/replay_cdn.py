@@ -0,0 +1,207 @@
+"""
+Local stand-in for cdn.nba.com that replays synthetic games in real time.
+
+    cdn = ReplayCDN({"0022400001": generate_game("regulation", 1)}, speed=20)
+    cdn.start()                     # http://127.0.0.1:<cdn.port>
+    ...
+    cdn.stop()
+
+Serves the three feeds the poller reads, at the same paths as the CDN:
+
+    /static/json/liveData/playbyplay/playbyplay_{gameId}.json
+    /static/json/liveData/boxscore/boxscore_{gameId}.json
+    /static/json/liveData/scoreboard/todaysScoreboard_00.json
+
+Each game moves along its game clock `speed` times faster than real time. A
+game's version is the number of its actions published so far, and the feeds
+behave like the CDN: a strong ETag per version, 304 for If-None-Match, gzip
+when asked for. The X-Replay-Version header tells the harness which version a
+response carries, and `published_at()` says when that version went up.
+"""
+import gzip
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from nba_game_poller.playbyplay_processing import time_to_seconds
+from synthetic_games import AWAY_TEAM, HOME_TEAM
+
+
+PLAY_PATH = "/static/json/liveData/playbyplay/playbyplay_"
+BOX_PATH = "/static/json/liveData/boxscore/boxscore_"
+SCOREBOARD_PATH = "/static/json/liveData/scoreboard/todaysScoreboard_00.json"
+VERSION_HEADER = "X-Replay-Version"
+
+
+def game_seconds(action):
+    """Game-clock seconds from tip-off to `action`."""
+    period = action.get("period") or 1
+    elapsed = sum(12 * 60 if p <= 4 else 5 * 60 for p in range(1, period))
+    length = 12 * 60 if period <= 4 else 5 * 60
+    return elapsed + length - time_to_seconds(action.get("clock"))
+
+
+class ReplayGame:
+    def __init__(self, game_id, actions, start_offset, speed):
+        self.game_id = game_id
+        self.actions = actions
+        # Wall-clock seconds after the replay starts at which each action goes up.
+        self.offsets = [start_offset + game_seconds(a) / speed for a in actions]
+
+    def version_at(self, elapsed):
+        """Number of actions published `elapsed` seconds into the replay."""
+        lo, hi = 0, len(self.offsets)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.offsets[mid] <= elapsed:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def is_final(self, version):
+        return version == len(self.actions)
+
+    def status(self, version):
+        """(gameStatus, gameStatusText, period, gameClock) at `version`."""
+        if version == 0:
+            return 1, "7:00 pm ET", 0, ""
+        if self.is_final(version):
+            return 3, "Final", self.actions[-1]["period"], "PT00M00.00S"
+        last = self.actions[version - 1]
+        period, clock = last["period"], last["clock"]
+        seconds = time_to_seconds(clock)
+        label = f"Q{period}" if period <= 4 else f"OT{period - 4}"
+        return 2, f"{label} {int(seconds // 60)}:{int(seconds % 60):02d}", period, clock
+
+    def score(self, version):
+        for action in reversed(self.actions[:version]):
+            if action.get("scoreHome") != "":
+                return int(action["scoreHome"]), int(action["scoreAway"])
+        return 0, 0
+
+    def _team(self, team, score):
+        return {"teamId": team[0], "teamTricode": team[1], "score": score, "wins": 30, "losses": 20}
+
+    def playbyplay(self, version):
+        return {"game": {"gameId": self.game_id, "actions": self.actions[:version]}}
+
+    def boxscore(self, version):
+        status, text, period, clock = self.status(version)
+        home, away = self.score(version)
+        return {"game": {
+            "gameId": self.game_id,
+            "gameStatus": status,
+            "gameStatusText": text,
+            "period": period,
+            "gameClock": clock,
+            "homeTeam": self._team(HOME_TEAM, home),
+            "awayTeam": self._team(AWAY_TEAM, away),
+        }}
+
+    def scoreboard_entry(self, version):
+        box = self.boxscore(version)["game"]
+        return {k: box[k] for k in ("gameId", "gameStatus", "gameStatusText", "period", "gameClock", "homeTeam", "awayTeam")}
+
+
+class ReplayCDN:
+    def __init__(self, games, speed=1.0, stagger=0.0, clock=time.monotonic):
+        """`games`: {gameId: actions}. Game i tips off `i * stagger` seconds into the replay."""
+        self.clock = clock
+        self.games = {
+            game_id: ReplayGame(game_id, actions, i * stagger, speed)
+            for i, (game_id, actions) in enumerate(games.items())
+        }
+        self.started_at = None
+        self.requests = {200: 0, 304: 0, 404: 0}
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def port(self):
+        return self._server.server_address[1]
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self.started_at = self.clock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _handler_for(self))
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def elapsed(self):
+        return self.clock() - self.started_at
+
+    def published_at(self, game_id, version):
+        """Replay clock (self.clock) time at which `version` of the game went up."""
+        if version == 0:
+            return self.started_at
+        return self.started_at + self.games[game_id].offsets[version - 1]
+
+    def all_final(self):
+        elapsed = self.elapsed()
+        return all(g.is_final(g.version_at(elapsed)) for g in self.games.values())
+
+    def respond(self, path, if_none_match=None):
+        """(status, body dict or None, etag, version) for a request path."""
+        elapsed = self.elapsed()
+        if path == SCOREBOARD_PATH:
+            entries = [g.scoreboard_entry(g.version_at(elapsed)) for g in self.games.values()]
+            versions = ",".join(str(g.version_at(elapsed)) for g in self.games.values())
+            return self._count(200), {"scoreboard": {"games": entries}}, f'"sb-{zlib.crc32(versions.encode()):x}"', None
+
+        for prefix, build in ((PLAY_PATH, ReplayGame.playbyplay), (BOX_PATH, ReplayGame.boxscore)):
+            if path.startswith(prefix) and path.endswith(".json"):
+                game = self.games.get(path[len(prefix):-len(".json")])
+                if game is None:
+                    break
+                version = game.version_at(elapsed)
+                etag = f'"{game.game_id}-{version}"'
+                if if_none_match == etag:
+                    return self._count(304), None, etag, version
+                return self._count(200), build(game, version), etag, version
+        return self._count(404), None, None, None
+
+    def _count(self, status):
+        with self._lock:
+            self.requests[status] += 1
+        return status
+
+
+def _handler_for(cdn):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            status, data, etag, version = cdn.respond(self.path.split("?")[0], self.headers.get("If-None-Match"))
+            body = b""
+            if data is not None:
+                body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+            if version is not None:
+                self.send_header(VERSION_HEADER, str(version))
+            if body and "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                body = gzip.compress(body, compresslevel=1)
+                self.send_header("Content-Encoding", "gzip")
+            if body:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
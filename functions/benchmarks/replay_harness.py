@@ -0,0 +1,399 @@
+"""
+End-to-end poller load test against local stand-ins: no cdn.nba.com, no AWS.
+
+    python functions/benchmarks/replay_harness.py                          # 15 games, 20x speed, 2 minutes
+    python functions/benchmarks/replay_harness.py --games 30 --speed 60 --duration 90 --json
+
+The chain under test is poller main_handler -> S3 -> ws-sendGameUpdate ->
+API Gateway, with these stand-ins:
+
+- cdn.nba.com: replay_cdn.ReplayCDN, replaying synthetic games with real ETags, 304s and gzip
+- S3 and DynamoDB: moto, with the tables and indexes from terraform/database.tf
+- the S3 -> Lambda notification: every poller PUT becomes an S3 event for the send handler,
+  delivered by one notifier thread, as with a reserved concurrency of 1
+- API Gateway management API: FakeApiGateway, which records every post_to_connection
+
+The poller runs back to back with its in-invocation loop. Cadences are
+multiplied by --cadence-scale, so a sped-up replay can keep real-world ratios.
+Lag is measured per delivered object version. It runs from when the replay
+published the upstream version the poller fetched, to when the first
+subscriber got the message naming the object.
+
+Not covered: the DynamoDB stream -> gameDateUpdates path, and network latency
+to AWS. moto answers in-process, so S3 and DynamoDB time is underestimated.
+"""
+import argparse
+import contextlib
+import importlib.util
+import json
+import os
+import queue
+import re
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "nba-game-poller"))
+sys.path.append(os.path.join(ROOT, "shared-layer/python"))
+
+import boto3  # noqa: E402
+from moto import mock_aws  # noqa: E402
+
+from nba_game_poller import nba_api, poll_scheduler  # noqa: E402
+from replay_cdn import VERSION_HEADER, ReplayCDN  # noqa: E402
+from synthetic_games import PROFILES, generate_game  # noqa: E402
+
+
+BUCKET = "harness-data"
+GAMES_TABLE = "NBA_Games"
+CONN_TABLE = "GameConnections"
+STATE_TABLE = "NBA_PollerState"
+RULE_NAME = "harness-poller-rule"
+CDN_ORIGIN = "https://cdn.nba.com"
+FEED_RE = re.compile(r"/(playbyplay|boxscore)_(\w+)\.json$")
+KEY_KINDS = (
+    (re.compile(r"^data/processed-data/playByPlayData/(.+?)\.json\.gz$"), "playbyplay"),
+    (re.compile(r"^data/boxData/(.+?)\.json\.gz$"), "boxscore"),
+)
+
+
+class ReplayClient(nba_api.KeepAliveHttpClient):
+    """CDN client pointed at the replay server. Notes, per thread, the version each feed response carried."""
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+        self.local = threading.local()
+
+    def get(self, url, headers=None):
+        status, response_headers, body = super().get(url.replace(CDN_ORIGIN, self.base_url), headers)
+        match = FEED_RE.search(url)
+        version = response_headers.get(VERSION_HEADER)
+        if match and version is not None:
+            served = getattr(self.local, "served", None)
+            if served is None:
+                served = self.local.served = {}
+            served[(match.group(1), match.group(2))] = int(version)
+        return status, response_headers, body
+
+    def served_version(self, kind, game_id):
+        return (getattr(self.local, "served", None) or {}).get((kind, game_id))
+
+
+class NotifyingS3:
+    """Wraps the poller's S3 client: each PUT is also queued as an S3 event record."""
+
+    def __init__(self, client, on_put):
+        self._client = client
+        self._on_put = on_put
+
+    def put_object(self, **kwargs):
+        resp = self._client.put_object(**kwargs)
+        self._on_put(kwargs["Bucket"], kwargs["Key"], resp.get("ETag", ""))
+        return resp
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class _GoneException(Exception):
+    pass
+
+
+class FakeApiGateway:
+    """post_to_connection stand-in that timestamps every delivery."""
+
+    class exceptions:
+        GoneException = _GoneException
+
+    def __init__(self, on_message, clock=time.monotonic):
+        self._on_message = on_message
+        self.clock = clock
+        self.posts = 0
+        self._lock = threading.Lock()
+
+    def post_to_connection(self, ConnectionId, Data):
+        with self._lock:
+            self.posts += 1
+        self._on_message(json.loads(Data), self.clock())
+
+
+class FakeContext:
+    def __init__(self, timeout_sec):
+        self.deadline = time.monotonic() + timeout_sec
+
+    def get_remaining_time_in_millis(self):
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+
+def _load(path, name):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@contextlib.contextmanager
+def _patched_env(values):
+    saved = {k: os.environ.get(k) for k in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))], 1)
+
+
+def create_tables(dynamodb):
+    dynamodb.create_table(
+        TableName=GAMES_TABLE,
+        KeySchema=[{"AttributeName": "PK", "KeyType": "HASH"}, {"AttributeName": "SK", "KeyType": "RANGE"}],
+        AttributeDefinitions=[
+            {"AttributeName": a, "AttributeType": "S"} for a in ("PK", "SK", "date", "id")
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": "ByDate",
+            "KeySchema": [{"AttributeName": "date", "KeyType": "HASH"}, {"AttributeName": "id", "KeyType": "RANGE"}],
+            "Projection": {"ProjectionType": "ALL"},
+        }],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    dynamodb.create_table(
+        TableName=CONN_TABLE,
+        KeySchema=[{"AttributeName": "connectionId", "KeyType": "HASH"}],
+        AttributeDefinitions=[
+            {"AttributeName": "connectionId", "AttributeType": "S"},
+            {"AttributeName": "gameId", "AttributeType": "S"},
+        ],
+        GlobalSecondaryIndexes=[{
+            "IndexName": "gameId-index",
+            "KeySchema": [{"AttributeName": "gameId", "KeyType": "HASH"}],
+            "Projection": {"ProjectionType": "ALL"},
+        }],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    dynamodb.create_table(
+        TableName=STATE_TABLE,
+        KeySchema=[{"AttributeName": "gameId", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "gameId", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+
+
+def seed(dynamodb, game_ids, date_str, subscribers):
+    start = (datetime.now() - timedelta(minutes=5)).strftime("%Y-%m-%dT%H:%M:%S")
+    with dynamodb.Table(GAMES_TABLE).batch_writer() as batch:
+        for game_id in game_ids:
+            batch.put_item(Item={
+                "PK": f"GAME#{game_id}", "SK": f"DATE#{date_str}", "id": game_id, "date": date_str,
+                "status": "Q1 12:00", "starttime": start,
+            })
+    with dynamodb.Table(CONN_TABLE).batch_writer() as batch:
+        for game_id in game_ids:
+            for i in range(subscribers):
+                batch.put_item(Item={"connectionId": f"{game_id}-{i}", "gameId": game_id})
+
+
+class Harness:
+    def __init__(self, *, games=15, profile="regulation", speed=20.0, stagger=0.0, subscribers=3,
+                 duration=120.0, cadence_scale=1.0, workers=8, loop_sec=50.0, log=print):
+        self.game_ids = [f"00224{i:05d}" for i in range(1, games + 1)]
+        self.cdn = ReplayCDN(
+            {game_id: generate_game(profile, seed=i) for i, game_id in enumerate(self.game_ids)},
+            speed=speed,
+            stagger=stagger,
+        )
+        self.subscribers = subscribers
+        self.duration = duration
+        self.cadence_scale = cadence_scale
+        self.workers = workers
+        self.loop_sec = loop_sec
+        self.log = log
+
+        self.tags = {}
+        self.lags_ms = {"playbyplay": [], "boxscore": []}
+        self.delivered = set()
+        self.puts = 0
+        self.events = queue.Queue()
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    # --- stand-in callbacks ---
+
+    def on_put(self, bucket, key, etag):
+        for pattern, kind in KEY_KINDS:
+            match = pattern.match(key)
+            if not match:
+                continue
+            game_id = match.group(1)
+            version = self.client.served_version(kind, game_id)
+            with self._lock:
+                self.puts += 1
+                self._sequence += 1
+                sequencer = f"{self._sequence:016X}"
+                if version is not None:
+                    self.tags[etag.strip('"')] = (kind, game_id, version)
+            self.events.put({"s3": {
+                "bucket": {"name": bucket},
+                "object": {"key": key, "eTag": etag, "sequencer": sequencer},
+            }})
+            return
+
+    def on_message(self, message, delivered_at):
+        entries = message.get("updates") or [message]
+        with self._lock:
+            for entry in entries:
+                version = entry.get("version")
+                if version in self.delivered or version not in self.tags:
+                    continue
+                self.delivered.add(version)
+                kind, game_id, upstream = self.tags[version]
+                lag = delivered_at - self.cdn.published_at(game_id, upstream)
+                self.lags_ms[kind].append(lag * 1000.0)
+
+    def _notifier(self, sender, stop):
+        # Drains queued S3 events into send-handler invocations until told to stop.
+        while not (stop.is_set() and self.events.empty()):
+            try:
+                records = [self.events.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            while len(records) < 10:
+                try:
+                    records.append(self.events.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                sender.handler({"Records": records}, None)
+            except Exception as e:
+                print(f"send handler error: {e}", file=sys.stderr)
+
+    # --- run ---
+
+    def run(self):
+        env = {
+            "AWS_ACCESS_KEY_ID": "testing", "AWS_SECRET_ACCESS_KEY": "testing", "AWS_DEFAULT_REGION": "us-east-1",
+            "AWS_REGION": "us-east-1",
+            "DATA_BUCKET": BUCKET, "DDB_TABLE": GAMES_TABLE, "POLLER_RULE_NAME": RULE_NAME,
+            "POLLER_STATE_TABLE": STATE_TABLE, "POLLER_INNER_LOOP": "1",
+            "POLLER_LOOP_SEC": str(self.loop_sec), "POLLER_MAX_WORKERS": str(self.workers),
+            "POLLER_HOST_RPS": "1000", "POLLER_REQUEST_BUDGET_PER_GAME": "1000",
+            "POLLER_FORCE_REFRESH_SEC": str(max(1, int(180 * self.cadence_scale))),
+            "CONN_TABLE": CONN_TABLE, "WS_API_ENDPOINT": "https://apigw.invalid/production",
+            "METRICS_ENABLED": "0",
+        }
+        saved_cadence = dict(poll_scheduler.CADENCE_SEC)
+        saved_client = nba_api.CDN_CLIENT
+        with _patched_env(env), mock_aws():
+            try:
+                return self._run()
+            finally:
+                poll_scheduler.CADENCE_SEC.clear()
+                poll_scheduler.CADENCE_SEC.update(saved_cadence)
+                nba_api.CDN_CLIENT = saved_client
+                self.cdn.stop()
+
+    def _run(self):
+        boto3.client("s3").create_bucket(Bucket=BUCKET)
+        boto3.client("events").put_rule(Name=RULE_NAME, ScheduleExpression="rate(1 minute)")
+        dynamodb = boto3.resource("dynamodb")
+        create_tables(dynamodb)
+
+        poller = _load(os.path.join(ROOT, "nba-game-poller/lambda_function.py"), "harness_poller")
+        sender = _load(os.path.join(ROOT, "ws-sendGameUpdate-handler/lambda_function.py"), "harness_send_update")
+        seed(dynamodb, self.game_ids, poller.get_nba_date(), self.subscribers)
+
+        for phase, cadence in poll_scheduler.CADENCE_SEC.items():
+            if cadence is not None:
+                poll_scheduler.CADENCE_SEC[phase] = cadence * self.cadence_scale
+        poller.POLLER_TICK_SLACK_SEC *= self.cadence_scale
+        self.cdn.start()
+        self.client = nba_api.CDN_CLIENT = ReplayClient(self.cdn.base_url)
+        poller.s3_client = NotifyingS3(poller.get_s3_client(), self.on_put)
+        apigw = sender.apigw_client = FakeApiGateway(self.on_message)
+
+        stop = threading.Event()
+        notifier = threading.Thread(target=self._notifier, args=(sender, stop), daemon=True)
+        notifier.start()
+
+        started = time.monotonic()
+        invocations = 0
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            while time.monotonic() - started < self.duration and not self.cdn.all_final():
+                remaining = self.duration - (time.monotonic() - started)
+                poller.POLLER_LOOP_SEC = min(self.loop_sec, remaining)
+                poller.main_handler({"task": "poller"}, FakeContext(poller.POLLER_LOOP_SEC + 10))
+                invocations += 1
+            stop.set()
+            notifier.join()
+        elapsed = time.monotonic() - started
+
+        lags = self.lags_ms["playbyplay"] + self.lags_ms["boxscore"]
+        return {
+            "games": len(self.game_ids),
+            "subscribersPerGame": self.subscribers,
+            "seconds": round(elapsed, 1),
+            "pollerInvocations": invocations,
+            "upstreamVersions": sum(g.version_at(self.cdn.elapsed()) for g in self.cdn.games.values()),
+            "cdnRequests": {str(k): v for k, v in self.cdn.requests.items()},
+            "notModifiedRate": round(self.cdn.requests[304] / max(1, self.cdn.requests[200] + self.cdn.requests[304]), 3),
+            "s3Puts": self.puts,
+            "deliveredVersions": len(self.delivered),
+            "websocketPosts": apigw.posts,
+            "postsPerSecond": round(apigw.posts / elapsed, 1) if elapsed else None,
+            "lagMs": {
+                kind: {
+                    "count": len(values),
+                    "p50": _percentile(values, 50),
+                    "p95": _percentile(values, 95),
+                    "max": round(max(values), 1) if values else None,
+                    "mean": round(statistics.fmean(values), 1) if values else None,
+                }
+                for kind, values in (("all", lags), *self.lags_ms.items())
+            },
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=15)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="regulation")
+    parser.add_argument("--speed", type=float, default=20.0, help="game-clock seconds per wall second")
+    parser.add_argument("--stagger", type=float, default=0.0, help="seconds between tip-offs")
+    parser.add_argument("--subscribers", type=int, default=3, help="WebSocket connections per game")
+    parser.add_argument("--duration", type=float, default=120.0, help="stop after this many seconds")
+    parser.add_argument("--cadence-scale", type=float, default=None,
+                        help="multiplier on poll cadences (default: 1/speed, capped at 1)")
+    parser.add_argument("--workers", type=int, default=8, help="POLLER_MAX_WORKERS")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON only")
+    args = parser.parse_args(argv)
+
+    cadence_scale = args.cadence_scale if args.cadence_scale is not None else min(1.0, 1.0 / args.speed)
+    log = (lambda *a: None) if args.json else print
+    harness = Harness(
+        games=args.games, profile=args.profile, speed=args.speed, stagger=args.stagger,
+        subscribers=args.subscribers, duration=args.duration, cadence_scale=cadence_scale,
+        workers=args.workers, log=log,
+    )
+    log(f"Replaying {args.games} games at {args.speed}x for up to {args.duration:.0f}s "
+        f"(cadence x{cadence_scale:.3g})...")
+    report = harness.run()
+    print(json.dumps(report, indent=None if args.json else 2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
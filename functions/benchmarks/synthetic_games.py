@@ -0,0 +1,241 @@
+"""
+Deterministic synthetic play-by-play feeds, in the same action format as
+tests/fixtures/0012200039.json.
+
+    generate_game("regulation", seed=1)       # ~500 actions
+    generate_game("multi_ot", seed=1)         # three overtimes
+    generate_game("sub_heavy", seed=1)        # frequent substitutions
+    generate_game("assist_heavy", seed=1)     # most made shots assisted
+    generate_game("stress", seed=1)           # ~2,500 actions over ten periods
+    generate_boxscore()                       # the two rosters, as the box score lists them
+
+The same profile and seed always give the same feed, so timings are comparable
+from run to run.
+"""
+import random
+
+
+AWAY_TEAM = (1610612740, "NOP")
+HOME_TEAM = (1610612759, "SAS")
+
+# Shared last names on purpose: the real feeds have them too (e.g. two Joneses).
+AWAY_ROSTER = [
+    "Williamson", "Jones", "Murphy III", "Valanciunas", "McCollum", "Ingram", "Alvarado",
+    "Hayes", "Marshall", "Daniels", "Nance Jr.", "Lewis Jr.", "Graham",
+]
+HOME_ROSTER = [
+    "Collins", "Jones", "Vassell", "Sochan", "Bates-Diop", "Richardson", "Roby",
+    "Branham", "Wesley", "Mamukelashvili", "Champagnie", "Barlow", "Johnson",
+]
+
+PROFILES = {
+    "regulation": {"overtimes": 0, "possessions_per_minute": 2.6, "sub_chance": 0.6, "assist_chance": 0.6},
+    "multi_ot": {"overtimes": 3, "possessions_per_minute": 2.6, "sub_chance": 0.6, "assist_chance": 0.6},
+    "sub_heavy": {"overtimes": 0, "possessions_per_minute": 2.6, "sub_chance": 0.95, "assist_chance": 0.6},
+    "assist_heavy": {"overtimes": 0, "possessions_per_minute": 2.6, "sub_chance": 0.6, "assist_chance": 0.95},
+    # Several times a real game, to show how each stage scales.
+    "stress": {"overtimes": 6, "possessions_per_minute": 8.0, "sub_chance": 0.95, "assist_chance": 0.95},
+}
+
+PERSON_IDS = {
+    (side, name): 1620000 + i
+    for i, (side, name) in enumerate([("away", n) for n in AWAY_ROSTER] + [("home", n) for n in HOME_ROSTER])
+}
+
+SHOTS = [
+    ("Driving Layup Shot", "Driving Layup", 2, 2),
+    ("Jump Shot", "Jump Shot", 2, 15),
+    ("Jump Shot", "3PT Jump Shot", 3, 25),
+    ("Dunk Shot", "Dunk", 2, 1),
+    ("Hook Shot", "Hook Shot", 2, 8),
+]
+
+
+def _clock(seconds):
+    minutes, secs = divmod(max(seconds, 0), 60)
+    return f"PT{int(minutes):02d}M{secs:05.2f}S"
+
+
+def _initial(name):
+    return f"{name[0]}. {name}"
+
+
+class _Game:
+    def __init__(self, rng, profile):
+        self.rng = rng
+        self.profile = profile
+        self.actions = []
+        self.action_number = 1
+        self.score = {"away": 0, "home": 0}
+        self.on_court = {"away": AWAY_ROSTER[:5], "home": HOME_ROSTER[:5]}
+        self.bench = {"away": AWAY_ROSTER[5:], "home": HOME_ROSTER[5:]}
+        self.stats = {}
+        self.person_ids = PERSON_IDS
+
+    def team(self, side):
+        return AWAY_TEAM if side == "away" else HOME_TEAM
+
+    def add(self, *, side, period, clock, player="", action_type, sub_type="", description, scored=False, **extra):
+        team_id, tricode = self.team(side) if side else (0, "")
+        action = {
+            "actionNumber": self.action_number + 1,
+            "clock": _clock(clock),
+            "period": period,
+            "teamId": team_id,
+            "teamTricode": tricode,
+            "personId": self.person_ids[(side, player)] if player else 0,
+            "playerName": player,
+            "playerNameI": _initial(player) if player else "",
+            "xLegacy": 0,
+            "yLegacy": 0,
+            "shotDistance": 0,
+            "shotResult": "",
+            "isFieldGoal": 0,
+            "scoreHome": str(self.score["home"]) if scored or not side else "",
+            "scoreAway": str(self.score["away"]) if scored or not side else "",
+            "pointsTotal": self.score["home"] + self.score["away"] if scored else 0,
+            "location": {"away": "v", "home": "h"}.get(side, ""),
+            "description": description,
+            "actionType": action_type,
+            "subType": sub_type,
+            "videoAvailable": 1 if side else 0,
+            "actionId": len(self.actions) + 1,
+        }
+        action.update(extra)
+        self.actions.append(action)
+        self.action_number += self.rng.choice((1, 1, 2, 3))
+
+    def count(self, side, player, stat, n=1):
+        key = (side, player, stat)
+        self.stats[key] = self.stats.get(key, 0) + n
+        return self.stats[key]
+
+    def substitute(self, side, period, clock):
+        if not self.bench[side]:
+            return
+        out = self.rng.choice(self.on_court[side])
+        sub_in = self.rng.choice(self.bench[side])
+        self.on_court[side] = [sub_in if p == out else p for p in self.on_court[side]]
+        self.bench[side] = [out if p == sub_in else p for p in self.bench[side]]
+        self.add(
+            side=side, period=period, clock=clock, player=out,
+            action_type="Substitution", description=f"SUB: {sub_in} FOR {out}",
+        )
+
+    def possession(self, side, period, clock):
+        rng = self.rng
+        other = "home" if side == "away" else "away"
+        shooter = rng.choice(self.on_court[side])
+        roll = rng.random()
+
+        if roll < 0.12:
+            self.add(
+                side=side, period=period, clock=clock, player=shooter, action_type="Turnover",
+                sub_type="Bad Pass", description=f"{shooter} Bad Pass Turnover (P1.T{self.count(side, shooter, 'TO')})",
+            )
+            stealer = rng.choice(self.on_court[other])
+            self.add(
+                side=other, period=period, clock=clock, player=stealer, action_type="",
+                description=f"{stealer} STEAL ({self.count(other, stealer, 'STL')} STL)",
+            )
+            return
+
+        if roll < 0.22:
+            fouler = rng.choice(self.on_court[other])
+            self.add(
+                side=other, period=period, clock=clock, player=fouler, action_type="Foul",
+                sub_type="Shooting", description=f"{fouler} S.FOUL (P{self.count(other, fouler, 'PF')}.T1) (J.Capers)",
+            )
+            for i in (1, 2):
+                if rng.random() < 0.77:
+                    self.score[side] += 1
+                    points = self.count(side, shooter, "PTS")
+                    self.add(
+                        side=side, period=period, clock=clock, player=shooter, action_type="Free Throw",
+                        sub_type=f"Free Throw {i} of 2", scored=True,
+                        description=f"{shooter} Free Throw {i} of 2 ({points} PTS)",
+                    )
+                else:
+                    self.add(
+                        side=side, period=period, clock=clock, player=shooter, action_type="Free Throw",
+                        sub_type=f"Free Throw {i} of 2", description=f"MISS {shooter} Free Throw {i} of 2",
+                    )
+            return
+
+        sub_type, label, points, distance = rng.choice(SHOTS)
+        shot = {"shotDistance": distance, "isFieldGoal": 1, "xLegacy": rng.randint(-240, 240), "yLegacy": rng.randint(-40, 280)}
+        if rng.random() < 0.47:
+            self.score[side] += points
+            total = self.count(side, shooter, "PTS", points)
+            description = f"{shooter} {distance}' {label} ({total} PTS)"
+            if rng.random() < self.profile["assist_chance"]:
+                assister = rng.choice([p for p in self.on_court[side] if p != shooter])
+                description += f" ({assister} {self.count(side, assister, 'AST')} AST)"
+            self.add(
+                side=side, period=period, clock=clock, player=shooter, action_type="Made Shot",
+                sub_type=sub_type, description=description, scored=True, shotResult="Made", **shot,
+            )
+            return
+
+        self.add(
+            side=side, period=period, clock=clock, player=shooter, action_type="Missed Shot",
+            sub_type=sub_type, description=f"MISS {shooter} {distance}' {label}", shotResult="Missed", **shot,
+        )
+        rebound_side = side if rng.random() < 0.25 else other
+        rebounder = rng.choice(self.on_court[rebound_side])
+        self.add(
+            side=rebound_side, period=period, clock=clock, player=rebounder, action_type="Rebound",
+            sub_type="Unknown", description=f"{rebounder} REBOUND (Off:0 Def:{self.count(rebound_side, rebounder, 'REB')})",
+        )
+
+    def period(self, period):
+        length = 12 * 60 if period <= 4 else 5 * 60
+        self.add(side=None, period=period, clock=length, action_type="period", sub_type="start",
+                 description=f"Start of period {period}")
+        possessions = int(length / 60 * self.profile["possessions_per_minute"] * 2)
+        side = "away" if period % 2 else "home"
+        for i in range(possessions):
+            clock = length - (i + 1) * length / (possessions + 1)
+            self.possession(side, period, round(clock))
+            side = "home" if side == "away" else "away"
+            if self.rng.random() < self.profile["sub_chance"] / 3:
+                for team in ("away", "home"):
+                    if self.rng.random() < self.profile["sub_chance"]:
+                        self.substitute(team, period, round(clock))
+        self.add(side=None, period=period, clock=0, action_type="period", sub_type="end",
+                 description=f"End of period {period}")
+
+
+def generate_game(profile="regulation", seed=0):
+    """A full game's action list for `profile` (a PROFILES key)."""
+    settings = PROFILES[profile]
+    game = _Game(random.Random(f"{profile}:{seed}"), settings)
+    periods = 4 + settings["overtimes"]
+    for period in range(1, periods + 1):
+        if period > 4:
+            # Overtimes only happen on a tie; force one for the profile.
+            game.score["home"] = game.score["away"] = max(game.score.values())
+        game.period(period)
+    game.add(side=None, period=periods, clock=0, action_type="game", sub_type="end", description="Game End")
+    return game.actions
+
+
+def generate_boxscore():
+    """The team and player fields of a boxscore `game` object for the synthetic teams."""
+    def team(side, team_id, tricode, roster):
+        players = [
+            {
+                "personId": PERSON_IDS[(side, name)],
+                "firstName": "Player",
+                "familyName": name,
+                "nameI": _initial(name),
+                "name": f"Player {name}",
+            }
+            for name in roster
+        ]
+        return {"teamId": team_id, "teamTricode": tricode, "players": players}
+
+    return {
+        "awayTeam": team("away", *AWAY_TEAM, AWAY_ROSTER),
+        "homeTeam": team("home", *HOME_TEAM, HOME_ROSTER),
+    }
@@ -1,9 +1,13 @@
-import json
+import itertools
 import os
 import boto3
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import TypeDeserializer
 from botocore.exceptions import ClientError
-from decimal import Decimal
+
+from nba_shared.fanout import GONE, FanOutStats, fan_out
+from nba_shared.metrics import Metrics
+from nba_shared.scoreboard import ScoreboardStore, date_payload, format_game, query_date_games
+from nba_shared.subscribers import SubscriberCache
 
 # Initialize Clients
 dynamodb = boto3.resource('dynamodb')
@@ -13,104 +17,156 @@ GAMES_TABLE_NAME = os.environ.get('GAMES_TABLE', 'NBA_Games')
 GAMES_GSI = os.environ.get('GAMES_GSI', 'ByDate')
 DATE_CONN_TABLE_NAME = os.environ.get('DATE_CONN_TABLE', 'DateConnections')
 DATE_INDEX_NAME = os.environ.get('DATE_INDEX_NAME', 'date-index')
+SCOREBOARD_TABLE_NAME = os.environ.get('SCOREBOARD_TABLE', 'NBA_Scoreboards')
 WS_API_ENDPOINT = os.environ.get('WS_API_ENDPOINT')
 
-# API Gateway Client
-apigw_client = boto3.client('apigatewaymanagementapi', endpoint_url=WS_API_ENDPOINT)
+# Service name on the EMF metric records (nba_shared.metrics; METRICS_ENABLED=1 turns them on)
+METRICS_SERVICE = 'GameDateUpdates'
+
+_deserializer = TypeDeserializer()
+
+# API Gateway Client, built on first use so cold starts with nothing to send skip it
+apigw_client = None
+
+def get_apigw_client():
+    global apigw_client
+    if apigw_client is None:
+        apigw_client = boto3.client('apigatewaymanagementapi', endpoint_url=WS_API_ENDPOINT)
+    return apigw_client
+
+# Subscriber lists survive across invocations in a warm container (see nba_shared.subscribers)
+subscriber_cache = None
+
+def get_subscriber_cache():
+    global subscriber_cache
+    if subscriber_cache is None:
+        subscriber_cache = SubscriberCache(dynamodb.Table(DATE_CONN_TABLE_NAME), DATE_INDEX_NAME, 'dateString')
+    return subscriber_cache
+
+# Per-date scoreboards shared with ws-joinDate (see nba_shared.scoreboard)
+scoreboard_store = None
+
+def get_scoreboard_store():
+    global scoreboard_store
+    if scoreboard_store is None:
+        scoreboard_store = ScoreboardStore(dynamodb.Table(SCOREBOARD_TABLE_NAME))
+    return scoreboard_store
 
 def handler(event, context):
-    # Collect distinct dates from the Stream batch
-    dates = set()
-    for record in event.get('Records', []):
-        if record['eventName'] in ['INSERT', 'MODIFY']:
-            # DynamoDB Stream uses 'NewImage' with type descriptors (e.g. {'S': '2025-01-01'})
-            try:
-                date_val = record['dynamodb']['NewImage']['date']['S']
-                dates.add(date_val)
-            except (KeyError, TypeError):
-                continue
-
-    # Process each unique date
-    for date_str in dates:
-        process_date_update(date_str)
-
-def process_date_update(date_str):
-    # Fetch all subscribers for this date (Query DateConnections GSI)
-    conn_table = dynamodb.Table(DATE_CONN_TABLE_NAME)
+    metrics = Metrics(METRICS_SERVICE)
+    with metrics.timer('invocation'):
+        # Collect, per date, the games whose visible fields changed in this Stream batch
+        with metrics.timer('collectChanges'):
+            changes = collect_changes(event.get('Records', []))
+
+        # Process each unique date
+        stats = FanOutStats()
+        for date_str, games in changes.items():
+            metrics.put('changedGames', len(games))
+            process_date_update(date_str, stats, games, metrics)
+    print(f"Fan-out summary: {stats.summary()}")
+    stats.put_metrics(metrics)
+    metrics.flush()
+
+def collect_changes(records):
+    """
+    Returns {date: {gameId: summary or None}} for records that change what date
+    subscribers see. A MODIFY that only touched poller bookkeeping (play_etag,
+    box_etag, ...) is dropped; None marks a game that left the date.
+    """
+    changes = {}
+    for record in records:
+        event_name = record.get('eventName')
+        if event_name not in ('INSERT', 'MODIFY', 'REMOVE'):
+            continue
+        # DynamoDB Stream images use type descriptors (e.g. {'S': '2025-01-01'})
+        images = record.get('dynamodb') or {}
+        new = deserialize_image(images.get('NewImage'))
+        old = deserialize_image(images.get('OldImage'))
+        new_date = _image_date(new)
+        old_date = _image_date(old)
+
+        if event_name == 'REMOVE':
+            if old_date:
+                changes.setdefault(old_date, {})[old.get('id')] = None
+            continue
+        if not new_date:
+            continue
+
+        # Without an OldImage (e.g. NEW_IMAGE streams) every MODIFY counts as a change
+        new_summary = format_game(new)
+        if event_name == 'MODIFY' and old is not None and format_game(old) == new_summary:
+            continue
+        if old_date and old_date != new_date:
+            changes.setdefault(old_date, {})[old.get('id')] = None
+        changes.setdefault(new_date, {})[new.get('id')] = new_summary
+    return changes
+
+def deserialize_image(image):
+    if not image:
+        return None
     try:
-        sub_resp = conn_table.query(
-            IndexName=DATE_INDEX_NAME,
-            KeyConditionExpression=Key('dateString').eq(date_str)
-        )
-    except ClientError as e:
-        print(f"Error querying subscribers: {e}")
-        return
+        return {k: _deserializer.deserialize(v) for k, v in image.items()}
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+def _image_date(image):
+    date_val = (image or {}).get('date')
+    return date_val if isinstance(date_val, str) else None
+
+def process_date_update(date_str, stats=None, changed_games=None, metrics=None):
+    metrics = metrics or Metrics(METRICS_SERVICE, enabled=False)
+
+    # Keep the date's scoreboard current whether or not anyone is subscribed
+    store = get_scoreboard_store()
+    with metrics.timer('scoreboardApply'):
+        games = store.apply(date_str, changed_games) if changed_games else None
 
-    connections = [item['connectionId'] for item in sub_resp.get('Items', [])]
-    
-    if not connections:
+    # Stream all subscribers for this date (every page, or the cached list)
+    cache = get_subscriber_cache()
+    with metrics.timer('subscriberLookup'):
+        connections = cache.subscribers(date_str)
+        first = next(connections, None)
+    if first is None:
         return
 
+    if games is None:
+        with metrics.timer('dateGames'):
+            games = get_date_games(date_str)
+        if games is None:
+            return
+
+    # Fan-out to connections
+    stats = stats if stats is not None else FanOutStats()
+    payload = date_payload(games)
+    metrics.put('messageBytes', len(payload), 'Bytes')
+    gone_before = stats.counts[GONE]
+    with metrics.timer('fanOut'):
+        fan_out(
+            apigw_client=get_apigw_client(),
+            connection_ids=itertools.chain([first], connections),
+            payload=payload,
+            conn_table=cache.table,
+            subscription=date_str,
+            stats=stats,
+        )
+    if stats.counts[GONE] > gone_before:
+        cache.invalidate(date_str)
+
+def get_date_games(date_str):
+    """
+    The date's game summaries from its scoreboard, rebuilt (and re-seeded) from a
+    ByDate query when there is none. Returns None if the query fails.
+    """
+    store = get_scoreboard_store()
+    games = store.get(date_str)
+    if games is not None:
+        return games
+
     # Fetch all games for this date (Query NBA_Games GSI)
-    games_table = dynamodb.Table(GAMES_TABLE_NAME)
     try:
-        games_resp = games_table.query(
-            IndexName=GAMES_GSI,
-            KeyConditionExpression=Key('date').eq(date_str)
-        )
+        games = query_date_games(dynamodb.Table(GAMES_TABLE_NAME), GAMES_GSI, date_str)
     except ClientError as e:
         print(f"Error querying games: {e}")
-        return
-
-    raw_games = games_resp.get('Items', [])
-
-    # Build Payload
-    formatted_games = []
-    for g in raw_games:
-        formatted_games.append({
-            'id': g.get('id'),
-            'homescore': to_native(g.get('homescore')),
-            'awayscore': to_native(g.get('awayscore')),
-            'hometeam': g.get('hometeam'),
-            'awayteam': g.get('awayteam'),
-            'starttime': g.get('starttime'),
-            'clock': g.get('clock'),
-            'status': g.get('status'),
-            'date': g.get('date'),
-            'homerecord': g.get('homerecord'),
-            'awayrecord': g.get('awayrecord')
-        })
-
-    payload = json.dumps({
-        'type': "date",
-        'data': formatted_games
-    })
-
-    # Fan-out to connections
-    for conn_id in connections:
-        try:
-            apigw_client.post_to_connection(
-                ConnectionId=conn_id,
-                Data=payload
-            )
-        except apigw_client.exceptions.GoneException:
-            # 410 Gone: Connection is stale, delete it
-            print(f"Found stale connection: {conn_id}")
-            try:
-                # The table key is simple: { connectionId }
-                conn_table.delete_item(
-                    Key={
-                        'connectionId': conn_id
-                    }
-                )
-            except ClientError as e:
-                print(f"Failed to delete stale connection {conn_id}: {e}")
-        except Exception as e:
-            # Log other errors but keep loop going
-            print(f"Failed to send to {conn_id}: {e}")
-
-def to_native(val):
-    """Helper: Convert Decimal to int or float"""
-    if isinstance(val, Decimal):
-        return int(val) if val % 1 == 0 else float(val)
-    return val
\ No newline at end of file
+        return None
+    return store.seed(date_str, games)
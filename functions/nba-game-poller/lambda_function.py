@@ -1,16 +1,43 @@
-import json
 import boto3
 import os
 import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 
-from nba_game_poller.nba_api import USER_AGENTS, fetch_nba_data_urllib
-from nba_game_poller.playbyplay_processing import infer_team_ids_from_actions, process_playbyplay_payload
-from nba_game_poller.storage import upload_json_to_s3, update_manifest as storage_update_manifest
+from nba_shared.metrics import Metrics
+from nba_game_poller.ddb_writes import (
+    STATE_ATTRS,
+    STATE_KEY,
+    STATE_TTL_SEC,
+    PendingWrites,
+    batch_get_items,
+    batch_put_items,
+    with_throttle_retry,
+)
+from nba_game_poller.nba_api import USER_AGENTS, HostRateLimiter, fetch_nba_data_urllib
+from nba_game_poller.payload_codecs import sibling_codecs
+from nba_game_poller.playbyplay_columnar import encode_playbyplay_v2
+from nba_game_poller.playbyplay_incremental import evict_playbyplay_state, process_playbyplay_incremental
+from nba_game_poller.playbyplay_processing import infer_team_ids_from_actions
+from nba_game_poller.roster_index import roster_from_boxscore
+from nba_game_poller.poll_scheduler import PollScheduler, game_phase
+from nba_game_poller.scoreboard_plan import (
+    FINGERPRINT_ATTR,
+    POLLED_AT_ATTR,
+    fetch_scoreboard_games,
+    plan_polls,
+)
+from nba_game_poller.storage import (
+    load_json_snapshot,
+    save_json_snapshot,
+    upload_json_to_s3,
+    update_manifest as storage_update_manifest,
+)
 
 # --- Configuration & Environment ---
 REGION = os.environ.get('AWS_REGION', 'us-east-1')
@@ -22,24 +49,103 @@ POLLER_RULE_NAME = os.environ['POLLER_RULE_NAME']
 
 # 2. Optional / Defaults
 DDB_GSI = os.environ.get('DDB_GSI', 'ByDate')
+# Non-streamed table for poller bookkeeping (ETags, fingerprint, polled_at; see ddb_writes.py).
+# Unset: bookkeeping stays on the NBA_Games items.
+POLLER_STATE_TABLE = os.environ.get('POLLER_STATE_TABLE', '')
 PREFIX = 'data/'
-MANIFEST_KEY = f'{PREFIX}manifest.json'
-KICKOFF_SCHEDULE_NAME = 'NBA_Daily_Kickoff'
+# Incremental play-by-play state, persisted for cold starts. No `.json.gz`
+# suffix so these writes don't fire the S3 -> WebSocket notifier.
+PBP_STATE_PREFIX = f'{PREFIX}poller-state/playByPlayData/'
+PBP_STATE_SNAPSHOTS = os.environ.get('PBP_STATE_SNAPSHOTS', '1') == '1'
+# Processed play-by-play layout: 1 = per-action dicts, 2 = columnar (playbyplay_columnar.py).
+PBP_SCHEMA_VERSION = int(os.environ.get('PBP_SCHEMA_VERSION', '1'))
+# Extra encodings written next to each box/play-by-play .gz, e.g. "gzip,zstd" (payload_codecs.py).
+PAYLOAD_CODECS = [c.strip() for c in os.environ.get('PAYLOAD_CODECS', 'gzip').split(',')]
+ZSTD_DICT_KEY = os.environ.get('ZSTD_DICT_KEY')
+
+# Concurrency: 1 worker keeps the sequential, sleep-between-games behaviour.
+POLLER_MAX_WORKERS = int(os.environ.get('POLLER_MAX_WORKERS', '1'))
+# Per-host request cap used when polling concurrently.
+POLLER_HOST_RPS = float(os.environ.get('POLLER_HOST_RPS', '4'))
+# Scoreboard-first planning: only fetch per-game feeds for games the scoreboard shows moving,
+# plus every game at least once per POLLER_FORCE_REFRESH_SEC (scoreboard_plan.py).
+POLLER_SCOREBOARD_FIRST = os.environ.get('POLLER_SCOREBOARD_FIRST', '1') == '1'
+POLLER_FORCE_REFRESH_SEC = int(os.environ.get('POLLER_FORCE_REFRESH_SEC', '180'))
+# In-invocation loop: poll each game on its own cadence (poll_scheduler.py) for up to
+# POLLER_LOOP_SEC, kept under the 1-minute rule so runs don't overlap. The feed request
+# budget matches the fixed schedule's two requests per game per run.
+POLLER_INNER_LOOP = os.environ.get('POLLER_INNER_LOOP', '0') == '1'
+POLLER_LOOP_SEC = float(os.environ.get('POLLER_LOOP_SEC', '50'))
+POLLER_REQUEST_BUDGET_PER_GAME = float(os.environ.get('POLLER_REQUEST_BUDGET_PER_GAME', '2'))
+# Games due within this many seconds of each other share a scoreboard fetch.
+POLLER_TICK_SLACK_SEC = 2.0
 
 # 3. Security (From Terraform)
 LAMBDA_ARN = os.environ.get('LAMBDA_ARN')
 SCHEDULER_ROLE_ARN = os.environ.get('SCHEDULER_ROLE_ARN')
 
-# AWS Clients
-s3_client = boto3.client('s3', region_name=REGION)
-ddb = boto3.resource('dynamodb', region_name=REGION)
-table = ddb.Table(DDB_TABLE)
-events_client = boto3.client('events', region_name=REGION)
-scheduler_client = boto3.client('scheduler', region_name=REGION)
+# AWS Clients: built on first use (get_*) and kept for warm invocations. Building
+# one costs tens of milliseconds, and the every-minute poller needs only S3 and
+# DynamoDB; EventBridge just on the run that disables it, the Scheduler never.
+s3_client = None
+ddb = None
+table = None
+events_client = None
+scheduler_client = None
+_clients_lock = threading.Lock()
+
+# Resolved on first upload (loading a zstd dictionary needs S3)
+_payload_codecs = None
+_payload_codecs_lock = threading.Lock()
+
+# boto3 resources are not thread-safe; serialize table writes from worker threads.
+_ddb_lock = threading.Lock()
+
+# Service name on the EMF metric records (nba_shared.metrics; METRICS_ENABLED=1 turns them on)
+METRICS_SERVICE = 'NBAGamePoller'
 
 ET_ZONE = ZoneInfo("America/New_York")
 UTC_ZONE = ZoneInfo("UTC")
 
+# --- AWS Clients (lazy) ---
+
+def get_s3_client():
+    global s3_client
+    if s3_client is None:
+        with _clients_lock:
+            if s3_client is None:
+                s3_client = boto3.client('s3', region_name=REGION)
+    return s3_client
+
+def get_ddb():
+    global ddb
+    if ddb is None:
+        with _clients_lock:
+            if ddb is None:
+                ddb = boto3.resource('dynamodb', region_name=REGION)
+    return ddb
+
+def get_table():
+    global table
+    if table is None:
+        resource = get_ddb()
+        with _clients_lock:
+            if table is None:
+                table = resource.Table(DDB_TABLE)
+    return table
+
+def get_events_client():
+    global events_client
+    if events_client is None:
+        events_client = boto3.client('events', region_name=REGION)
+    return events_client
+
+def get_scheduler_client():
+    global scheduler_client
+    if scheduler_client is None:
+        scheduler_client = boto3.client('scheduler', region_name=REGION)
+    return scheduler_client
+
 # --- Main Handler ---
 
 def main_handler(event, context):
@@ -61,6 +167,9 @@ def main_handler(event, context):
 # 1. MANAGER LOGIC (Runs Daily at Noon)
 # ==============================================================================
 def manager_logic():
+    # Manager/kickoff code loads only for these tasks (see nba_game_poller/schedule_tasks.py)
+    from nba_game_poller.schedule_tasks import plan_kickoff, schedule_kickoff
+
     today_str = get_nba_date()
     print(f"Manager: Checking games for {today_str}...")
 
@@ -70,47 +179,11 @@ def manager_logic():
         print("Manager: No games found in DynamoDB for today.")
         return
 
-    start_dt = get_earliest_start_time(games)
-    
-    if not start_dt:
-        print("Manager: Games exist but have no valid start time. Enabling immediately.")
-        return enable_poller_logic()
-
-    # Schedule kickoff 15 minutes before the first tip-off
-    kickoff_time = start_dt - timedelta(minutes=15)
-    now_utc = datetime.now(ZoneInfo("UTC"))
-
-    # If the kickoff time is in the past (or very close), enable immediately
-    if kickoff_time <= now_utc:
-        print(f"Manager: Kickoff time {kickoff_time} is in the past. Enabling Poller now.")
+    kickoff_time = plan_kickoff(get_earliest_start_time(games), datetime.now(UTC_ZONE))
+    if kickoff_time is None:
         return enable_poller_logic()
 
-    print(f"Manager: First game at {start_dt}. Scheduling kickoff for {kickoff_time}.")
-    schedule_kickoff(kickoff_time)
-
-def schedule_kickoff(run_at_dt):
-    at_expression = f"at({run_at_dt.strftime('%Y-%m-%dT%H:%M:%S')})"
-
-    try:
-        # Cleanup old schedule if exists
-        try:
-            scheduler_client.delete_schedule(Name=KICKOFF_SCHEDULE_NAME)
-        except ClientError:
-            pass 
-
-        scheduler_client.create_schedule(
-            Name=KICKOFF_SCHEDULE_NAME,
-            ScheduleExpression=at_expression,
-            Target={
-                'Arn': LAMBDA_ARN,
-                'RoleArn': SCHEDULER_ROLE_ARN,
-                'Input': json.dumps({'task': 'enable_poller'})
-            },
-            FlexibleTimeWindow={'Mode': 'OFF'}
-        )
-        print(f"Manager: Created one-time schedule '{KICKOFF_SCHEDULE_NAME}' at {at_expression}")
-    except Exception as e:
-        print(f"Manager Error: Failed to schedule kickoff: {e}")
+    if not schedule_kickoff(get_scheduler_client(), kickoff_time, LAMBDA_ARN, SCHEDULER_ROLE_ARN):
         # Fallback: enable immediately so we don't miss games
         enable_poller_logic()
 
@@ -118,20 +191,25 @@ def schedule_kickoff(run_at_dt):
 # 2. KICKOFF LOGIC (One-Time Trigger)
 # ==============================================================================
 def enable_poller_logic():
-    print(f"Kickoff: Enabling {POLLER_RULE_NAME}...")
-    try:
-        events_client.enable_rule(Name=POLLER_RULE_NAME)
-        print("Kickoff: Success. Polling has begun.")
-    except Exception as e:
-        print(f"Kickoff Error: {e}")
-        raise e
+    from nba_game_poller.schedule_tasks import enable_rule
+
+    enable_rule(get_events_client(), POLLER_RULE_NAME)
 
 # ==============================================================================
 # 3. POLLER LOGIC (Runs Every Minute)
 # ==============================================================================
 def poller_logic(context):
+    metrics = Metrics(METRICS_SERVICE)
+    try:
+        with metrics.timer('invocation'):
+            return _poller_logic(context, metrics)
+    finally:
+        metrics.flush()
+
+def _poller_logic(context, metrics):
     today_str = get_nba_date()
-    games = get_games_from_ddb(today_str)
+    with metrics.timer('ddbQuery'):
+        games = get_games_from_ddb(today_str)
 
     if not games:
         print("Poller: No games found for today. Disabling self.")
@@ -159,12 +237,70 @@ def poller_logic(context):
     if not active_games:
         print("Poller: No active games yet. Keeping poller enabled.")
         return
+    metrics.put('activeGames', len(active_games))
+    with metrics.timer('stateLoad'):
+        load_poller_state(active_games)
+    writes = new_pending_writes()
 
     # --- SECURITY: Pick ONE identity for this entire session ---
     session_user_agent = random.choice(USER_AGENTS)
 
+    if POLLER_INNER_LOOP:
+        final_game_ids = run_poll_loop(
+            active_games, context, user_agent=session_user_agent, metrics=metrics, writes=writes
+        )
+        for game_id in final_game_ids:
+            print(f"Poller: Game {game_id} went Final.")
+            storage_update_manifest(
+                s3_client=get_s3_client(),
+                bucket=BUCKET,
+                prefix=PREFIX,
+                game_id=game_id,
+            )
+        return
+
+    # --- PLANNING: one scoreboard fetch decides which games need their feeds ---
+    plans = {}
+    if POLLER_SCOREBOARD_FIRST:
+        with metrics.timer('scoreboard'):
+            scoreboard_games = fetch_scoreboard_games(session_user_agent)
+        to_poll, skipped = plan_polls(
+            active_games,
+            scoreboard_games,
+            now=time.time(),
+            force_refresh_sec=POLLER_FORCE_REFRESH_SEC,
+        )
+        print(f"Poller: Scoreboard plan: {len(to_poll)} to poll, {len(skipped)} unchanged")
+        metrics.put('skippedGames', len(skipped))
+        active_games = [game for game, _ in to_poll]
+        plans = {game['id']: plan for game, plan in to_poll}
+        if not active_games:
+            return
+
     # --- RANDOMIZATION: Shuffle processing order ---
     random.shuffle(active_games)
+    metrics.put('polledGames', len(active_games))
+
+    if POLLER_MAX_WORKERS > 1 and len(active_games) > 1:
+        final_game_ids = poll_games_concurrently(
+            active_games,
+            context,
+            user_agent=session_user_agent,
+            max_workers=POLLER_MAX_WORKERS,
+            plans=plans,
+            writes=writes,
+        )
+        flush_writes(writes, metrics)
+        # Manifest writes are conditional read-modify-writes; keep them off the worker threads.
+        for game_id in final_game_ids:
+            print(f"Poller: Game {game_id} went Final.")
+            storage_update_manifest(
+                s3_client=get_s3_client(),
+                bucket=BUCKET,
+                prefix=PREFIX,
+                game_id=game_id,
+            )
+        return
 
     total_games_to_process = len(active_games)
 
@@ -173,14 +309,14 @@ def poller_logic(context):
         
         try:
             # Pass the SESSION user agent down
-            is_final = process_game(game, user_agent=session_user_agent)
+            is_final = process_game(game, user_agent=session_user_agent, plan=plans.get(game_id), writes=writes)
             
             if is_final:
                 print(f"Poller: Game {game_id} went Final.")
                 storage_update_manifest(
-                    s3_client=s3_client,
+                    s3_client=get_s3_client(),
                     bucket=BUCKET,
-                    manifest_key=MANIFEST_KEY,
+                    prefix=PREFIX,
                     game_id=game_id,
                 )
             
@@ -194,6 +330,139 @@ def poller_logic(context):
         except Exception as e:
             print(f"Poller Error on game {game_id}: {e}")
 
+    flush_writes(writes, metrics)
+
+def poll_games_concurrently(games, context, user_agent=None, max_workers=4, plans=None, writes=None):
+    """
+    Processes games on a bounded thread pool. Politeness comes from a shared
+    per-host rate limiter (with jitter) instead of sleeping between games, and
+    requests that would land past the Lambda's time budget are skipped.
+    Returns the IDs of games that went final.
+    """
+    rate_limiter = HostRateLimiter(POLLER_HOST_RPS)
+    deadline = get_poll_deadline(context)
+    final_game_ids = []
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(games))) as pool:
+        futures = {
+            pool.submit(
+                process_game,
+                game,
+                user_agent=user_agent,
+                rate_limiter=rate_limiter,
+                deadline=deadline,
+                plan=(plans or {}).get(game['id']),
+                writes=writes,
+            ): game['id']
+            for game in games
+        }
+        for future in as_completed(futures):
+            game_id = futures[future]
+            try:
+                if future.result():
+                    final_game_ids.append(game_id)
+            except Exception as e:
+                print(f"Poller Error on game {game_id}: {e}")
+
+    return final_game_ids
+
+def run_poll_loop(games, context, user_agent=None, metrics=None, writes=None):
+    """
+    Polls games on their own cadences until the loop's time or request budget runs out.
+    Each tick fetches the scoreboard once, polls the due games it shows changed (or that
+    are due a forced refresh), reschedules every due game from its phase, and sleeps
+    until the next one is due. Returns the IDs of games that went final.
+    """
+    metrics = metrics or Metrics(METRICS_SERVICE, enabled=False)
+    writes = writes if writes is not None else new_pending_writes()
+    deadline = get_poll_deadline(context)
+    loop_end = time.monotonic() + POLLER_LOOP_SEC
+    if deadline is not None:
+        loop_end = min(loop_end, deadline)
+
+    games_by_id = {game['id']: game for game in games}
+    scheduler = PollScheduler(
+        games_by_id,
+        request_budget=int(POLLER_REQUEST_BUDGET_PER_GAME * len(games)),
+        clock=time.monotonic,
+    )
+    rate_limiter = HostRateLimiter(POLLER_HOST_RPS)
+    final_game_ids = []
+    polls = ticks = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, min(POLLER_MAX_WORKERS, len(games)))) as pool:
+        while len(scheduler) and time.monotonic() < loop_end:
+            due = scheduler.due(slack=POLLER_TICK_SLACK_SEC)
+            if due:
+                # The budget covers the two per-game feeds; the scoreboard fetch is one small shared request.
+                if not scheduler.affordable(2):
+                    break
+                ticks += 1
+                with metrics.timer('scoreboard'):
+                    scoreboard_games = fetch_scoreboard_games(user_agent)
+                to_poll, skipped = plan_polls(
+                    [games_by_id[game_id] for game_id in due],
+                    scoreboard_games,
+                    now=time.time(),
+                    force_refresh_sec=POLLER_FORCE_REFRESH_SEC,
+                )
+                phases = {game_id: game_phase((scoreboard_games or {}).get(game_id)) for game_id in due}
+                for game in skipped:
+                    scheduler.reschedule(game['id'], phases[game['id']])
+
+                futures = {}
+                for game, plan in to_poll:
+                    if not scheduler.charge(2):
+                        scheduler.reschedule(game['id'], phases[game['id']])
+                        continue
+                    future = pool.submit(
+                        process_game,
+                        game,
+                        user_agent=user_agent,
+                        rate_limiter=rate_limiter,
+                        deadline=loop_end,
+                        plan=plan,
+                        writes=writes,
+                    )
+                    futures[future] = game['id']
+                for future in as_completed(futures):
+                    game_id = futures[future]
+                    polls += 1
+                    try:
+                        is_final = future.result()
+                    except Exception as e:
+                        print(f"Poller Error on game {game_id}: {e}")
+                        is_final = False
+                    if is_final:
+                        final_game_ids.append(game_id)
+                        scheduler.drop(game_id)
+                    else:
+                        scheduler.reschedule(game_id, phases[game_id])
+                # Each tick's writes go out together, so the date page sees new scores promptly.
+                flush_writes(writes, metrics)
+
+            next_due = scheduler.next_due()
+            if next_due is None:
+                break
+            pause = min(next_due, loop_end) - time.monotonic()
+            if pause > 0:
+                time.sleep(pause)
+
+    print(f"Poller: Loop ran {ticks} ticks, {polls} game polls, {scheduler.requests_left} requests of budget left")
+    metrics.put('loopTicks', ticks)
+    metrics.put('polledGames', polls)
+    return final_game_ids
+
+def get_poll_deadline(context, safety_buffer_sec=5.0, request_estimate_sec=1.5):
+    """
+    Latest time.monotonic() at which a new CDN request may start, leaving room for
+    the request itself and teardown. None when there is no Lambda context.
+    """
+    if not context or not hasattr(context, 'get_remaining_time_in_millis'):
+        return None
+    remaining_sec = context.get_remaining_time_in_millis() / 1000.0
+    return time.monotonic() + remaining_sec - safety_buffer_sec - request_estimate_sec
+
 def calculate_safe_sleep(context, current_index, total_items):
     """
     Calculates a sleep time that fits within the remaining Lambda execution window.
@@ -246,7 +515,7 @@ def calculate_safe_sleep(context, current_index, total_items):
 
 def disable_self():
     try:
-        events_client.disable_rule(Name=POLLER_RULE_NAME)
+        get_events_client().disable_rule(Name=POLLER_RULE_NAME)
         print(f"Poller: Successfully disabled {POLLER_RULE_NAME}")
     except Exception as e:
         print(f"Poller Error: Failed to disable rule: {e}")
@@ -254,7 +523,25 @@ def disable_self():
 # ==============================================================================
 # CORE PROCESSING (Fetch -> Upload -> Update)
 # ==============================================================================
-def process_game(game_item, user_agent=None):
+def process_game(game_item, user_agent=None, rate_limiter=None, deadline=None, plan=None, writes=None):
+    """
+    Polls one game's feeds and publishes what changed. DynamoDB changes are
+    recorded on `writes` for the caller to flush; without it they are written
+    before returning. Returns True once the game is final.
+    """
+    metrics = Metrics(METRICS_SERVICE, properties={'gameId': game_item['id']})
+    own_writes = writes is None
+    if own_writes:
+        writes = new_pending_writes()
+    try:
+        with metrics.timer('game'):
+            return _process_game(game_item, metrics, writes, user_agent, rate_limiter, deadline, plan)
+    finally:
+        if own_writes:
+            flush_writes(writes, metrics)
+        metrics.flush()
+
+def _process_game(game_item, metrics, writes, user_agent, rate_limiter, deadline, plan):
     game_id = game_item['id']
     
     # Get stored ETags
@@ -266,15 +553,35 @@ def process_game(game_item, user_agent=None):
         'box': f"https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{game_id}.json"
     }
 
-    # Fetch Data
-    play_data, play_etag = fetch_nba_data_urllib(urls['play'], last_play_etag, user_agent)
-    box_data, box_etag = fetch_nba_data_urllib(urls['box'], last_box_etag, user_agent)
+    # Fetch Data (a request denied by the rate limiter is treated like a 304)
+    play_data, play_etag = None, last_play_etag
+    box_data, box_etag = None, last_box_etag
+    if rate_limiter is None or rate_limiter.acquire(urls['play'], deadline):
+        play_data, play_etag = fetch_nba_data_urllib(
+            urls['play'], last_play_etag, user_agent, metrics=metrics.prefixed('play')
+        )
+    else:
+        print(f"Poller: Out of time budget, skipping play-by-play for {game_id}")
+    if rate_limiter is None or rate_limiter.acquire(urls['box'], deadline):
+        box_data, box_etag = fetch_nba_data_urllib(
+            urls['box'], last_box_etag, user_agent, metrics=metrics.prefixed('box')
+        )
+    else:
+        print(f"Poller: Out of time budget, skipping box score for {game_id}")
 
     # 304 Optimization: If neither changed, exit early
     if play_data is None and box_data is None:
+        # Keep the scoreboard fingerprint unrecorded so a lagging feed is retried next run,
+        # but note the forced refresh so it isn't repeated every minute.
+        if plan and plan['forced']:
+            writes.record(game_item, {POLLED_AT_ATTR: int(time.time())})
         return False
 
     updates = {}
+    if plan:
+        updates[POLLED_AT_ATTR] = int(time.time())
+        if plan['fingerprint'] is not None:
+            updates[FINGERPRINT_ATTR] = plan['fingerprint']
     is_game_final = False
 
     # Best-effort team IDs for play-by-play processing (used when box is a 304).
@@ -304,12 +611,13 @@ def process_game(game_item, user_agent=None):
             # 1) Upload raw actions only once when the game is final.
             if is_play_final:
                 upload_json_to_s3(
-                    s3_client=s3_client,
+                    s3_client=get_s3_client(),
                     bucket=BUCKET,
                     prefix=PREFIX,
                     key=f"playByPlayData/{game_id}.json",
                     data=actions,
                     is_final=is_play_final,
+                    metrics=metrics.prefixed('rawPlay'),
                 )
 
             # 2) Upload slim processed payload to the new processed-data location.
@@ -319,21 +627,36 @@ def process_game(game_item, user_agent=None):
                 home_team_id = home_team_id or inferred_home
 
             if home_team_id and away_team_id:
-                processed = process_playbyplay_payload(
-                    game_id=game_id,
-                    actions=actions,
-                    away_team_id=away_team_id,
-                    home_team_id=home_team_id,
-                    include_actions=False,
-                    include_all_actions=False,
-                )
+                # None on a 304 box score: the state keeps the roster it has.
+                roster = roster_from_boxscore(box_game) if box_game else None
+                with metrics.timer('processPlayByPlay'):
+                    processed = process_playbyplay_incremental(
+                        game_id=game_id,
+                        actions=actions,
+                        away_team_id=away_team_id,
+                        home_team_id=home_team_id,
+                        include_actions=False,
+                        include_all_actions=False,
+                        load_snapshot=load_pbp_state if PBP_STATE_SNAPSHOTS else None,
+                        save_snapshot=save_pbp_state if PBP_STATE_SNAPSHOTS and not is_play_final else None,
+                        roster=roster,
+                    )
+                if is_play_final:
+                    evict_playbyplay_state(game_id)
+                if PBP_SCHEMA_VERSION == 2:
+                    with metrics.timer('encodeColumnar'):
+                        processed = encode_playbyplay_v2(processed, actions)
                 upload_json_to_s3(
-                    s3_client=s3_client,
+                    s3_client=get_s3_client(),
                     bucket=BUCKET,
                     prefix=PREFIX,
                     key=f"processed-data/playByPlayData/{game_id}.json",
                     data=processed,
                     is_final=is_play_final,
+                    skip_unchanged=True,
+                    publish_patch=True,
+                    sibling_codecs=get_payload_codecs(),
+                    metrics=metrics.prefixed('play'),
                 )
 
             updates['play_etag'] = play_etag
@@ -344,12 +667,16 @@ def process_game(game_item, user_agent=None):
         is_game_final = status_text.startswith('Final')
 
         upload_json_to_s3(
-            s3_client=s3_client,
+            s3_client=get_s3_client(),
             bucket=BUCKET,
             prefix=PREFIX,
             key=f"boxData/{game_id}.json",
             data=box_game,
             is_final=is_game_final,
+            skip_unchanged=True,
+            publish_patch=True,
+            sibling_codecs=get_payload_codecs(),
+            metrics=metrics.prefixed('box'),
         )
 
         # Cache stable IDs so play-by-play processing can run even if boxscore is a 304 later.
@@ -369,12 +696,76 @@ def process_game(game_item, user_agent=None):
             'awayTeamId': away_team_id,
         })
 
-    # --- 3. Update DB ---
+    # --- 3. Update DB (only what changed; flushed with the rest of the poll) ---
     if updates:
-        update_ddb_game(game_id, game_item['date'], updates)
+        metrics.put('changedAttributes', len(writes.record(game_item, updates)))
 
     return is_game_final
 
+def get_payload_codecs():
+    global _payload_codecs
+    with _payload_codecs_lock:
+        if _payload_codecs is None:
+            _payload_codecs = sibling_codecs(
+                PAYLOAD_CODECS,
+                s3_client=get_s3_client(),
+                bucket=BUCKET,
+                zstd_dict_key=ZSTD_DICT_KEY,
+            )
+    return _payload_codecs
+
+def load_pbp_state(game_id):
+    return load_json_snapshot(
+        s3_client=get_s3_client(),
+        bucket=BUCKET,
+        key=f"{PBP_STATE_PREFIX}{game_id}.state",
+    )
+
+def save_pbp_state(game_id, snapshot):
+    save_json_snapshot(
+        s3_client=get_s3_client(),
+        bucket=BUCKET,
+        key=f"{PBP_STATE_PREFIX}{game_id}.state",
+        data=snapshot,
+    )
+
+def new_pending_writes():
+    return PendingWrites(STATE_ATTRS if POLLER_STATE_TABLE else ())
+
+def flush_writes(writes, metrics=None):
+    """Sends the DynamoDB writes collected during a poll (see nba_game_poller/ddb_writes.py)."""
+    metrics = metrics or Metrics(METRICS_SERVICE, enabled=False)
+    if not len(writes):
+        return
+    with metrics.timer('ddbFlush'):
+        games, states = writes.flush(update_game=update_ddb_game, put_states=save_poller_states)
+    metrics.put('ddbGameWrites', games)
+    metrics.put('ddbStateWrites', states)
+
+def load_poller_state(games):
+    """Merges each game's bookkeeping from the poller state table into its item."""
+    if not POLLER_STATE_TABLE or not games:
+        return
+    try:
+        states = batch_get_items(get_ddb(), POLLER_STATE_TABLE, STATE_KEY, [game['id'] for game in games])
+    except ClientError as e:
+        print(f"Poller state load error: {e}")
+        return
+    for game in games:
+        state = states.get(game['id'])
+        if state:
+            game.update({k: state[k] for k in STATE_ATTRS if k in state})
+
+def save_poller_states(states):
+    expires_at = int(time.time()) + STATE_TTL_SEC
+    try:
+        unwritten = batch_put_items(get_ddb(), POLLER_STATE_TABLE, [{**state, 'expiresAt': expires_at} for state in states])
+    except ClientError as e:
+        print(f"Poller state write error: {e}")
+        return
+    if unwritten:
+        print(f"Poller state: {unwritten} items left unwritten after retries")
+
 def update_ddb_game(game_id, date_str, updates):
     exp_parts = []
     exp_names = {}
@@ -388,12 +779,13 @@ def update_ddb_game(game_id, date_str, updates):
         exp_values[attr_val] = v
 
     try:
-        table.update_item(
-            Key={'PK': f"GAME#{game_id}", 'SK': f"DATE#{date_str}"},
-            UpdateExpression="SET " + ", ".join(exp_parts),
-            ExpressionAttributeNames=exp_names,
-            ExpressionAttributeValues=exp_values
-        )
+        with _ddb_lock:
+            with_throttle_retry(lambda: get_table().update_item(
+                Key={'PK': f"GAME#{game_id}", 'SK': f"DATE#{date_str}"},
+                UpdateExpression="SET " + ", ".join(exp_parts),
+                ExpressionAttributeNames=exp_names,
+                ExpressionAttributeValues=exp_values
+            ))
     except ClientError as e:
         print(f"DDB Update Error {game_id}: {e}")
 
@@ -493,7 +885,7 @@ def has_game_started(game, now_et):
 
 def get_games_from_ddb(date_str):
     try:
-        resp = table.query(
+        resp = get_table().query(
             IndexName=DDB_GSI,
             KeyConditionExpression=Key('date').eq(date_str)
         )
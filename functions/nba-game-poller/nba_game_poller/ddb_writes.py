@@ -0,0 +1,149 @@
+"""
+Coalesced DynamoDB writes for one poll.
+
+NBA_Games is provisioned at 1 WCU, and every write to it goes through the
+stream to gameDateUpdates. So the poller only writes the attributes whose
+values actually changed. Its own bookkeeping (ETags, scoreboard fingerprint,
+last poll time) goes to a separate on-demand poller state table with no stream.
+
+Writes are collected while games are polled and flushed once at the end:
+one UpdateItem per changed game, and the state items in BatchWriteItem
+chunks. Throttled calls and unprocessed items are retried with backoff.
+"""
+import random
+import threading
+import time
+
+from botocore.exceptions import ClientError
+
+from nba_game_poller.scoreboard_plan import FINGERPRINT_ATTR, POLLED_AT_ATTR
+
+
+STATE_ATTRS = ("play_etag", "box_etag", FINGERPRINT_ATTR, POLLED_AT_ATTR)
+STATE_KEY = "gameId"
+# State items expire on their own once a game is long over.
+STATE_TTL_SEC = 3 * 24 * 60 * 60
+
+THROTTLE_ERRORS = {
+    "ProvisionedThroughputExceededException",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+}
+MAX_ATTEMPTS = 6
+BASE_DELAY_SEC = 0.1
+BATCH_WRITE_MAX = 25
+BATCH_GET_MAX = 100
+
+
+def changed_attributes(item, updates):
+    """The entries of `updates` that differ from `item` (DynamoDB's Decimals compare equal to ints)."""
+    return {k: v for k, v in updates.items() if k not in item or item[k] != v}
+
+
+def _backoff(attempt, sleep):
+    # Full jitter: spreads retries from concurrent writers.
+    sleep(random.uniform(0, BASE_DELAY_SEC * (2 ** attempt)))
+
+
+def with_throttle_retry(call, sleep=time.sleep):
+    """Runs `call()`, retrying throttling errors with exponential backoff."""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return call()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in THROTTLE_ERRORS or attempt == MAX_ATTEMPTS - 1:
+                raise
+            _backoff(attempt, sleep)
+
+
+def batch_put_items(dynamodb, table_name, items, sleep=time.sleep):
+    """
+    Writes `items` with BatchWriteItem, 25 at a time, resending unprocessed
+    items with backoff. Returns the number of items left unwritten.
+    """
+    unwritten = 0
+    for start in range(0, len(items), BATCH_WRITE_MAX):
+        requests = [{"PutRequest": {"Item": item}} for item in items[start:start + BATCH_WRITE_MAX]]
+        for attempt in range(MAX_ATTEMPTS):
+            resp = with_throttle_retry(
+                lambda: dynamodb.batch_write_item(RequestItems={table_name: requests}),
+                sleep=sleep,
+            )
+            requests = (resp.get("UnprocessedItems") or {}).get(table_name) or []
+            if not requests:
+                break
+            _backoff(attempt, sleep)
+        unwritten += len(requests)
+    return unwritten
+
+
+def batch_get_items(dynamodb, table_name, key_name, key_values, sleep=time.sleep):
+    """{key value: item} for the keys that exist, via BatchGetItem (100 keys a call)."""
+    found = {}
+    key_values = list(dict.fromkeys(key_values))
+    for start in range(0, len(key_values), BATCH_GET_MAX):
+        keys = [{key_name: value} for value in key_values[start:start + BATCH_GET_MAX]]
+        for attempt in range(MAX_ATTEMPTS):
+            resp = with_throttle_retry(
+                lambda: dynamodb.batch_get_item(RequestItems={table_name: {"Keys": keys}}),
+                sleep=sleep,
+            )
+            for item in (resp.get("Responses") or {}).get(table_name, []):
+                found[item[key_name]] = item
+            keys = ((resp.get("UnprocessedKeys") or {}).get(table_name) or {}).get("Keys") or []
+            if not keys:
+                break
+            _backoff(attempt, sleep)
+    return found
+
+
+class PendingWrites:
+    """
+    Changed attributes per game, collected from the worker threads of one poll.
+    With `state_attrs` empty, bookkeeping stays on the game item as before.
+    """
+
+    def __init__(self, state_attrs=STATE_ATTRS):
+        self.state_attrs = tuple(state_attrs)
+        self._games = {}
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def record(self, game_item, updates):
+        """Files what `updates` changes on `game_item`, then applies them to it."""
+        state = {k: v for k, v in updates.items() if k in self.state_attrs}
+        visible = {k: v for k, v in updates.items() if k not in self.state_attrs}
+        changed = changed_attributes(game_item, visible)
+        state_changed = changed_attributes(game_item, state)
+        game_item.update(updates)
+
+        game_id = game_item["id"]
+        with self._lock:
+            if changed:
+                pending = self._games.setdefault(game_id, {"date": game_item["date"], "attrs": {}})
+                pending["attrs"].update(changed)
+            if state_changed:
+                # Put replaces the whole item, so send every bookkeeping attribute.
+                self._states[game_id] = {
+                    STATE_KEY: game_id,
+                    **{k: game_item[k] for k in self.state_attrs if game_item.get(k) is not None},
+                }
+        return changed
+
+    def __len__(self):
+        with self._lock:
+            return len(self._games) + len(self._states)
+
+    def flush(self, *, update_game, put_states):
+        """
+        Sends everything recorded so far: `update_game(game_id, date, attrs)` per
+        changed game, then `put_states([state items])` once.
+        """
+        with self._lock:
+            games, self._games = self._games, {}
+            states, self._states = self._states, {}
+        for game_id, pending in games.items():
+            update_game(game_id, pending["date"], pending["attrs"])
+        if states:
+            put_states(list(states.values()))
+        return len(games), len(states)
@@ -1,8 +1,12 @@
 import gzip
-import json
+import http.client
 import random
-import urllib.error
-import urllib.request
+import threading
+import time
+import urllib.parse
+import zlib
+
+from nba_shared import jsoncodec
 
 
 USER_AGENTS = [
@@ -19,53 +23,200 @@ USER_AGENTS = [
 ]
 
 
-def fetch_nba_data_urllib(url, etag=None, user_agent=None):
+class HostRateLimiter:
+    """
+    Thread-safe per-host request spacing for concurrent polling.
+    Each host gets at most `requests_per_second`, with a random jitter added to every
+    slot so the CDN doesn't see perfectly periodic traffic.
     """
-    Fetch JSON from NBA CDN using only the stdlib, supporting ETag 304 short-circuiting.
+
+    def __init__(self, requests_per_second, jitter_ratio=0.5, clock=time.monotonic, sleep=time.sleep):
+        self._interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._jitter = self._interval * jitter_ratio
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def acquire(self, url, deadline=None):
+        """
+        Blocks until the host of `url` may be requested again.
+        Returns False (without waiting) if the slot would land after `deadline`.
+        """
+        host = urllib.parse.urlsplit(url).hostname or ""
+        with self._lock:
+            now = self._clock()
+            slot = max(now, self._next_slot.get(host, now))
+            if self._jitter:
+                slot += random.uniform(0, self._jitter)
+            if deadline is not None and slot > deadline:
+                return False
+            self._next_slot[host] = slot + self._interval
+
+        delay = slot - now
+        if delay > 0:
+            self._sleep(delay)
+        return True
+
+
+# Errors that mean a pooled keep-alive socket was closed by the server while idle.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    http.client.CannotSendRequest,
+    http.client.ResponseNotReady,
+    ConnectionResetError,
+    BrokenPipeError,
+    ConnectionAbortedError,
+)
+
+
+class KeepAliveHttpClient:
+    """
+    Minimal thread-safe HTTP/1.1 client that keeps idle connections per host and
+    reuses them across calls (and across warm Lambda invocations when held at
+    module level), so repeat requests skip the TCP + TLS handshake.
+    """
+
+    def __init__(self, timeout=5, max_idle_per_host=8, max_idle_seconds=240, clock=time.monotonic):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.max_idle_seconds = max_idle_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._idle = {}
+        self.connections_opened = 0
+
+    def get(self, url, headers=None):
+        """Returns (status, headers, body). Retries once on a fresh socket if a pooled one went stale."""
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        conn, reused = self._checkout(key)
+        try:
+            return self._send(key, conn, path, headers)
+        except _STALE_CONNECTION_ERRORS:
+            if not reused:
+                raise
+        return self._send(key, self._new_connection(key), path, headers)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _ in conns:
+                conn.close()
+
+    def _send(self, key, conn, path, headers):
+        try:
+            conn.request("GET", path, headers=headers or {})
+            response = conn.getresponse()
+            # The body must be drained before the socket can carry another request.
+            body = response.read()
+        except Exception:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._checkin(key, conn)
+        return response.status, response.headers, body
+
+    def _checkout(self, key):
+        now = self._clock()
+        with self._lock:
+            conns = self._idle.get(key) or []
+            while conns:
+                conn, idle_since = conns.pop()
+                if now - idle_since <= self.max_idle_seconds:
+                    return conn, True
+                conn.close()
+        return self._new_connection(key), False
+
+    def _checkin(self, key, conn):
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) < self.max_idle_per_host:
+                conns.append((conn, self._clock()))
+                return
+        conn.close()
+
+    def _new_connection(self, key):
+        scheme, host, port = key
+        with self._lock:
+            self.connections_opened += 1
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+
+# Module-level so pooled connections to cdn.nba.com outlive a single invocation.
+CDN_CLIENT = KeepAliveHttpClient()
+
+
+def fetch_nba_data_urllib(url, etag=None, user_agent=None, client=None, metrics=None):
+    """
+    Fetch JSON from NBA CDN over a pooled keep-alive connection, supporting ETag 304 short-circuiting.
+    With `metrics` (nba_shared.metrics), records fetchMs, parseMs, responseBytes and notModified.
     Returns: (data_or_None, etag_or_original)
     """
     if not user_agent:
         user_agent = random.choice(USER_AGENTS)
+    client = client or CDN_CLIENT
 
-    req = urllib.request.Request(url)
-    req.add_header("User-Agent", user_agent)
-    req.add_header("Accept", "application/json, text/plain, */*")
-    req.add_header("Accept-Language", "en-US,en;q=0.9")
-    req.add_header("Referer", "https://www.nba.com/")
-    req.add_header("Origin", "https://www.nba.com")
-    req.add_header("Connection", "keep-alive")
-    req.add_header("Accept-Encoding", "gzip, deflate")
+    headers = {
+        "User-Agent": user_agent,
+        "Accept": "application/json, text/plain, */*",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Referer": "https://www.nba.com/",
+        "Origin": "https://www.nba.com",
+        "Connection": "keep-alive",
+        "Accept-Encoding": "gzip, deflate",
+    }
 
     if etag:
-        req.add_header("If-None-Match", etag)
+        headers["If-None-Match"] = etag
 
+    start = time.perf_counter()
     try:
-        with urllib.request.urlopen(req, timeout=5) as response:
-            if response.status != 200:
-                return None, etag
-
-            content = response.read()
-            if content.startswith(b"\x1f\x8b"):
-                try:
-                    content = gzip.decompress(content)
-                except OSError:
-                    pass
-
-            try:
-                data = json.loads(content)
-            except json.JSONDecodeError:
-                print(f"JSON Decode Error for {url}")
-                return None, etag
-
-            new_etag = response.getheader("ETag")
-            return data, new_etag
-
-    except urllib.error.HTTPError as e:
-        if e.code == 304:
-            return None, etag
-        print(f"Network Error {url}: {e.code} {e.reason}")
-        return None, etag
+        status, response_headers, content = client.get(url, headers)
     except Exception as e:
         print(f"Network Exception {url}: {e}")
         return None, etag
+    if metrics is not None:
+        metrics.put("fetchMs", (time.perf_counter() - start) * 1000.0, "Milliseconds")
+        metrics.put("notModified", 1 if status == 304 else 0)
+
+    if status == 304:
+        return None, etag
+    if status != 200:
+        print(f"Network Error {url}: {status}")
+        return None, etag
+
+    if content.startswith(b"\x1f\x8b"):
+        try:
+            content = gzip.decompress(content)
+        except OSError:
+            pass
+    elif (response_headers.get("Content-Encoding") or "").lower() == "deflate":
+        try:
+            content = zlib.decompress(content)
+        except zlib.error:
+            pass
+
+    start = time.perf_counter()
+    try:
+        data = jsoncodec.loads(content)
+    except jsoncodec.JSONDecodeError:
+        print(f"JSON Decode Error for {url}")
+        return None, etag
+    if metrics is not None:
+        metrics.put("parseMs", (time.perf_counter() - start) * 1000.0, "Milliseconds")
+        metrics.put("responseBytes", len(content), "Bytes")
 
+    new_etag = response_headers.get("ETag")
+    return data, new_etag
@@ -0,0 +1,89 @@
+"""
+Compact JSON deltas between two versions of a published payload.
+
+A patch is a list of ops applied in order:
+  {"op": "set", "path": [...], "value": v}          replace (or add) the value at path
+  {"op": "append", "path": [...], "from": n, "values": [...]}
+                                                      extend the list at path, which must have length n
+  {"op": "remove", "path": [...]}                     delete a dict key
+Paths are lists of dict keys and list indices. Mirrors front/src/helpers/patches.js.
+"""
+
+
+def compute_patch(prev, new, ignore=()):
+    """Ops that turn `prev` into `new`. Top-level keys in `ignore` are left out."""
+    ops = []
+    if isinstance(prev, dict) and isinstance(new, dict):
+        prev = {k: v for k, v in prev.items() if k not in ignore}
+        new = {k: v for k, v in new.items() if k not in ignore}
+    _diff(prev, new, [], ops)
+    return ops
+
+
+def _diff(prev, new, path, ops):
+    if prev == new:
+        return
+
+    if isinstance(prev, dict) and isinstance(new, dict):
+        for k, v in new.items():
+            if k not in prev:
+                ops.append({"op": "set", "path": path + [k], "value": v})
+            else:
+                _diff(prev[k], v, path + [k], ops)
+        for k in prev:
+            if k not in new:
+                ops.append({"op": "remove", "path": path + [k]})
+        return
+
+    if isinstance(prev, list) and isinstance(new, list):
+        n = len(prev)
+        # Play-by-play structures only ever grow at the end.
+        if len(new) > n and new[:n] == prev:
+            ops.append({"op": "append", "path": path, "from": n, "values": new[n:]})
+            return
+        # Box score player lists keep their order and change stats in place.
+        if len(new) == n and _same_identities(prev, new):
+            for i, (p, q) in enumerate(zip(prev, new)):
+                _diff(p, q, path + [i], ops)
+            return
+
+    ops.append({"op": "set", "path": path, "value": new})
+
+
+def _same_identities(prev, new):
+    for p, q in zip(prev, new):
+        if not (isinstance(p, dict) and isinstance(q, dict)):
+            return False
+        if p.get("personId") != q.get("personId"):
+            return False
+    return True
+
+
+def apply_patch(doc, ops):
+    """Applies `ops` in place and returns the document. Raises ValueError if they don't fit."""
+    for op in ops:
+        path = op["path"]
+        kind = op["op"]
+        if kind == "set" and not path:
+            doc = op["value"]
+            continue
+
+        if kind == "append":
+            target = doc
+            for part in path:
+                target = target[part]
+            if len(target) != op["from"]:
+                raise ValueError(f"Append base mismatch at {path}")
+            target.extend(op["values"])
+            continue
+
+        parent = doc
+        for part in path[:-1]:
+            parent = parent[part]
+        if kind == "set":
+            parent[path[-1]] = op["value"]
+        elif kind == "remove":
+            parent.pop(path[-1], None)
+        else:
+            raise ValueError(f"Unknown patch op {kind}")
+    return doc
@@ -0,0 +1,127 @@
+"""
+Compression codecs for published payloads.
+
+gzip is what browsers fetch and is always written. Other codecs are written as
+siblings next to it (`<key>.json.zst`) for consumers that can decode them.
+
+zstd uses the stdlib `compression.zstd` (Python 3.14+) and is skipped when that
+module is missing. It can use a trained dictionary, which does much better than
+gzip on small, repetitive box score and play-by-play payloads. Dictionaries are
+stored under `{prefix}codecs/zstd/<dictId>.dict`. The dictId is also in every zstd
+frame header, so a reader can tell which dictionary an object needs.
+"""
+import gzip
+
+try:
+    from compression import zstd
+except ImportError:  # Python < 3.14
+    zstd = None
+
+
+ZSTD_DEFAULT_LEVEL = 9
+ZSTD_DICT_SIZE = 112_640
+DICTIONARY_METADATA_KEY = "zstd-dict"
+
+
+def zstd_available():
+    return zstd is not None
+
+
+class GzipCodec:
+    name = "gzip"
+    suffix = ".gz"
+    content_type = "application/json"
+    content_encoding = "gzip"
+
+    def __init__(self, level=9):
+        self.level = level
+
+    def compress(self, data):
+        return gzip.compress(data, compresslevel=self.level)
+
+    def decompress(self, data):
+        return gzip.decompress(data)
+
+    def metadata(self):
+        return {}
+
+
+class ZstdCodec:
+    name = "zstd"
+    suffix = ".zst"
+    # Dictionary frames can't be decoded by a plain Content-Encoding: zstd client.
+    content_type = "application/zstd"
+    content_encoding = None
+
+    def __init__(self, level=ZSTD_DEFAULT_LEVEL, dictionary=None, dictionary_key=None):
+        if zstd is None:
+            raise RuntimeError("zstd needs the compression.zstd module (Python 3.14+)")
+        self.level = level
+        self.dictionary = dictionary
+        self.dictionary_key = dictionary_key
+
+    def compress(self, data):
+        return zstd.compress(data, level=self.level, zstd_dict=self.dictionary)
+
+    def decompress(self, data):
+        return zstd.decompress(data, zstd_dict=self.dictionary)
+
+    def metadata(self):
+        return {DICTIONARY_METADATA_KEY: self.dictionary_key} if self.dictionary_key else {}
+
+
+def dictionary_key(prefix, dict_id):
+    return f"{prefix}codecs/zstd/{dict_id}.dict"
+
+
+def train_zstd_dictionary(samples, size=ZSTD_DICT_SIZE):
+    """Trains a zstd dictionary from encoded sample payloads (bytes)."""
+    if zstd is None:
+        raise RuntimeError("zstd needs the compression.zstd module (Python 3.14+)")
+    return zstd.train_dict(samples, size)
+
+
+def load_zstd_dictionary(*, s3_client, bucket, key):
+    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    return zstd.ZstdDict(body)
+
+
+def publish_zstd_dictionary(*, s3_client, bucket, prefix, dictionary):
+    """Uploads a trained dictionary under its dictId and returns the key."""
+    key = dictionary_key(prefix, dictionary.dict_id)
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=dictionary.dict_content,
+        ContentType="application/octet-stream",
+        # Keyed by dictId, so it never changes once written.
+        CacheControl="public, max-age=31536000, immutable",
+    )
+    return key
+
+
+def sibling_codecs(names, *, s3_client=None, bucket=None, zstd_dict_key=None, zstd_level=ZSTD_DEFAULT_LEVEL):
+    """
+    Codecs to write next to the gzip object, from a list of names like ["gzip", "zstd"].
+    gzip is always written, so it is never a sibling. Unavailable codecs are skipped.
+    """
+    codecs = []
+    for name in names:
+        if name == "zstd":
+            if not zstd_available():
+                print("zstd requested but compression.zstd is unavailable; writing gzip only")
+                continue
+            dictionary = None
+            if zstd_dict_key:
+                try:
+                    dictionary = load_zstd_dictionary(s3_client=s3_client, bucket=bucket, key=zstd_dict_key)
+                except Exception as e:
+                    print(f"Failed to load zstd dictionary {zstd_dict_key}, compressing without it: {e}")
+            codecs.append(ZstdCodec(
+                level=zstd_level,
+                dictionary=dictionary,
+                dictionary_key=zstd_dict_key if dictionary is not None else None,
+            ))
+        elif name and name != "gzip":
+            print(f"Unknown payload codec {name!r}, ignored")
+    return codecs
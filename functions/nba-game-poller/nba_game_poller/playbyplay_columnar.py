@@ -0,0 +1,272 @@
+"""
+schemaVersion 2 of the processed play-by-play payload: a columnar re-encoding of v1.
+
+v1 stores each action as a full dict, once per player list it belongs to (and
+again under allActions/actions when those are enabled). v2 stores every action
+once, as a row of a column table, and everything else refers to rows by index:
+
+  rows:               {"count": n, "columns": {key: [value per row]}, "dicts": {key: [distinct values]}}
+                      Columns in DICT_COLUMNS hold indices into dicts[key]; clock
+                      columns hold numeric seconds; integers in DELTA_COLUMNS are
+                      stored as the difference from the previous integer in the
+                      column. Missing/None values are null.
+  scoreTimeline:      {"away": [...], "home": [...], "clock": [seconds], "period": [...]}
+  scoreSeries:        as in v1 (already flat numeric arrays; see build_score_series)
+  awayActions/homeActions:             {playerName: [row, ...]}
+  awayPlayerTimeline/homePlayerTimeline: {playerName: [period, startSec, endSec, ...]}
+  allActions/actions (when enabled):   [row, ...]
+
+Rows are added in feed order (assists right after the action they came from) and
+dictionaries grow by appending, so successive payloads differ by appends and
+patches stay small. Mirrors front/src/helpers/playByPlayV2.js.
+"""
+import json
+
+from nba_game_poller.playbyplay_processing import time_to_seconds
+
+
+SCHEMA_VERSION = 2
+
+# Low-cardinality fields that repeat on most rows.
+DICT_COLUMNS = frozenset({
+    "personId",
+    "teamId",
+    "actionType",
+    "subType",
+    "descriptor",
+    "qualifiers",
+    "playerName",
+    "playerNameI",
+    "teamTricode",
+    "shotResult",
+    "location",
+    "area",
+    "areaDetail",
+    "side",
+})
+CLOCK_COLUMNS = frozenset({"clock"})
+# Near-sequential counters.
+DELTA_COLUMNS = frozenset({"actionNumber", "actionId", "orderNumber"})
+
+
+def seconds_to_clock(seconds):
+    minutes, secs = divmod(round(seconds * 100), 6000)
+    return f"PT{int(minutes):02d}M{secs / 100:05.2f}S"
+
+
+def encode_clock(clock):
+    """Numeric seconds for an ISO clock string; anything that wouldn't round-trip is kept as is."""
+    if not isinstance(clock, str):
+        return clock
+    seconds = time_to_seconds(clock)
+    return seconds if seconds_to_clock(seconds) == clock else clock
+
+
+def decode_clock(value):
+    return seconds_to_clock(value) if isinstance(value, (int, float)) else value
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+class ColumnTable:
+    def __init__(self):
+        self.count = 0
+        self.columns = {}
+        self.dicts = {}
+        self._dict_index = {}
+        self._last_ints = {}
+
+    def add(self, action):
+        row = self.count
+        self.count += 1
+        for key, value in action.items():
+            column = self.columns.get(key)
+            if column is None:
+                column = self.columns[key] = [None] * row
+            column.append(self._encode(key, value))
+        for column in self.columns.values():
+            if len(column) < self.count:
+                column.append(None)
+        return row
+
+    def _encode(self, key, value):
+        if value is None:
+            return None
+        if key in CLOCK_COLUMNS:
+            return encode_clock(value)
+        if key in DELTA_COLUMNS and _is_int(value):
+            delta = value - self._last_ints.get(key, 0)
+            self._last_ints[key] = value
+            return delta
+        if key in DICT_COLUMNS:
+            index = self._dict_index.setdefault(key, {})
+            # Strings (nearly every value) are their own token; lists and dicts
+            # go through JSON, tagged so they can't collide with a string.
+            token = value if isinstance(value, str) else (json.dumps(value, sort_keys=True),)
+            if token not in index:
+                index[token] = len(index)
+                self.dicts.setdefault(key, []).append(value)
+            return index[token]
+        return value
+
+    def to_json(self):
+        return {"count": self.count, "columns": self.columns, "dicts": self.dicts}
+
+
+def _action_key(action):
+    """
+    Identity of an action within one game's feed: actionId in the older feed
+    (its actionNumbers repeat), orderNumber/actionNumber in the current one.
+    Injected assists carry "<id>a" strings, so they never collide with feed actions.
+    """
+    return (action.get("actionId"), action.get("orderNumber"), action.get("actionNumber"))
+
+
+def encode_playbyplay_v2(payload, actions):
+    """
+    Re-encodes a v1 payload (from `build_playbyplay_payload`) as schemaVersion 2.
+    `actions` is the feed the payload was built from; it fixes the row order.
+    """
+    player_maps = (payload.get("awayActions") or {}, payload.get("homeActions") or {})
+    include_actions = "actions" in payload
+
+    # Player-list entries are matched to feed actions by identity fields, not by
+    # object (state restored from a snapshot, or carried over from earlier polls,
+    # holds other copies) and not by content (serializing every action on every
+    # poll would cost as much as the incremental processing saves).
+    referenced = set()
+    assists = {}
+    feed_keys = [_action_key(a) for a in actions or []]
+    feed_key_set = set(feed_keys)
+    for player_map in player_maps:
+        for acts in player_map.values():
+            for a in acts:
+                key = _action_key(a)
+                if key in feed_key_set:
+                    referenced.add(key)
+                else:
+                    assists.setdefault(str(a.get("actionNumber"))[:-1], {})[key] = a
+
+    table = ColumnTable()
+    rows = {}
+    action_rows = []
+    for a, key in zip(actions or [], feed_keys):
+        if include_actions or key in referenced:
+            if key not in rows:
+                rows[key] = table.add(a)
+            action_rows.append(rows[key])
+        for assist_key, assist in assists.pop(str(a.get("actionNumber")), {}).items():
+            if assist_key not in rows:
+                rows[assist_key] = table.add(assist)
+    for leftovers in assists.values():
+        for assist_key, assist in leftovers.items():
+            if assist_key not in rows:
+                rows[assist_key] = table.add(assist)
+
+    def row_lists(player_map):
+        return {name: [rows[_action_key(a)] for a in acts] for name, acts in player_map.items()}
+
+    timeline = payload.get("scoreTimeline") or []
+    encoded = {
+        "schemaVersion": SCHEMA_VERSION,
+        "gameId": payload.get("gameId"),
+        "generatedAt": payload.get("generatedAt"),
+        "awayTeamId": payload.get("awayTeamId"),
+        "homeTeamId": payload.get("homeTeamId"),
+        "numPeriods": payload.get("numPeriods"),
+        "lastAction": payload.get("lastAction"),
+        "rows": table.to_json(),
+        "scoreTimeline": {
+            "away": [s.get("away") for s in timeline],
+            "home": [s.get("home") for s in timeline],
+            "clock": [encode_clock(s.get("clock")) for s in timeline],
+            "period": [s.get("period") for s in timeline],
+        },
+        "awayActions": row_lists(player_maps[0]),
+        "homeActions": row_lists(player_maps[1]),
+        "awayPlayerTimeline": _encode_playtimes(payload.get("awayPlayerTimeline") or {}),
+        "homePlayerTimeline": _encode_playtimes(payload.get("homePlayerTimeline") or {}),
+    }
+    if "scoreSeries" in payload:
+        encoded["scoreSeries"] = payload["scoreSeries"]
+    if "allActions" in payload:
+        encoded["allActions"] = [rows[_action_key(a)] for a in payload["allActions"]]
+    if include_actions:
+        encoded["actions"] = action_rows
+    return encoded
+
+
+def _encode_playtimes(playtimes):
+    flat = {}
+    for name, stints in playtimes.items():
+        values = []
+        for stint in stints:
+            values.extend((stint.get("period"), encode_clock(stint.get("start")), encode_clock(stint.get("end"))))
+        flat[name] = values
+    return flat
+
+
+def decode_playbyplay_v2(encoded):
+    """Expands a schemaVersion 2 payload back to the v1 shape (None-valued action fields are omitted)."""
+    table = encoded.get("rows") or {}
+    columns = table.get("columns") or {}
+    dicts = table.get("dicts") or {}
+    row_dicts = [{} for _ in range(table.get("count") or 0)]
+    for key, column in columns.items():
+        last_int = 0
+        for row, value in enumerate(column):
+            if value is None:
+                continue
+            if key in CLOCK_COLUMNS:
+                value = decode_clock(value)
+            elif key in DELTA_COLUMNS and _is_int(value):
+                last_int += value
+                value = last_int
+            elif key in DICT_COLUMNS:
+                value = dicts[key][value]
+            row_dicts[row][key] = value
+
+    timeline = encoded.get("scoreTimeline") or {}
+    score_timeline = [
+        {"away": away, "home": home, "clock": decode_clock(clock), "period": period}
+        for away, home, clock, period in zip(
+            timeline.get("away", []), timeline.get("home", []), timeline.get("clock", []), timeline.get("period", [])
+        )
+    ]
+
+    decoded = {
+        "schemaVersion": 1,
+        "gameId": encoded.get("gameId"),
+        "generatedAt": encoded.get("generatedAt"),
+        "awayTeamId": encoded.get("awayTeamId"),
+        "homeTeamId": encoded.get("homeTeamId"),
+        "numPeriods": encoded.get("numPeriods"),
+        "lastAction": encoded.get("lastAction"),
+        "scoreTimeline": score_timeline,
+        "awayActions": {n: [row_dicts[r] for r in rs] for n, rs in (encoded.get("awayActions") or {}).items()},
+        "homeActions": {n: [row_dicts[r] for r in rs] for n, rs in (encoded.get("homeActions") or {}).items()},
+        "awayPlayerTimeline": _decode_playtimes(encoded.get("awayPlayerTimeline") or {}),
+        "homePlayerTimeline": _decode_playtimes(encoded.get("homePlayerTimeline") or {}),
+    }
+    if "scoreSeries" in encoded:
+        decoded["scoreSeries"] = encoded["scoreSeries"]
+    if "allActions" in encoded:
+        decoded["allActions"] = [row_dicts[r] for r in encoded["allActions"]]
+    if "actions" in encoded:
+        decoded["actions"] = [row_dicts[r] for r in encoded["actions"]]
+    return decoded
+
+
+def _decode_playtimes(flat):
+    playtimes = {}
+    for name, values in flat.items():
+        stints = []
+        for i in range(0, len(values), 3):
+            stint = {"start": decode_clock(values[i + 1]), "period": values[i]}
+            if values[i + 2] is not None:
+                stint["end"] = decode_clock(values[i + 2])
+            stints.append(stint)
+        playtimes[name] = stints
+    return playtimes
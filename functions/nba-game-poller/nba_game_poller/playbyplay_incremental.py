@@ -0,0 +1,268 @@
+import hashlib
+import json
+
+from nba_game_poller.playbyplay_processing import (
+    add_action_to_players,
+    append_score_changes,
+    apply_playtimes_action,
+    build_playbyplay_payload,
+    count_periods,
+    end_playtimes,
+    normalize_team_id,
+)
+from nba_game_poller.roster_index import PlayerIndex
+
+
+# 2: adds the roster and the personId -> player key memo.
+# 3: one scoreTimeline entry per scoring action (version 2 states could hold two).
+SNAPSHOT_VERSION = 3
+
+# Warm-container cache: game_id -> PlayByPlayState. Survives between invocations
+# for as long as AWS keeps the execution environment around.
+_STATE_CACHE = {}
+
+
+def _edit_stamp(action):
+    """(actionNumber, edited) for feeds that stamp each action when it is corrected."""
+    edited = action.get("edited")
+    return None if edited is None else (action.get("actionNumber"), edited)
+
+
+def _chain_digest(prev_digest, action):
+    """Rolling digest over the processed actions, independent of how they were batched."""
+    encoded = json.dumps(action, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha1(prev_digest.encode("ascii") + encoded).hexdigest()
+
+
+class PlayByPlayState:
+    """
+    Running state of `process_playbyplay_payload` for one game.
+    Feeding it the actions in any number of batches yields the same payload as a
+    single full pass over the whole list.
+    """
+
+    def __init__(self, away_team_id, home_team_id, roster=None):
+        self.away_team_id = away_team_id
+        self.home_team_id = home_team_id
+        self.index = PlayerIndex(roster)
+        self.actions = []
+        self.stamps = []
+        self.digest = ""
+        self.score_timeline = []
+        self.score_away = "0"
+        self.score_home = "0"
+        self.away_players = {}
+        self.home_players = {}
+        self.away_playtimes = {}
+        self.home_playtimes = {}
+        self.current_q = 1
+
+    def can_extend(self, actions):
+        """
+        True when `actions` still starts with the actions already processed.
+        The live feed bumps an action's `edited` stamp whenever it corrects it,
+        so comparing (actionNumber, edited) pairs catches an edit anywhere in
+        the game without comparing every field of every action; feeds without
+        stamps fall back to comparing the actions themselves.
+        """
+        n = len(self.actions)
+        if len(actions) < n:
+            return False
+        if n == 0:
+            return True
+        if actions[n - 1] != self.actions[-1]:
+            return False
+        if None in self.stamps:
+            return actions[:n] == self.actions
+        return [_edit_stamp(a) for a in actions[:n]] == self.stamps
+
+    def apply(self, new_actions):
+        for a in new_actions:
+            self.score_away, self.score_home = append_score_changes(
+                a, self.score_timeline, self.score_away, self.score_home
+            )
+            add_action_to_players(
+                a, self.away_players, self.home_players, self.away_team_id, self.home_team_id, self.index
+            )
+            _sync_playtimes(self.away_players, self.away_playtimes)
+            _sync_playtimes(self.home_players, self.home_playtimes)
+            self.current_q = apply_playtimes_action(
+                a,
+                self.current_q,
+                self.away_playtimes,
+                self.home_playtimes,
+                self.away_team_id,
+                self.home_team_id,
+                self.index,
+            )
+            self.digest = _chain_digest(self.digest, a)
+            self.actions.append(a)
+            self.stamps.append(_edit_stamp(a))
+
+    def to_payload(self, game_id, include_actions=True, include_all_actions=True):
+        last_action = self.actions[-1] if self.actions else None
+        return build_playbyplay_payload(
+            game_id=game_id,
+            away_team_id=self.away_team_id,
+            home_team_id=self.home_team_id,
+            num_periods=count_periods(last_action),
+            last_action=last_action,
+            score_timeline=list(self.score_timeline),
+            away_players={name: list(acts) for name, acts in self.away_players.items()},
+            home_players={name: list(acts) for name, acts in self.home_players.items()},
+            away_playtimes=_finish_playtimes(self.away_players, self.away_playtimes, last_action),
+            home_playtimes=_finish_playtimes(self.home_players, self.home_playtimes, last_action),
+            actions=list(self.actions),
+            include_actions=include_actions,
+            include_all_actions=include_all_actions,
+        )
+
+    def to_snapshot(self):
+        return {
+            "snapshotVersion": SNAPSHOT_VERSION,
+            "awayTeamId": self.away_team_id,
+            "homeTeamId": self.home_team_id,
+            "actionCount": len(self.actions),
+            "digest": self.digest,
+            "scoreTimeline": self.score_timeline,
+            "scoreAway": self.score_away,
+            "scoreHome": self.score_home,
+            "awayPlayers": self.away_players,
+            "homePlayers": self.home_players,
+            "awayPlaytimes": self.away_playtimes,
+            "homePlaytimes": self.home_playtimes,
+            "currentQ": self.current_q,
+            "playerIndex": self.index.to_snapshot(),
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot, actions):
+        """
+        Restores a snapshot against the current feed. Returns None if the snapshot
+        is unusable or the feed no longer starts with the actions it covered.
+        """
+        if not snapshot or snapshot.get("snapshotVersion") != SNAPSHOT_VERSION:
+            return None
+        count = snapshot.get("actionCount") or 0
+        if count > len(actions):
+            return None
+
+        digest = ""
+        for a in actions[:count]:
+            digest = _chain_digest(digest, a)
+        if digest != snapshot.get("digest"):
+            return None
+
+        state = cls(snapshot.get("awayTeamId"), snapshot.get("homeTeamId"))
+        state.actions = list(actions[:count])
+        state.stamps = [_edit_stamp(a) for a in state.actions]
+        state.digest = digest
+        state.score_timeline = snapshot.get("scoreTimeline") or []
+        state.score_away = snapshot.get("scoreAway", "0")
+        state.score_home = snapshot.get("scoreHome", "0")
+        state.away_players = snapshot.get("awayPlayers") or {}
+        state.home_players = snapshot.get("homePlayers") or {}
+        state.away_playtimes = snapshot.get("awayPlaytimes") or {}
+        state.home_playtimes = snapshot.get("homePlaytimes") or {}
+        state.current_q = snapshot.get("currentQ", 1)
+        state.index = PlayerIndex.from_snapshot(snapshot.get("playerIndex"))
+        return state
+
+
+def _sync_playtimes(players, playtimes):
+    # A full rebuild seeds every known player up front; seeding them on first
+    # sight is equivalent because an unseen player's state machine is untouched.
+    for name in players:
+        if name not in playtimes:
+            playtimes[name] = {"times": [], "on": False}
+
+
+def _finish_playtimes(players, playtimes, last_action):
+    # Match the key order of a full rebuild: known players first, then any
+    # names only discovered by the substitution parser.
+    ordered = {}
+    for name in players:
+        if name in playtimes:
+            ordered[name] = _copy_playtime(playtimes[name])
+    for name, pt in playtimes.items():
+        if name not in ordered:
+            ordered[name] = _copy_playtime(pt)
+    return end_playtimes(ordered, last_action)
+
+
+def _copy_playtime(pt):
+    return {"times": [dict(t) for t in pt.get("times", [])], "on": pt.get("on")}
+
+
+def process_playbyplay_incremental(
+    *,
+    game_id,
+    actions,
+    away_team_id=None,
+    home_team_id=None,
+    include_actions=True,
+    include_all_actions=True,
+    load_snapshot=None,
+    save_snapshot=None,
+    roster=None,
+):
+    """
+    Incremental counterpart of `process_playbyplay_payload`.
+    Resumes from the cached state for `game_id` (or a snapshot from `load_snapshot`)
+    and applies only the new actions; falls back to a full rebuild whenever the
+    feed edited or removed actions that were already processed.
+    `roster` updates the state's roster; None keeps the one it already has,
+    for polls where the box score came back unchanged.
+    """
+    away_team_id = normalize_team_id(away_team_id)
+    home_team_id = normalize_team_id(home_team_id)
+    actions = actions or []
+
+    state = _STATE_CACHE.get(game_id)
+    # A rebuild keeps the roster when this poll didn't bring one.
+    roster = roster or (state.index.roster if state is not None else None)
+    if state is not None and not _matches(state, actions, away_team_id, home_team_id):
+        print(f"PBP State: feed for {game_id} changed upstream, rebuilding")
+        state = None
+
+    if state is None and load_snapshot is not None:
+        try:
+            state = PlayByPlayState.from_snapshot(load_snapshot(game_id), actions)
+        except Exception as e:
+            print(f"PBP State: snapshot load failed for {game_id}: {e}")
+            state = None
+        if state is not None and not _matches(state, actions, away_team_id, home_team_id):
+            state = None
+
+    if state is None:
+        state = PlayByPlayState(away_team_id, home_team_id, roster)
+    elif roster:
+        state.index.set_roster(roster)
+
+    new_actions = actions[len(state.actions):]
+    state.apply(new_actions)
+    _STATE_CACHE[game_id] = state
+
+    if new_actions and save_snapshot is not None:
+        try:
+            save_snapshot(game_id, state.to_snapshot())
+        except Exception as e:
+            print(f"PBP State: snapshot save failed for {game_id}: {e}")
+
+    return state.to_payload(
+        game_id,
+        include_actions=include_actions,
+        include_all_actions=include_all_actions,
+    )
+
+
+def _matches(state, actions, away_team_id, home_team_id):
+    return (
+        state.away_team_id == away_team_id
+        and state.home_team_id == home_team_id
+        and state.can_extend(actions)
+    )
+
+
+def evict_playbyplay_state(game_id):
+    _STATE_CACHE.pop(game_id, None)
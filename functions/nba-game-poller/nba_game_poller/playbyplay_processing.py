@@ -1,6 +1,8 @@
 import re
 from datetime import datetime, timezone
 
+from nba_game_poller.roster_index import PlayerIndex
+
 
 _CLOCK_RE = re.compile(r"PT(\d+)M(\d+)\.(\d+)S")
 
@@ -17,6 +19,24 @@ def time_to_seconds(clock):
     return minutes * 60 + seconds + milliseconds / 100.0
 
 
+def period_start_seconds(period):
+    """Elapsed seconds when `period` tips off: 12-minute quarters, then 5-minute overtimes."""
+    if period <= 4:
+        return (period - 1) * 720
+    return 2880 + (period - 5) * 300
+
+
+def period_length_seconds(period):
+    return 720 if period <= 4 else 300
+
+
+def elapsed_seconds(action):
+    """Seconds since tip-off for an action (partialBox.js elapsedSecondsFromStart)."""
+    period = int(action.get("period") or 1)
+    remaining = time_to_seconds(action.get("clock") or "PT12M00.00S")
+    return max(0.0, period_start_seconds(period) + period_length_seconds(period) - remaining)
+
+
 def fix_player_name(action):
     player_name = action.get("playerName")
     description = action.get("description") or ""
@@ -32,35 +52,154 @@ def fix_player_name(action):
     return player_name
 
 
+def player_key(action, index=None):
+    """
+    Name an action is filed under. With a PlayerIndex a player keeps the first
+    name seen for their personId, so later actions skip the description scan.
+    """
+    if index is None:
+        return fix_player_name(action)
+    person_id = action.get("personId")
+    key = index.keys.get(person_id)
+    if key is None:
+        key = fix_player_name(action)
+        if person_id and key:
+            index.keys[person_id] = key
+    return key
+
+
 def process_score_timeline(actions):
     score_timeline = []
     s_away = "0"
     s_home = "0"
     for a in actions or []:
-        if (a.get("scoreAway") or "") != "":
-            if a.get("scoreAway") != s_away:
-                score_timeline.append(
-                    {
-                        "away": a.get("scoreAway"),
-                        "home": a.get("scoreHome"),
-                        "clock": a.get("clock"),
-                        "period": a.get("period"),
-                    }
-                )
-                s_away = a.get("scoreAway")
-            if a.get("scoreHome") != s_home:
-                score_timeline.append(
-                    {
-                        "away": a.get("scoreAway"),
-                        "home": a.get("scoreHome"),
-                        "clock": a.get("clock"),
-                        "period": a.get("period"),
-                    }
-                )
-                s_home = a.get("scoreHome")
+        s_away, s_home = append_score_changes(a, score_timeline, s_away, s_home)
     return score_timeline
 
 
+def append_score_changes(a, score_timeline, s_away, s_home):
+    """Applies one action to the score timeline; returns the updated (away, home) scores."""
+    if (a.get("scoreAway") or "") != "":
+        if a.get("scoreAway") != s_away or a.get("scoreHome") != s_home:
+            score_timeline.append(
+                {
+                    "away": a.get("scoreAway"),
+                    "home": a.get("scoreHome"),
+                    "clock": a.get("clock"),
+                    "period": a.get("period"),
+                }
+            )
+            s_away = a.get("scoreAway")
+            s_home = a.get("scoreHome")
+    return s_away, s_home
+
+
+# Bucket widths, in elapsed seconds, of the downsampled score series levels.
+SCORE_SERIES_BUCKETS = (60, 240)
+# Unanswered points that make a run worth marking on the score graph.
+RUN_MIN_POINTS = 8
+
+
+def _score_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _series_time(seconds):
+    return int(seconds) if seconds == int(seconds) else round(seconds, 2)
+
+
+def build_score_series(score_timeline, last_action=None):
+    """
+    Level-of-detail score series for the score graph, as flat numeric arrays:
+
+      t, away, home:  the exact series, one point per elapsed second (seconds
+                      since tip-off) at which the score changed
+      lastSecond:     elapsed seconds at the last action
+      levels:         [{"bucket": s, "margin": [...], "lead": [...]}] for each s in
+                      SCORE_SERIES_BUCKETS; entry i covers seconds [i * s, (i + 1) * s).
+                      margin is away minus home at the end of the bucket, lead the
+                      margin of largest magnitude reached in it, so coarse
+                      graphs keep their peaks
+      leadChanges:    [t, side, ...]; side (1 away, -1 home) took the lead from the other
+      runs:           [start, end, side, points, ...] for unanswered runs of at
+                      least RUN_MIN_POINTS
+    """
+    t, away, home = [], [], []
+    for s in score_timeline or []:
+        second = _series_time(elapsed_seconds(s))
+        if t and t[-1] == second:
+            away[-1], home[-1] = _score_int(s.get("away")), _score_int(s.get("home"))
+            continue
+        t.append(second)
+        away.append(_score_int(s.get("away")))
+        home.append(_score_int(s.get("home")))
+
+    last_second = int(elapsed_seconds(last_action)) if last_action else 0
+    if t:
+        last_second = max(last_second, int(t[-1]))
+
+    levels = []
+    for bucket in SCORE_SERIES_BUCKETS:
+        margin, lead = [], []
+        current = 0
+        j = 0
+        for i in range(last_second // bucket + 1):
+            peak = current
+            while j < len(t) and t[j] < (i + 1) * bucket:
+                current = away[j] - home[j]
+                if abs(current) > abs(peak):
+                    peak = current
+                j += 1
+            margin.append(current)
+            lead.append(peak)
+        levels.append({"bucket": bucket, "margin": margin, "lead": lead})
+
+    lead_changes = []
+    runs = []
+    leader = 0
+    run = None  # [start, end, side, points]
+    prev_away = prev_home = 0
+    for second, a, h in zip(t, away, home):
+        margin = a - h
+        side = (margin > 0) - (margin < 0)
+        if side and side != leader:
+            if leader:
+                lead_changes.extend((second, side))
+            leader = side
+
+        scored_away, scored_home = a - prev_away, h - prev_home
+        prev_away, prev_home = a, h
+        if scored_away > 0 and scored_home == 0:
+            scorer, points = 1, scored_away
+        elif scored_home > 0 and scored_away == 0:
+            scorer, points = -1, scored_home
+        else:
+            # Both sides at once, or a score correction: nothing is unanswered.
+            scorer, points = 0, 0
+        if run and run[2] == scorer:
+            run[1] = second
+            run[3] += points
+            continue
+        if run and run[3] >= RUN_MIN_POINTS:
+            runs.extend(run)
+        run = [second, second, scorer, points] if scorer else None
+    if run and run[3] >= RUN_MIN_POINTS:
+        runs.extend(run)
+
+    return {
+        "t": t,
+        "away": away,
+        "home": home,
+        "lastSecond": last_second,
+        "levels": levels,
+        "leadChanges": lead_changes,
+        "runs": runs,
+    }
+
+
 def _normalize_special_cases(name, team_tricode):
     if name == "Porter" and team_tricode == "CLE":
         return "Porter Jr."
@@ -69,18 +208,39 @@ def _normalize_special_cases(name, team_tricode):
     return name
 
 
-def add_assist_actions(action, players):
+def _sub_in_name(action, index=None):
+    """Incoming player's key for an old-format "SUB: X FOR Y" action."""
+    desc = action.get("description") or ""
+    start_name = desc.find("SUB:") + 5
+    end_name = desc.find("FOR") - 1
+    name = desc[start_name:end_name]
+    if index is not None:
+        key = index.resolve(action.get("teamId"), name)
+        if key:
+            return key
+    return _normalize_special_cases(name, action.get("teamTricode"))
+
+
+def add_assist_actions(action, players, index=None):
     desc = action.get("description") or ""
     start_name = desc.rfind("(") + 1
-    last_space = desc.rfind(" ")
-    end_name = start_name + (desc[start_name:last_space].rfind(" ") if last_space > start_name else -1)
-    name = desc[start_name:end_name] if end_name > start_name else desc[start_name:last_space]
-    name = _normalize_special_cases(name, action.get("teamTricode"))
+    assist_id = action.get("assistPersonId") if index is not None else None
+    name = index.person_key(assist_id) if assist_id else None
+    if not name:
+        last_space = desc.rfind(" ")
+        end_name = start_name + (desc[start_name:last_space].rfind(" ") if last_space > start_name else -1)
+        name = desc[start_name:end_name] if end_name > start_name else desc[start_name:last_space]
+        assist_id = index.find(action.get("teamId"), name) if index is not None else None
+        name = (assist_id and index.person_key(assist_id)) or _normalize_special_cases(name, action.get("teamTricode"))
 
     if name not in players:
         players[name] = []
 
     first = players[name][0] if players[name] else {}
+    if not first and assist_id and assist_id in index.players:
+        # No action of theirs yet: take the identity from the roster.
+        player = index.players[assist_id]
+        first = {"personId": assist_id, "playerName": player["familyName"], "playerNameI": player["nameI"]}
     base_id = action.get("actionId") or action.get("actionNumber")
     assist_action = {
         "actionType": "Assist",
@@ -101,43 +261,38 @@ def add_assist_actions(action, players):
     return players
 
 
-def create_players(actions, away_team_id, home_team_id):
+def create_players(actions, away_team_id, home_team_id, index=None):
     away_players = {}
     home_players = {}
 
     for a in actions or []:
-        player_name = fix_player_name(a)
-        if not player_name:
-            continue
-
-        team_id = a.get("teamId")
-        description = a.get("description") or ""
-        action_type = a.get("actionType")
-
-        if team_id == away_team_id:
-            away_players.setdefault(player_name, []).append(a)
-            if "AST" in description:
-                away_players = add_assist_actions(a, away_players)
-            if action_type == "Substitution":
-                start_name = description.find("SUB:") + 5
-                end_name = description.find("FOR") - 1
-                name = description[start_name:end_name]
-                name = _normalize_special_cases(name, a.get("teamTricode"))
-                away_players.setdefault(name, [])
-        elif team_id == home_team_id:
-            home_players.setdefault(player_name, []).append(a)
-            if "AST" in description:
-                home_players = add_assist_actions(a, home_players)
-            if action_type == "Substitution":
-                start_name = description.find("SUB:") + 5
-                end_name = description.find("FOR") - 1
-                name = description[start_name:end_name]
-                name = _normalize_special_cases(name, a.get("teamTricode"))
-                home_players.setdefault(name, [])
+        add_action_to_players(a, away_players, home_players, away_team_id, home_team_id, index)
 
     return {"awayPlayers": away_players, "homePlayers": home_players}
 
 
+def add_action_to_players(a, away_players, home_players, away_team_id, home_team_id, index=None):
+    """Files one action (plus any assist / sub-in entries) under its team's player map."""
+    player_name = player_key(a, index)
+    if not player_name:
+        return
+
+    team_id = a.get("teamId")
+    if team_id == away_team_id:
+        players = away_players
+    elif team_id == home_team_id:
+        players = home_players
+    else:
+        return
+
+    description = a.get("description") or ""
+    players.setdefault(player_name, []).append(a)
+    if "AST" in description:
+        add_assist_actions(a, players, index)
+    if a.get("actionType") == "Substitution":
+        players.setdefault(_sub_in_name(a, index), [])
+
+
 def create_playtimes(players):
     playtimes = {}
     for player in (players or {}).keys():
@@ -145,16 +300,12 @@ def create_playtimes(players):
     return playtimes
 
 
-def update_playtimes_with_action(action, playtimes):
-    player_name = fix_player_name(action)
+def update_playtimes_with_action(action, playtimes, index=None):
+    player_name = player_key(action, index)
     action_type = action.get("actionType")
 
     if action_type == "Substitution":
-        desc = action.get("description") or ""
-        start_name = desc.find("SUB:") + 5
-        end_name = desc.find("FOR") - 1
-        name = desc[start_name:end_name]
-        name = _normalize_special_cases(name, action.get("teamTricode"))
+        name = _sub_in_name(action, index)
 
         if name not in playtimes:
             playtimes[name] = {"times": [], "on": False}
@@ -176,9 +327,13 @@ def update_playtimes_with_action(action, playtimes):
 
     elif action_type == "substitution":
         desc = action.get("description") or ""
-        name = desc[desc.find(":") + 2 :]
-        if name == "Yang":
-            name = "Hansen"
+        if index is not None and player_name and action.get("personId"):
+            # The subject is the action's own player; the description may spell them differently.
+            name = player_name
+        else:
+            name = desc[desc.find(":") + 2 :]
+            if name == "Yang":
+                name = "Hansen"
 
         if name not in playtimes:
             playtimes[name] = {"times": [], "on": False}
@@ -284,31 +439,24 @@ def process_playbyplay_payload(
     home_team_id=None,
     include_actions=True,
     include_all_actions=True,
+    roster=None,
 ):
     """
     Produces the same derived structures as the frontend hook `useGameTimeline`,
     so the UI can render play-by-play without doing heavy transforms client-side.
+    `roster` (roster_index.roster_from_boxscore) lets substitutions and assists
+    resolve by personId instead of by the names in their descriptions.
     """
-    try:
-        away_team_id = int(away_team_id) if away_team_id is not None else None
-    except Exception:
-        away_team_id = None
-    try:
-        home_team_id = int(home_team_id) if home_team_id is not None else None
-    except Exception:
-        home_team_id = None
+    away_team_id = normalize_team_id(away_team_id)
+    home_team_id = normalize_team_id(home_team_id)
 
     actions = actions or []
     last_action = actions[-1] if actions else None
-    num_periods = 4
-    try:
-        if last_action and (last_action.get("period") or 0) > 4:
-            num_periods = int(last_action.get("period"))
-    except Exception:
-        pass
+    num_periods = count_periods(last_action)
 
     score_timeline = process_score_timeline(actions)
-    players = create_players(actions, away_team_id, home_team_id)
+    index = PlayerIndex(roster)
+    players = create_players(actions, away_team_id, home_team_id, index)
     away_players = players["awayPlayers"]
     home_players = players["homePlayers"]
 
@@ -317,20 +465,78 @@ def process_playbyplay_payload(
 
     current_q = 1
     for a in actions:
-        period = a.get("period") or 1
-        if period != current_q:
-            away_playtimes = quarter_change(away_playtimes)
-            home_playtimes = quarter_change(home_playtimes)
-            current_q = period
-
-        if away_team_id is not None and a.get("teamId") == away_team_id:
-            away_playtimes = update_playtimes_with_action(a, away_playtimes)
-        if home_team_id is not None and a.get("teamId") == home_team_id:
-            home_playtimes = update_playtimes_with_action(a, home_playtimes)
+        current_q = apply_playtimes_action(
+            a, current_q, away_playtimes, home_playtimes, away_team_id, home_team_id, index
+        )
 
     away_playtimes = end_playtimes(away_playtimes, last_action)
     home_playtimes = end_playtimes(home_playtimes, last_action)
 
+    return build_playbyplay_payload(
+        game_id=game_id,
+        away_team_id=away_team_id,
+        home_team_id=home_team_id,
+        num_periods=num_periods,
+        last_action=last_action,
+        score_timeline=score_timeline,
+        away_players=away_players,
+        home_players=home_players,
+        away_playtimes=away_playtimes,
+        home_playtimes=home_playtimes,
+        actions=actions,
+        include_actions=include_actions,
+        include_all_actions=include_all_actions,
+    )
+
+
+def apply_playtimes_action(a, current_q, away_playtimes, home_playtimes, away_team_id, home_team_id, index=None):
+    """Advances both teams' playtime state machines by one action; returns the current period."""
+    period = a.get("period") or 1
+    if period != current_q:
+        quarter_change(away_playtimes)
+        quarter_change(home_playtimes)
+        current_q = period
+
+    if away_team_id is not None and a.get("teamId") == away_team_id:
+        update_playtimes_with_action(a, away_playtimes, index)
+    if home_team_id is not None and a.get("teamId") == home_team_id:
+        update_playtimes_with_action(a, home_playtimes, index)
+    return current_q
+
+
+def count_periods(last_action):
+    num_periods = 4
+    try:
+        if last_action and (last_action.get("period") or 0) > 4:
+            num_periods = int(last_action.get("period"))
+    except Exception:
+        pass
+    return num_periods
+
+
+def normalize_team_id(team_id):
+    try:
+        return int(team_id) if team_id is not None else None
+    except Exception:
+        return None
+
+
+def build_playbyplay_payload(
+    *,
+    game_id,
+    away_team_id,
+    home_team_id,
+    num_periods,
+    last_action,
+    score_timeline,
+    away_players,
+    home_players,
+    away_playtimes,
+    home_playtimes,
+    actions,
+    include_actions=True,
+    include_all_actions=True,
+):
     payload = {
         "schemaVersion": 1,
         "gameId": game_id,
@@ -340,6 +546,7 @@ def process_playbyplay_payload(
         "numPeriods": num_periods,
         "lastAction": last_action,
         "scoreTimeline": score_timeline,
+        "scoreSeries": build_score_series(score_timeline, last_action),
         "awayActions": away_players,
         "homeActions": home_players,
         "awayPlayerTimeline": away_playtimes,
@@ -0,0 +1,120 @@
+"""
+Per-game poll cadence for the in-invocation poll loop.
+
+Each game's next poll time depends on what the scoreboard says it is doing:
+close late games every 10 s, ordinary live play every 20 s, breaks and blowouts
+less often. A shared request budget (the old fixed cost of two feed requests
+per game per minute) goes to the most urgent due games first, so the loop
+doesn't make more requests than the fixed schedule did, only better-placed ones.
+"""
+import time
+
+from nba_game_poller.playbyplay_processing import time_to_seconds
+
+
+CRUNCH = "crunch"
+LIVE = "live"
+PERIOD_BREAK = "period_break"
+BLOWOUT = "blowout"
+HALFTIME = "halftime"
+PREGAME = "pregame"
+FINAL = "final"
+
+# Seconds until the next poll, by phase. None: stop polling the game this invocation.
+CADENCE_SEC = {
+    CRUNCH: 10,
+    LIVE: 20,
+    PERIOD_BREAK: 30,
+    BLOWOUT: 45,
+    HALFTIME: 90,
+    PREGAME: 60,
+    FINAL: None,
+}
+# Lower polls first when the budget is short.
+PRIORITY = {CRUNCH: 0, LIVE: 1, PERIOD_BREAK: 2, BLOWOUT: 3, HALFTIME: 4, PREGAME: 5, FINAL: 6}
+
+CRUNCH_CLOCK_SEC = 5 * 60
+CRUNCH_MARGIN = 8
+BLOWOUT_MARGIN = 25
+LATE_BLOWOUT_MARGIN = 18
+
+
+def _score(team):
+    try:
+        return int((team or {}).get("score") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def game_phase(sb_game):
+    """The phase of a todaysScoreboard game entry; LIVE when there is no entry."""
+    if not sb_game:
+        return LIVE
+    status = sb_game.get("gameStatus")
+    text = (sb_game.get("gameStatusText") or "").strip().lower()
+    if status == 3 or text.startswith("final"):
+        return FINAL
+    if status == 1:
+        return PREGAME
+    if "half" in text:
+        return HALFTIME
+    clock = time_to_seconds(sb_game.get("gameClock"))
+    if clock <= 0 or text.startswith("end"):
+        return PERIOD_BREAK
+
+    period = sb_game.get("period") or 1
+    margin = abs(_score(sb_game.get("homeTeam")) - _score(sb_game.get("awayTeam")))
+    if margin <= CRUNCH_MARGIN and (period > 4 or (period == 4 and clock <= CRUNCH_CLOCK_SEC)):
+        return CRUNCH
+    if margin >= BLOWOUT_MARGIN or (period >= 4 and margin >= LATE_BLOWOUT_MARGIN):
+        return BLOWOUT
+    return LIVE
+
+
+class PollScheduler:
+    """
+    Next-poll times per game plus the invocation's request budget.
+    """
+
+    def __init__(self, game_ids, request_budget=None, clock=time.monotonic):
+        self.clock = clock
+        now = clock()
+        self._next = {game_id: now for game_id in game_ids}
+        self._phase = {game_id: LIVE for game_id in game_ids}
+        self.requests_left = request_budget
+
+    def due(self, slack=0.0):
+        """Games due now (or within `slack` seconds), most urgent first."""
+        now = self.clock()
+        due = [game_id for game_id, at in self._next.items() if at <= now + slack]
+        return sorted(due, key=lambda game_id: (PRIORITY[self._phase[game_id]], self._next[game_id]))
+
+    def reschedule(self, game_id, phase):
+        """Sets the game's next poll from its phase; a FINAL game is dropped."""
+        cadence = CADENCE_SEC[phase]
+        if cadence is None:
+            self.drop(game_id)
+            return
+        self._phase[game_id] = phase
+        self._next[game_id] = self.clock() + cadence
+
+    def drop(self, game_id):
+        self._next.pop(game_id, None)
+        self._phase.pop(game_id, None)
+
+    def next_due(self):
+        return min(self._next.values()) if self._next else None
+
+    def affordable(self, requests):
+        return self.requests_left is None or requests <= self.requests_left
+
+    def charge(self, requests):
+        """Spends budget; False (and nothing spent) if there isn't enough left."""
+        if not self.affordable(requests):
+            return False
+        if self.requests_left is not None:
+            self.requests_left -= requests
+        return True
+
+    def __len__(self):
+        return len(self._next)
@@ -0,0 +1,135 @@
+"""
+personId-keyed player identity for one game, built from the box score rosters.
+
+Every action carries its own player's personId, but a substitution names the
+incoming player and a made shot names the assister only in the description
+("SUB: Roby FOR Bates-Diop", "(Jones 1 AST)"), and those spellings don't
+always match playerName ("Porter" for "Porter Jr.", "Jokic" for "Jokić").
+PlayerIndex resolves such references to a personId: assistPersonId when the
+feed has it, else the team's roster names. It also remembers the name each
+personId was first filed under, so a player keeps one key for the whole game
+and repeat lookups are a dict hit.
+
+A name two teammates share is left out of the name lookup. Callers parse the
+description for those, as they do when there is no roster at all.
+"""
+import unicodedata
+
+
+_SUFFIXES = {"jr", "jr.", "sr", "sr.", "ii", "iii", "iv", "v"}
+
+
+def roster_from_boxscore(box_game):
+    """
+    Player entries for both teams of a boxscore `game` object, as plain dicts
+    so they can go into the play-by-play state snapshot.
+    """
+    roster = []
+    for side in ("awayTeam", "homeTeam"):
+        team = (box_game or {}).get(side) or {}
+        team_id = team.get("teamId")
+        for p in team.get("players") or []:
+            if not p.get("personId"):
+                continue
+            roster.append({
+                "personId": p["personId"],
+                "teamId": team_id,
+                "firstName": p.get("firstName") or "",
+                "familyName": p.get("familyName") or "",
+                "nameI": p.get("nameI") or "",
+            })
+    return roster
+
+
+def _fold(name):
+    """Case- and accent-insensitive form of a name: 'Jokić' -> 'jokic'."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).strip().lower()
+
+
+def _name_forms(player):
+    """Spellings a description may use for `player`, both as written and folded."""
+    family = player["familyName"]
+    forms = {family, player["nameI"], f"{player['firstName']} {family}"}
+    parts = family.split()
+    if len(parts) > 1 and parts[-1].lower() in _SUFFIXES:
+        forms.add(" ".join(parts[:-1]))
+    forms = {f for f in forms if f.strip()}
+    return forms | {_fold(f) for f in forms}
+
+
+class PlayerIndex:
+    """
+    Roster lookups plus the personId -> payload key memo for one game.
+    `keys` is filled as actions are processed; see playbyplay_processing.player_key.
+    """
+
+    def __init__(self, roster=None, keys=None):
+        self.roster = []
+        self.players = {}
+        self.keys = dict(keys or {})
+        self._names = {}
+        self._shared_family = set()
+        if roster:
+            self.set_roster(roster)
+
+    def set_roster(self, roster):
+        """Replaces the roster lookups. Keys already handed out are kept."""
+        roster = list(roster or [])
+        if roster == self.roster:
+            return
+        self.roster = roster
+        self.players = {p["personId"]: p for p in roster}
+
+        names = {}
+        families = {}
+        for p in roster:
+            for form in _name_forms(p):
+                key = (p["teamId"], form)
+                # None marks a name shared by teammates: it identifies neither.
+                names[key] = p["personId"] if names.get(key, p["personId"]) == p["personId"] else None
+            family = (p["teamId"], _fold(p["familyName"]))
+            families[family] = families.get(family, 0) + 1
+        self._names = names
+        self._shared_family = {family for family, count in families.items() if count > 1}
+
+    def find(self, team_id, name):
+        """personId of the `team_id` player a description calls `name`, or None."""
+        if not self._names or not name:
+            return None
+        # Most descriptions spell the name as the roster does; fold only when they don't.
+        key = (team_id, name)
+        if key in self._names:
+            return self._names[key]
+        return self._names.get((team_id, _fold(name)))
+
+    def person_key(self, person_id):
+        """
+        Payload key for a player referenced by personId: the name they were
+        first filed under, else their roster family name (nameI when a teammate
+        shares it, as the feed's descriptions do). None if neither is known.
+        """
+        key = self.keys.get(person_id)
+        if key is None:
+            player = self.players.get(person_id)
+            if player is None:
+                return None
+            shared = (player["teamId"], _fold(player["familyName"])) in self._shared_family
+            key = player["nameI"] if shared else player["familyName"]
+            if not key:
+                return None
+            self.keys[person_id] = key
+        return key
+
+    def resolve(self, team_id, name):
+        """Payload key for a name parsed from a description, or None if the roster can't place it."""
+        person_id = self.find(team_id, name)
+        return self.person_key(person_id) if person_id else None
+
+    def to_snapshot(self):
+        return {"roster": self.roster, "keys": [[pid, key] for pid, key in self.keys.items()]}
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        snapshot = snapshot or {}
+        return cls(snapshot.get("roster"), {pid: key for pid, key in snapshot.get("keys") or []})
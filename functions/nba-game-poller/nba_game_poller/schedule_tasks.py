@@ -0,0 +1,69 @@
+"""
+Manager and kickoff tasks: arm the every-minute poller rule for the day.
+
+Only the 'manager' and 'enable_poller' tasks import this module, and they pass
+in their own clients, so a poller cold start never builds the Scheduler client.
+"""
+import json
+from datetime import timedelta
+
+from botocore.exceptions import ClientError
+
+
+KICKOFF_SCHEDULE_NAME = 'NBA_Daily_Kickoff'
+# Kickoff runs this long before the first tip-off.
+KICKOFF_LEAD = timedelta(minutes=15)
+
+
+def plan_kickoff(start_dt, now_utc, lead=KICKOFF_LEAD):
+    """When to enable the poller for a first tip-off at `start_dt`; None means now."""
+    if not start_dt:
+        print("Manager: Games exist but have no valid start time. Enabling immediately.")
+        return None
+
+    kickoff_time = start_dt - lead
+    # If the kickoff time is in the past (or very close), enable immediately
+    if kickoff_time <= now_utc:
+        print(f"Manager: Kickoff time {kickoff_time} is in the past. Enabling Poller now.")
+        return None
+
+    print(f"Manager: First game at {start_dt}. Scheduling kickoff for {kickoff_time}.")
+    return kickoff_time
+
+
+def schedule_kickoff(scheduler_client, run_at_dt, target_arn, role_arn, name=KICKOFF_SCHEDULE_NAME):
+    """Creates the one-time schedule that sends {'task': 'enable_poller'}. Returns False on failure."""
+    at_expression = f"at({run_at_dt.strftime('%Y-%m-%dT%H:%M:%S')})"
+
+    try:
+        # Cleanup old schedule if exists
+        try:
+            scheduler_client.delete_schedule(Name=name)
+        except ClientError:
+            pass
+
+        scheduler_client.create_schedule(
+            Name=name,
+            ScheduleExpression=at_expression,
+            Target={
+                'Arn': target_arn,
+                'RoleArn': role_arn,
+                'Input': json.dumps({'task': 'enable_poller'})
+            },
+            FlexibleTimeWindow={'Mode': 'OFF'}
+        )
+        print(f"Manager: Created one-time schedule '{name}' at {at_expression}")
+        return True
+    except Exception as e:
+        print(f"Manager Error: Failed to schedule kickoff: {e}")
+        return False
+
+
+def enable_rule(events_client, rule_name):
+    print(f"Kickoff: Enabling {rule_name}...")
+    try:
+        events_client.enable_rule(Name=rule_name)
+        print("Kickoff: Success. Polling has begun.")
+    except Exception as e:
+        print(f"Kickoff Error: {e}")
+        raise e
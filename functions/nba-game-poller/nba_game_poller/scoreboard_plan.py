@@ -0,0 +1,77 @@
+"""
+Scoreboard-first polling plan.
+
+One conditional GET of todaysScoreboard_00.json tells us which games moved since
+the last poll (score, clock, period or status), so the per-game play-by-play
+and box score feeds are only fetched for those games. Each game's fingerprint
+from its last productive poll is kept on its NBA_Games item (`sb_fingerprint`).
+
+The per-game feeds can lag the scoreboard. The fingerprint is therefore only
+stored once a poll actually returned new data, and a game whose feeds were both
+304 is polled again on the next run. A game is also polled at least every
+`force_refresh_sec`, to catch feed-only changes (substitutions, corrections)
+made while the scoreboard stands still. Games missing from the scoreboard, or
+every game when the scoreboard can't be fetched, are polled as before.
+"""
+from nba_game_poller.nba_api import fetch_nba_data_urllib
+
+
+SCOREBOARD_URL = "https://cdn.nba.com/static/json/liveData/scoreboard/todaysScoreboard_00.json"
+
+FINGERPRINT_ATTR = "sb_fingerprint"
+POLLED_AT_ATTR = "polled_at"
+
+
+def scoreboard_fingerprint(sb_game):
+    """What the scoreboard says about a game, as one comparable string."""
+    home = sb_game.get("homeTeam") or {}
+    away = sb_game.get("awayTeam") or {}
+    return "|".join(
+        str(v)
+        for v in (
+            home.get("score"),
+            away.get("score"),
+            sb_game.get("period"),
+            sb_game.get("gameClock"),
+            sb_game.get("gameStatus"),
+            (sb_game.get("gameStatusText") or "").strip(),
+        )
+    )
+
+
+def fetch_scoreboard_games(user_agent=None, client=None):
+    """
+    {gameId: scoreboard game}, or None if the scoreboard couldn't be fetched.
+    Always unconditional: a 304 looks the same as a network error from
+    fetch_nba_data_urllib, and a stale scoreboard would hide changes.
+    """
+    data, _ = fetch_nba_data_urllib(SCOREBOARD_URL, None, user_agent, client=client)
+    games = ((data or {}).get("scoreboard") or {}).get("games")
+    if not isinstance(games, list):
+        return None
+    return {g.get("gameId"): g for g in games if g.get("gameId")}
+
+
+def plan_polls(games, scoreboard_games, *, now, force_refresh_sec):
+    """
+    Splits `games` into (to_poll, skipped). Each polled game comes with its plan:
+    {"fingerprint": str or None, "forced": bool}.
+    """
+    if scoreboard_games is None:
+        return [(game, {"fingerprint": None, "forced": True}) for game in games], []
+
+    to_poll, skipped = [], []
+    for game in games:
+        sb_game = scoreboard_games.get(game["id"])
+        if sb_game is None:
+            to_poll.append((game, {"fingerprint": None, "forced": True}))
+            continue
+
+        fingerprint = scoreboard_fingerprint(sb_game)
+        last_polled = float(game.get(POLLED_AT_ATTR) or 0)
+        stale = now - last_polled >= force_refresh_sec
+        if fingerprint != game.get(FINGERPRINT_ATTR) or stale:
+            to_poll.append((game, {"fingerprint": fingerprint, "forced": stale}))
+        else:
+            skipped.append(game)
+    return to_poll, skipped
@@ -1,11 +1,124 @@
+import contextlib
 import gzip
+import hashlib
 import json
+import random
+import time
 
+from botocore.exceptions import ClientError
 
-def upload_json_to_s3(*, s3_client, bucket, prefix, key, data, is_final=False):
-    json_str = json.dumps(data)
-    compressed = gzip.compress(json_str.encode("utf-8"))
+from nba_game_poller.patches import compute_patch
+from nba_shared import jsoncodec
 
+
+# Top-level payload fields that change on every build without changing what clients see.
+VOLATILE_FIELDS = ("generatedAt", "contentVersion")
+CONTENT_HASH_METADATA_KEY = "content-sha256"
+PATCH_KEY_METADATA_KEY = "patch-key"
+PATCH_BASE_METADATA_KEY = "patch-base-sha256"
+
+# Warm-container memory of the last digest (and, for patched keys, payload) written per S3 key.
+_LAST_UPLOADED_DIGESTS = {}
+_LAST_UPLOADED_PAYLOADS = {}
+
+
+class _NoMetrics:
+    """Stands in for nba_shared.metrics.Metrics when the caller passes none."""
+
+    def timer(self, name):
+        return contextlib.nullcontext()
+
+    def put(self, name, value, unit="Count"):
+        pass
+
+
+_NO_METRICS = _NoMetrics()
+
+
+def _split_volatile(data):
+    if not isinstance(data, dict):
+        return data, {}
+    content = {k: v for k, v in data.items() if k not in VOLATILE_FIELDS}
+    volatile = {k: data[k] for k in VOLATILE_FIELDS if k in data and k != "contentVersion"}
+    return content, volatile
+
+
+def content_digest(data, cache_control=""):
+    """SHA-256 of the jsoncodec bytes of `data` minus volatile fields (plus its Cache-Control)."""
+    return encode_versioned(data, cache_control)[0]
+
+
+def encode_versioned(data, cache_control=""):
+    """
+    (digest, body): the content_digest of `data`, and its jsoncodec bytes with
+    contentVersion stamped in (dicts only). The payload is serialized once: the
+    digest covers exactly the uploaded bytes minus the volatile fields, which
+    are appended to the encoded object afterwards.
+    """
+    content, volatile = _split_volatile(data)
+    encoded = jsoncodec.dumps_bytes(content)
+    digest = hashlib.sha256(cache_control.encode("utf-8") + b"\n" + encoded).hexdigest()
+    if not isinstance(data, dict):
+        return digest, encoded
+    extra = jsoncodec.dumps_bytes({**volatile, "contentVersion": digest})
+    if encoded == b"{}":
+        return digest, extra
+    return digest, encoded[:-1] + b"," + extra[1:]
+
+
+def _stored_digest(s3_client, bucket, full_key):
+    digest = _LAST_UPLOADED_DIGESTS.get(full_key)
+    if digest is not None:
+        return digest
+    # Cold container: the digest of the current object rides along as S3 metadata.
+    try:
+        head = s3_client.head_object(Bucket=bucket, Key=full_key)
+    except Exception:
+        return None
+    digest = (head.get("Metadata") or {}).get(CONTENT_HASH_METADATA_KEY)
+    if digest:
+        _LAST_UPLOADED_DIGESTS[full_key] = digest
+    return digest
+
+
+def patch_key_for(prefix, key, version):
+    base = key[: -len(".json")] if key.endswith(".json") else key
+    # Deliberately not `.json.gz`: patches must not trigger the S3 notifier themselves.
+    return f"{prefix}patches/{base}/{version}.json"
+
+
+def upload_json_to_s3(
+    *,
+    s3_client,
+    bucket,
+    prefix,
+    key,
+    data,
+    is_final=False,
+    skip_unchanged=False,
+    publish_patch=False,
+    sibling_codecs=(),
+    metrics=None,
+):
+    """
+    Gzips `data` to `{prefix}{key}.gz`. With `skip_unchanged`, the PUT (and the
+    S3 event that fans out to WebSocket subscribers) is skipped when the payload
+    only differs from the stored object in volatile fields, and dict payloads
+    are stamped with their `contentVersion`.
+
+    With `publish_patch`, a delta against the previous upload from this container
+    is written first and referenced from the object's metadata, so the notifier
+    can push it to subscribers instead of a "refetch" hint. The payload kept for
+    that delta is dropped once the object is uploaded as final.
+
+    Each codec in `sibling_codecs` (see payload_codecs.py) also gets a copy at
+    `{prefix}{key}{codec.suffix}`. Siblings are written before the gzip object,
+    so they already exist when its S3 event goes out.
+
+    With `metrics` (nba_shared.metrics), records serializeMs, gzipMs, s3PutMs,
+    payloadBytes (gzipped) and unchanged (1 when the PUT was skipped).
+    Returns True if an object was written.
+    """
     cache_control = (
         "public, max-age=604800"
         if is_final
@@ -13,38 +126,217 @@ def upload_json_to_s3(*, s3_client, bucket, prefix, key, data, is_final=False):
     )
     full_key = f"{prefix}{key}.gz"
 
+    if metrics is None:
+        metrics = _NO_METRICS
+    extra_args = {}
+    digest = None
+    if skip_unchanged or publish_patch:
+        with metrics.timer("serialize"):
+            digest, encoded = encode_versioned(data, cache_control)
+        previous_digest = _stored_digest(s3_client, bucket, full_key)
+        if previous_digest == digest:
+            print(f"Unchanged, skipped S3: {full_key}")
+            metrics.put("unchanged", 1)
+            return False
+        metadata = {CONTENT_HASH_METADATA_KEY: digest}
+
+        previous = _LAST_UPLOADED_PAYLOADS.get(full_key)
+        if publish_patch and previous and previous[0] == previous_digest:
+            patch_key = _upload_patch(
+                s3_client=s3_client,
+                bucket=bucket,
+                patch_key=patch_key_for(prefix, key, digest),
+                base_version=previous_digest,
+                version=digest,
+                ops=compute_patch(previous[1], data, ignore=VOLATILE_FIELDS),
+            )
+            metadata[PATCH_KEY_METADATA_KEY] = patch_key
+            metadata[PATCH_BASE_METADATA_KEY] = previous_digest
+        extra_args["Metadata"] = metadata
+    else:
+        with metrics.timer("serialize"):
+            encoded = jsoncodec.dumps_bytes(data)
+
+    for codec in sibling_codecs:
+        sibling_args = {"Metadata": {**extra_args.get("Metadata", {}), **codec.metadata()}}
+        if codec.content_encoding:
+            sibling_args["ContentEncoding"] = codec.content_encoding
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=f"{prefix}{key}{codec.suffix}",
+            Body=codec.compress(encoded),
+            ContentType=codec.content_type,
+            CacheControl=cache_control,
+            **sibling_args,
+        )
+    with metrics.timer("gzip"):
+        compressed = gzip.compress(encoded)
+
+    with metrics.timer("s3Put"):
+        s3_client.put_object(
+            Bucket=bucket,
+            Key=full_key,
+            Body=compressed,
+            ContentType="application/json",
+            ContentEncoding="gzip",
+            CacheControl=cache_control,
+            **extra_args,
+        )
+    metrics.put("payloadBytes", len(compressed), "Bytes")
+    metrics.put("unchanged", 0)
+    if digest is not None:
+        _LAST_UPLOADED_DIGESTS[full_key] = digest
+    if publish_patch:
+        if is_final:
+            # Nothing patches a final object, so don't hold finished games in memory.
+            _LAST_UPLOADED_PAYLOADS.pop(full_key, None)
+        else:
+            _LAST_UPLOADED_PAYLOADS[full_key] = (digest, data)
+    print(f"Uploaded S3: {full_key}")
+    return True
+
+
+def _upload_patch(*, s3_client, bucket, patch_key, base_version, version, ops):
+    patch = {"baseVersion": base_version, "version": version, "ops": ops}
     s3_client.put_object(
         Bucket=bucket,
-        Key=full_key,
-        Body=compressed,
+        Key=patch_key,
+        Body=gzip.compress(jsoncodec.dumps_bytes(patch)),
         ContentType="application/json",
         ContentEncoding="gzip",
-        CacheControl=cache_control,
+        # Content-addressed, so it never changes once written.
+        CacheControl="public, max-age=604800, immutable",
     )
-    print(f"Uploaded S3: {full_key}")
+    return patch_key
 
 
-def update_manifest(*, s3_client, bucket, manifest_key, game_id):
-    """Loads manifest.json from S3, adds game_id, uploads it back."""
+def save_json_snapshot(*, s3_client, bucket, key, data):
+    """
+    Stores internal poller state. Keys must not end in `.json.gz` so the
+    upload doesn't trigger the WebSocket notifier.
+    """
+    s3_client.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=gzip.compress(jsoncodec.dumps_bytes(data)),
+        ContentType="application/json",
+        ContentEncoding="gzip",
+    )
+
+
+# Without s3:ListBucket on the bucket, S3 answers a GET for a missing key with 403
+# instead of 404, so both mean "not there yet" to the readers below.
+_MISSING_OBJECT_CODES = ("NoSuchKey", "404", "AccessDenied", "403")
+
+
+def load_json_snapshot(*, s3_client, bucket, key):
+    """Returns the snapshot stored by `save_json_snapshot`, or None if there isn't one."""
     try:
+        resp = s3_client.get_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] not in _MISSING_OBJECT_CODES:
+            raise
+        return None
+    body = resp["Body"].read()
+    if body.startswith(b"\x1f\x8b"):
+        body = gzip.decompress(body)
+    return jsoncodec.loads(body)
+
+
+# Manifest of final game IDs, partitioned by season:
+#   manifest/index.json          {"schemaVersion": 1, "shards": {"2024-25": "data/manifest/2024-25.json", ...}}
+#   manifest/<season>.json       ["0022400001", ...]
+MANIFEST_SCHEMA_VERSION = 1
+MANIFEST_MAX_ATTEMPTS = 5
+# Shards this container has already seen in the root index.
+_KNOWN_MANIFEST_SHARDS = set()
+
+
+def manifest_shard_for(game_id):
+    """Season shard for an NBA game ID ("0022400123" -> "2024-25")."""
+    if isinstance(game_id, str) and len(game_id) >= 5 and game_id[3:5].isdigit():
+        year = 2000 + int(game_id[3:5])
+        return f"{year}-{(year + 1) % 100:02d}"
+    return "other"
+
+
+def manifest_index_key(prefix):
+    return f"{prefix}manifest/index.json"
+
+
+def manifest_shard_key(prefix, shard):
+    return f"{prefix}manifest/{shard}.json"
+
+
+def conditional_update_json(*, s3_client, bucket, key, mutate, empty, max_attempts=MANIFEST_MAX_ATTEMPTS, sleep=time.sleep):
+    """
+    Read-modify-write of a small JSON object that is safe against concurrent writers:
+    the PUT is conditional on the ETag that was read (or on the key not existing yet)
+    and is retried from a fresh read when another writer got there first.
+    `mutate(doc)` returns the new document, or None when no write is needed.
+    Returns True if this call wrote the object.
+    """
+    for attempt in range(max_attempts):
         try:
-            resp = s3_client.get_object(Bucket=bucket, Key=manifest_key)
-            content = resp["Body"].read().decode("utf-8")
-            manifest = set(json.loads(content))
-        except Exception:
-            manifest = set()
+            resp = s3_client.get_object(Bucket=bucket, Key=key)
+            doc = json.loads(resp["Body"].read().decode("utf-8"))
+            condition = {"IfMatch": resp["ETag"]}
+        except ClientError as e:
+            if e.response["Error"]["Code"] not in _MISSING_OBJECT_CODES:
+                raise
+            doc = empty()
+            condition = {"IfNoneMatch": "*"}
 
-        if game_id in manifest:
-            return
+        updated = mutate(doc)
+        if updated is None:
+            return False
 
-        manifest.add(game_id)
-        s3_client.put_object(
-            Bucket=bucket,
-            Key=manifest_key,
-            Body=json.dumps(list(manifest)),
-            ContentType="application/json",
-        )
-        print(f"Manifest updated with {game_id}")
+        try:
+            s3_client.put_object(
+                Bucket=bucket,
+                Key=key,
+                Body=json.dumps(updated),
+                ContentType="application/json",
+                **condition,
+            )
+            return True
+        except ClientError as e:
+            # 412: the object changed since we read it; 409: a concurrent conditional write won.
+            if e.response["Error"]["Code"] not in ("PreconditionFailed", "ConditionalRequestConflict"):
+                raise
+            sleep(random.uniform(0.05, 0.2) * (attempt + 1))
+    raise RuntimeError(f"Gave up updating {key} after {max_attempts} conflicting writes")
+
+
+def update_manifest(*, s3_client, bucket, prefix, game_id):
+    """Adds game_id to its season shard of the manifest, registering the shard in the root index."""
+    shard = manifest_shard_for(game_id)
+    shard_key = manifest_shard_key(prefix, shard)
+
+    def add_game(ids):
+        if game_id in ids:
+            return None
+        return ids + [game_id]
+
+    def add_shard(index):
+        if index.get("shards", {}).get(shard) == shard_key:
+            return None
+        return {
+            "schemaVersion": MANIFEST_SCHEMA_VERSION,
+            "shards": {**index.get("shards", {}), shard: shard_key},
+        }
+
+    try:
+        if conditional_update_json(s3_client=s3_client, bucket=bucket, key=shard_key, mutate=add_game, empty=list):
+            print(f"Manifest updated with {game_id}")
+        if shard not in _KNOWN_MANIFEST_SHARDS:
+            conditional_update_json(
+                s3_client=s3_client,
+                bucket=bucket,
+                key=manifest_index_key(prefix),
+                mutate=add_shard,
+                empty=dict,
+            )
+            _KNOWN_MANIFEST_SHARDS.add(shard)
     except Exception as e:
         print(f"Manifest Error: {e}")
-
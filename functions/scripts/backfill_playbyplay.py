@@ -0,0 +1,344 @@
+"""
+Rebuilds processed-data/playByPlayData for past games from their raw feeds.
+
+    # S3 -> S3, every core, resumable
+    python functions/scripts/backfill_playbyplay.py --bucket roryeagan.com-nba-processed-data
+
+    # Preview: diff the new payloads against what is stored, write nothing
+    python functions/scripts/backfill_playbyplay.py --bucket ... --dry-run
+
+    # Local mirrors of data/playByPlayData/ and data/boxData/ -> local output directory
+    python functions/scripts/backfill_playbyplay.py --source-dir raw/ --box-dir box/ --output-dir processed/
+
+Sources are the raw `data/playByPlayData/{id}.json.gz` objects the poller writes
+once a game is final (or `{id}.json[.gz]` files in --source-dir). Each game's
+stored box score (`data/boxData/{id}.json.gz`, or the file in --box-dir) supplies
+its team IDs and roster, as it does for the poller; games without one fall back
+to team IDs inferred from the actions and name matching. Games are
+reprocessed on a ProcessPoolExecutor. Each worker loads, processes and writes its
+own games, so only small status records come back to the parent.
+
+Writes go through upload_json_to_s3 with skip_unchanged, so games whose output
+didn't change are not rewritten and don't fire the S3 notifier. Finished game
+IDs are appended to --checkpoint in batches, and a rerun skips them. Failed
+games are not checkpointed, so the next run retries them.
+
+Objects are written as final, so CloudFront may keep serving the old version
+for up to a week unless the paths are invalidated.
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../nba-game-poller")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../shared-layer/python")))
+
+from nba_game_poller.patches import compute_patch  # noqa: E402
+from nba_game_poller.playbyplay_columnar import encode_playbyplay_v2  # noqa: E402
+from nba_game_poller.playbyplay_processing import infer_team_ids_from_actions, process_playbyplay_payload  # noqa: E402
+from nba_game_poller.roster_index import roster_from_boxscore  # noqa: E402
+from nba_game_poller.storage import VOLATILE_FIELDS, encode_versioned, upload_json_to_s3  # noqa: E402
+from nba_shared import jsoncodec  # noqa: E402
+
+
+PREFIX = "data/"
+RAW_PREFIX = f"{PREFIX}playByPlayData/"
+PROCESSED_KEY = "processed-data/playByPlayData/{game_id}.json"
+BOX_KEY = f"{PREFIX}boxData/{{game_id}}.json.gz"
+FINAL_CACHE_CONTROL = "public, max-age=604800"
+CHECKPOINT_BATCH = 50
+PROGRESS_EVERY_SEC = 10
+
+# One S3 client per worker process (clients can't be pickled into the pool).
+_s3_client = None
+
+
+def _s3():
+    global _s3_client
+    if _s3_client is None:
+        import boto3
+        _s3_client = boto3.client("s3")
+    return _s3_client
+
+
+def list_sources(config):
+    """[(game_id, source ref)] for every raw feed, sorted by game ID."""
+    sources = {}
+    if config.get("source_dir"):
+        for name in os.listdir(config["source_dir"]):
+            for suffix in (".json.gz", ".json"):
+                if name.endswith(suffix):
+                    sources.setdefault(name[: -len(suffix)], os.path.join(config["source_dir"], name))
+                    break
+    else:
+        paginator = _s3().get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=config["bucket"], Prefix=RAW_PREFIX):
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+                name = key[len(RAW_PREFIX):]
+                if "/" not in name and name.endswith(".json.gz"):
+                    sources[name[: -len(".json.gz")]] = key
+    return sorted(sources.items())
+
+
+def _read(ref, config):
+    if config.get("source_dir"):
+        with open(ref, "rb") as f:
+            body = f.read()
+    else:
+        body = _s3().get_object(Bucket=config["bucket"], Key=ref)["Body"].read()
+    return jsoncodec.loads(gzip.decompress(body) if body[:2] == b"\x1f\x8b" else body)
+
+
+def _is_missing(e):
+    return getattr(e, "response", {}).get("Error", {}).get("Code") in ("NoSuchKey", "404")
+
+
+def load_box(game_id, config):
+    """The box score `game` object the poller stored for game_id, or None."""
+    if config.get("source_dir"):
+        if not config.get("box_dir"):
+            return None
+        for suffix in (".json.gz", ".json"):
+            path = os.path.join(config["box_dir"], f"{game_id}{suffix}")
+            if os.path.exists(path):
+                return _read(path, config)
+        return None
+    try:
+        return _read(BOX_KEY.format(game_id=game_id), config)
+    except Exception as e:
+        if _is_missing(e):
+            return None
+        raise
+
+
+def build_processed(game_id, actions, schema_version, box_game=None):
+    """
+    The payload the poller would publish for a final game, or None if teams can't be inferred.
+    `box_game` supplies the team IDs and the roster, like the box score does for the poller.
+    """
+    box_game = box_game or {}
+    away_team_id = box_game.get("awayTeam", {}).get("teamId") or box_game.get("awayTeamId")
+    home_team_id = box_game.get("homeTeam", {}).get("teamId") or box_game.get("homeTeamId")
+    if not (away_team_id and home_team_id):
+        inferred_away, inferred_home = infer_team_ids_from_actions(actions)
+        away_team_id = away_team_id or inferred_away
+        home_team_id = home_team_id or inferred_home
+    if not (away_team_id and home_team_id):
+        return None
+    processed = process_playbyplay_payload(
+        game_id=game_id,
+        actions=actions,
+        away_team_id=away_team_id,
+        home_team_id=home_team_id,
+        include_actions=False,
+        include_all_actions=False,
+        roster=roster_from_boxscore(box_game) if box_game else None,
+    )
+    if schema_version == 2:
+        processed = encode_playbyplay_v2(processed, actions)
+    return processed
+
+
+def _local_output_path(config, game_id):
+    return os.path.join(config["output_dir"], f"{game_id}.json.gz")
+
+
+def load_existing(game_id, config):
+    """The currently stored processed payload, or None."""
+    try:
+        if config.get("output_dir"):
+            with open(_local_output_path(config, game_id), "rb") as f:
+                return jsoncodec.loads(gzip.decompress(f.read()))
+        key = f"{PREFIX}{PROCESSED_KEY.format(game_id=game_id)}.gz"
+        body = _s3().get_object(Bucket=config["bucket"], Key=key)["Body"].read()
+        return jsoncodec.loads(gzip.decompress(body))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        if _is_missing(e):
+            return None
+        raise
+
+
+def write_processed(game_id, processed, config):
+    """Returns True if the stored object changed."""
+    if not config.get("output_dir"):
+        return upload_json_to_s3(
+            s3_client=_s3(),
+            bucket=config["bucket"],
+            prefix=PREFIX,
+            key=PROCESSED_KEY.format(game_id=game_id),
+            data=processed,
+            is_final=True,
+            skip_unchanged=True,
+        )
+
+    digest, body = encode_versioned(processed, FINAL_CACHE_CONTROL)
+    existing = load_existing(game_id, config)
+    if isinstance(existing, dict) and existing.get("contentVersion") == digest:
+        return False
+    os.makedirs(config["output_dir"], exist_ok=True)
+    with open(_local_output_path(config, game_id), "wb") as f:
+        f.write(gzip.compress(body))
+    return True
+
+
+def reprocess_game(game_id, ref, config):
+    """Worker entry point. Returns a small, picklable status record."""
+    start = time.perf_counter()
+    try:
+        actions = _read(ref, config)
+        if isinstance(actions, dict):
+            actions = actions.get("actions") or actions.get("game", {}).get("actions") or []
+        processed = build_processed(game_id, actions, config["schema_version"], load_box(game_id, config))
+        if processed is None:
+            return {"gameId": game_id, "status": "skipped", "reason": "team IDs not inferable"}
+
+        if config.get("dry_run"):
+            existing = load_existing(game_id, config)
+            if existing is None:
+                return {"gameId": game_id, "status": "new"}
+            ops = compute_patch(existing, processed, ignore=VOLATILE_FIELDS)
+            result = {"gameId": game_id, "status": "changed" if ops else "unchanged", "ops": len(ops)}
+            if ops:
+                result["paths"] = sorted({"/".join(str(p) for p in op["path"][:2]) for op in ops})[:10]
+            return result
+
+        written = write_processed(game_id, processed, config)
+        return {
+            "gameId": game_id,
+            "status": "written" if written else "unchanged",
+            "ms": round((time.perf_counter() - start) * 1000, 1),
+        }
+    except Exception as e:
+        return {"gameId": game_id, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+
+def read_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, "r", encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+class Checkpoint:
+    """Appends finished game IDs to a file, a batch at a time."""
+
+    def __init__(self, path, batch_size=CHECKPOINT_BATCH):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, game_id):
+        if not self.path:
+            return
+        self.pending.append(game_id)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.path or not self.pending:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{game_id}\n" for game_id in self.pending))
+        self.pending = []
+
+
+def run(config, workers=None, limit=None, log=print):
+    """Reprocesses every pending game and returns a summary dict."""
+    sources = list_sources(config)
+    if config.get("games"):
+        wanted = set(config["games"])
+        sources = [s for s in sources if s[0] in wanted]
+    # A dry run doesn't change anything, so it always looks at every game.
+    done = set() if config.get("dry_run") else read_checkpoint(config.get("checkpoint"))
+    pending = [s for s in sources if s[0] not in done]
+    if limit:
+        pending = pending[:limit]
+    log(f"{len(sources)} games found, {len(sources) - len(pending)} already done, {len(pending)} to process")
+
+    checkpoint = Checkpoint(None if config.get("dry_run") else config.get("checkpoint"))
+    counts = {}
+    results = []
+    start = last_progress = time.perf_counter()
+
+    def record(result):
+        nonlocal last_progress
+        results.append(result)
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+        if result["status"] == "error":
+            log(f"{result['gameId']}: {result['error']}")
+        elif result["status"] in ("written", "unchanged", "skipped"):
+            checkpoint.add(result["gameId"])
+        if config.get("dry_run") and result["status"] == "changed":
+            log(f"{result['gameId']}: {result['ops']} ops at {', '.join(result['paths'])}")
+        now = time.perf_counter()
+        if now - last_progress >= PROGRESS_EVERY_SEC:
+            last_progress = now
+            log(f"{len(results)}/{len(pending)} games, {len(results) / (now - start):.1f} games/s")
+
+    try:
+        if workers is not None and workers <= 1:
+            for game_id, ref in pending:
+                record(reprocess_game(game_id, ref, config))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(reprocess_game, game_id, ref, config) for game_id, ref in pending]
+                for future in as_completed(futures):
+                    record(future.result())
+    finally:
+        checkpoint.flush()
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "games": len(results),
+        "seconds": round(elapsed, 2),
+        "gamesPerSecond": round(len(results) / elapsed, 2) if elapsed > 0 else None,
+        **counts,
+    }
+    log(json.dumps(summary))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bucket", help="data bucket (source unless --source-dir; destination unless --output-dir)")
+    parser.add_argument("--source-dir", help="local mirror of data/playByPlayData/")
+    parser.add_argument("--box-dir", help="local mirror of data/boxData/ (with --source-dir)")
+    parser.add_argument("--output-dir", help="write processed payloads here instead of S3")
+    parser.add_argument("--schema-version", type=int, choices=(1, 2),
+                        default=int(os.environ.get("PBP_SCHEMA_VERSION", "1")))
+    parser.add_argument("--game", action="append", dest="games", help="only this game ID (repeatable)")
+    parser.add_argument("--limit", type=int, help="process at most this many pending games")
+    parser.add_argument("--workers", type=int, help="worker processes (default: every core; 1 runs in-process)")
+    parser.add_argument("--checkpoint", default="backfill-playbyplay.checkpoint",
+                        help="file of finished game IDs; rerunning skips them")
+    parser.add_argument("--dry-run", action="store_true", help="diff new payloads against the stored ones; write nothing")
+    args = parser.parse_args(argv)
+
+    if not args.source_dir and not args.bucket:
+        parser.error("--bucket is required unless --source-dir is given")
+    if not args.output_dir and not args.bucket:
+        parser.error("--bucket or --output-dir is required")
+
+    config = {
+        "bucket": args.bucket,
+        "source_dir": args.source_dir,
+        "box_dir": args.box_dir,
+        "output_dir": args.output_dir,
+        "schema_version": args.schema_version,
+        "games": args.games,
+        "checkpoint": args.checkpoint,
+        "dry_run": args.dry_run,
+    }
+    summary = run(config, workers=args.workers, limit=args.limit)
+    return 1 if summary.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
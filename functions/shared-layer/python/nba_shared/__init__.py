@@ -0,0 +1 @@
+"""Code shared by the Lambdas (WebSocket handlers and the poller), deployed as a Lambda layer."""
@@ -0,0 +1,115 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from botocore.exceptions import ClientError
+
+from nba_shared.subscribers import bump_generation
+
+
+FANOUT_MAX_WORKERS = int(os.environ.get('FANOUT_MAX_WORKERS', '16'))
+
+SENT = 'sent'
+GONE = 'gone'
+FAILED = 'failed'
+
+
+class FanOutStats:
+    """Per-invocation counters and post_to_connection latencies across one or more fan-outs."""
+
+    def __init__(self):
+        self.counts = {SENT: 0, GONE: 0, FAILED: 0}
+        self.latencies_ms = []
+
+    def record(self, outcome, latency_ms):
+        self.counts[outcome] += 1
+        self.latencies_ms.append(latency_ms)
+
+    def percentile(self, pct):
+        if not self.latencies_ms:
+            return None
+        ordered = sorted(self.latencies_ms)
+        # Nearest-rank percentile
+        rank = max(1, -(-len(ordered) * pct // 100))
+        return round(ordered[int(rank) - 1], 1)
+
+    def summary(self):
+        return {
+            **self.counts,
+            'p50Ms': self.percentile(50),
+            'p99Ms': self.percentile(99),
+        }
+
+    def put_metrics(self, metrics):
+        """Adds the counts and latency percentiles to an nba_shared.metrics.Metrics record."""
+        for outcome, count in self.counts.items():
+            metrics.put(f"{outcome}Connections", count)
+        for pct in (50, 99):
+            value = self.percentile(pct)
+            if value is not None:
+                metrics.put(f"postP{pct}Ms", value, 'Milliseconds')
+
+
+def _post(apigw_client, connection_id, payload):
+    start = time.perf_counter()
+    try:
+        apigw_client.post_to_connection(ConnectionId=connection_id, Data=payload)
+        outcome = SENT
+    except apigw_client.exceptions.GoneException:
+        # 410 Gone: The connection is no longer valid.
+        outcome = GONE
+    except Exception as e:
+        print(f"Failed to send to {connection_id}: {e}")
+        outcome = FAILED
+    return connection_id, outcome, (time.perf_counter() - start) * 1000.0
+
+
+def fan_out(*, apigw_client, connection_ids, payload, conn_table=None, subscription=None, stats=None, max_workers=None):
+    """
+    Posts `payload` to every connection on a bounded thread pool.
+    `connection_ids` may be any iterable (it is consumed lazily, so posting starts
+    before a slow producer is exhausted). Stale (410) connections are deleted from
+    `conn_table` in BatchWriteItem chunks afterwards, and the subscriber generation
+    of `subscription` (the gameId or dateString) is bumped so no container keeps
+    serving a cached list with them in it.
+    Returns the FanOutStats (the one passed in, if any).
+    """
+    stats = stats if stats is not None else FanOutStats()
+    max_workers = max_workers or FANOUT_MAX_WORKERS
+    # Bound queued work so a lazy iterator isn't drained into memory up front.
+    max_in_flight = max_workers * 4
+    gone = []
+
+    def collect(done):
+        for future in done:
+            connection_id, outcome, latency_ms = future.result()
+            stats.record(outcome, latency_ms)
+            if outcome == GONE:
+                gone.append(connection_id)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        in_flight = set()
+        for connection_id in connection_ids:
+            if len(in_flight) >= max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+            in_flight.add(pool.submit(_post, apigw_client, connection_id, payload))
+        if in_flight:
+            done, _ = wait(in_flight)
+            collect(done)
+
+    if gone and conn_table is not None:
+        delete_connections(conn_table, gone)
+        bump_generation(conn_table, subscription)
+    return stats
+
+
+def delete_connections(conn_table, connection_ids):
+    """Deletes stale connections; batch_writer chunks into 25-item BatchWriteItem calls and retries unprocessed items."""
+    print(f"Deleting {len(connection_ids)} stale connections")
+    try:
+        with conn_table.batch_writer() as batch:
+            for connection_id in connection_ids:
+                batch.delete_item(Key={'connectionId': connection_id})
+    except ClientError as e:
+        print(f"Failed to delete stale connections: {e}")
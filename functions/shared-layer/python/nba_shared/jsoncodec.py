@@ -0,0 +1,69 @@
+"""
+JSON encoding and decoding for the hot paths, on orjson when it is installed.
+
+    from nba_shared import jsoncodec
+    data = jsoncodec.loads(body)           # bytes or str
+    body = jsoncodec.dumps_bytes(payload)  # UTF-8 bytes, for S3 bodies
+    text = jsoncodec.dumps(payload)        # str, for WebSocket messages and DynamoDB attributes
+
+Both backends write the same bytes: compact separators, non-ASCII text as
+UTF-8 rather than \\u escapes, and DynamoDB Decimals as ints (floats when
+fractional). orjson writes floats below 1e-4 or from 1e16 up in a different
+exponent form, which the scores and percentages these payloads carry never
+reach. Dict keys that aren't strings are written as strings, as json does.
+
+Content digests (nba_game_poller.storage.content_digest) hash these bytes,
+so that the contentVersion clients match patches against comes from the same
+serialization as the upload. That is one more reason the two backends must
+agree byte for byte.
+"""
+import json
+from decimal import Decimal
+
+try:
+    import orjson
+except ImportError:  # not in the layer; stdlib json is used instead
+    orjson = None
+
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+# orjson.JSONDecodeError subclasses it, so callers can catch this for either backend
+JSONDecodeError = json.JSONDecodeError
+
+
+def to_native(val):
+    """Decimal -> int, or float when it has a fractional part. Other values pass through."""
+    if isinstance(val, Decimal):
+        return int(val) if val % 1 == 0 else float(val)
+    return val
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return to_native(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def loads(data):
+        return orjson.loads(data)
+
+    def dumps_bytes(obj):
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    def dumps(obj):
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode('utf-8')
+else:
+    _encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=_default)
+
+    def loads(data):
+        return json.loads(data)
+
+    def dumps_bytes(obj):
+        return _encoder.encode(obj).encode('utf-8')
+
+    def dumps(obj):
+        return _encoder.encode(obj)
@@ -0,0 +1,147 @@
+"""
+Per-stage timings and sizes as CloudWatch Embedded Metric Format (EMF) log lines.
+
+    metrics = Metrics('NBAGamePoller', properties={'gameId': game_id})
+    with metrics.timer('processPlayByPlay'):
+        ...
+    metrics.put('boxBytes', len(body), 'Bytes')
+    metrics.flush()  # prints one JSON line; CloudWatch Logs extracts the metrics
+
+Metric names carry the stage, and the only dimension is the service, so the
+metric count stays fixed. Per-record context like gameId goes in properties,
+which are searchable in Logs Insights but aren't metrics. A 0/1 metric such as
+`playNotModified` averages to a hit rate.
+
+Off unless METRICS_ENABLED=1. Then timer() returns a shared no-op context
+manager and put()/flush() return at once.
+"""
+import json
+import os
+import threading
+import time
+
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '0') == '1'
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'NBA')
+
+# CloudWatch takes at most 100 values per metric in one EMF record.
+MAX_VALUES_PER_METRIC = 100
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'start')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.put(f"{self.name}Ms", (time.perf_counter() - self.start) * 1000.0, 'Milliseconds')
+        return False
+
+
+class Metrics:
+    """Values collected for one EMF record. Safe to share between threads."""
+
+    def __init__(self, service, properties=None, enabled=None, namespace=None):
+        self.enabled = METRICS_ENABLED if enabled is None else enabled
+        self.service = service
+        self.namespace = namespace or METRICS_NAMESPACE
+        self.properties = dict(properties or {})
+        self._values = {}
+        self._units = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name):
+        """Context manager that records the block's duration as `{name}Ms`."""
+        if not self.enabled:
+            return _NOOP_TIMER
+        return _Timer(self, name)
+
+    def put(self, name, value, unit='Count'):
+        if not self.enabled:
+            return
+        with self._lock:
+            values = self._values.setdefault(name, [])
+            if len(values) < MAX_VALUES_PER_METRIC:
+                values.append(round(value, 3) if isinstance(value, float) else value)
+            self._units[name] = unit
+
+    def set_property(self, name, value):
+        if self.enabled:
+            self.properties[name] = value
+
+    def prefixed(self, prefix):
+        """A view that records into this one with `prefix` on every name (prefix 'box': 'fetchMs' -> 'boxFetchMs')."""
+        if not self.enabled:
+            return self
+        return _Prefixed(self, prefix)
+
+    def to_record(self, timestamp_ms=None):
+        """The EMF document, or None when nothing was recorded."""
+        with self._lock:
+            if not self._values:
+                return None
+            values = {name: v[0] if len(v) == 1 else list(v) for name, v in self._values.items()}
+            units = dict(self._units)
+        return {
+            '_aws': {
+                'Timestamp': timestamp_ms if timestamp_ms is not None else int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': [['Service']],
+                    'Metrics': [{'Name': name, 'Unit': units[name]} for name in values],
+                }],
+            },
+            'Service': self.service,
+            **self.properties,
+            **values,
+        }
+
+    def flush(self, emit=print):
+        """Emits the record (if any) as one log line and starts a new one."""
+        if not self.enabled:
+            return
+        record = self.to_record()
+        with self._lock:
+            self._values = {}
+            self._units = {}
+        if record is not None:
+            emit(json.dumps(record, separators=(',', ':'), default=str))
+
+
+class _Prefixed:
+    __slots__ = ('metrics', 'prefix')
+
+    def __init__(self, metrics, prefix):
+        self.metrics = metrics
+        self.prefix = prefix
+
+    def _name(self, name):
+        return f"{self.prefix}{name[:1].upper()}{name[1:]}"
+
+    def timer(self, name):
+        return self.metrics.timer(self._name(name))
+
+    def put(self, name, value, unit='Count'):
+        self.metrics.put(self._name(name), value, unit)
+
+    def prefixed(self, prefix):
+        return _Prefixed(self.metrics, self._name(prefix))
@@ -0,0 +1,172 @@
+import os
+import time
+
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from nba_shared import jsoncodec
+
+
+# Joins within this window reuse the container's last read of a date's scoreboard
+SCOREBOARD_CACHE_TTL_SEC = float(os.environ.get('SCOREBOARD_CACHE_TTL_SEC', '5'))
+# A scoreboard is rebuilt from the ByDate index once it is this old
+SCOREBOARD_TTL_SEC = 6 * 60 * 60
+
+# One item per date in the on-demand NBA_Scoreboards table (hash key `date`),
+# holding each game's summary as a JSON string under its own attribute so the
+# stream can update games independently. It lives apart from DateConnections so
+# multi-KB rewrites on every stream batch don't share a table with the joins,
+# disconnects and marker bumps there.
+GAME_ATTR_PREFIX = 'g#'
+
+
+def format_game(g):
+    """The subset of an NBA_Games item that date subscribers see (scores stay Decimals; jsoncodec writes them as numbers)."""
+    return {
+        'id': g.get('id'),
+        'homescore': g.get('homescore'),
+        'awayscore': g.get('awayscore'),
+        'hometeam': g.get('hometeam'),
+        'awayteam': g.get('awayteam'),
+        'starttime': g.get('starttime'),
+        'clock': g.get('clock'),
+        'status': g.get('status'),
+        'date': g.get('date'),
+        'homerecord': g.get('homerecord'),
+        'awayrecord': g.get('awayrecord')
+    }
+
+
+def sort_games(games):
+    return sorted(games, key=lambda g: (g.get('starttime') or '', g.get('id') or ''))
+
+
+def date_payload(games):
+    return jsoncodec.dumps({
+        'type': "date",
+        'data': games
+    })
+
+
+def query_date_games(games_table, index_name, date_str):
+    """Every game on `date_str` from the ByDate index, formatted. Raises ClientError."""
+    kwargs = {
+        'IndexName': index_name,
+        'KeyConditionExpression': Key('date').eq(date_str),
+    }
+    games = []
+    while True:
+        resp = games_table.query(**kwargs)
+        games.extend(format_game(g) for g in resp.get('Items', []))
+        if 'LastEvaluatedKey' not in resp:
+            return sort_games(games)
+        kwargs['ExclusiveStartKey'] = resp['LastEvaluatedKey']
+
+
+class ScoreboardStore:
+    """
+    Precomputed per-date scoreboards. `seed` writes a full scoreboard from a
+    ByDate query unless a current one already exists; `apply` updates individual
+    games from stream images, but only on a scoreboard that was seeded and
+    hasn't aged out.
+    """
+
+    def __init__(self, table, cache_ttl_sec=None, clock=time.monotonic):
+        self.table = table
+        self.cache_ttl_sec = SCOREBOARD_CACHE_TTL_SEC if cache_ttl_sec is None else cache_ttl_sec
+        self.clock = clock
+        self._cache = {}
+
+    def get(self, date_str):
+        """The date's game summaries, or None if there is no current scoreboard."""
+        cached = self._cache.get(date_str)
+        if cached is not None and self.clock() < cached['expires']:
+            return cached['games']
+        return self._read(date_str)
+
+    def seed(self, date_str, games):
+        """
+        Stores `games` as the date's scoreboard and returns the games now current.
+        The ByDate query behind `games` is eventually consistent, so a current
+        scoreboard, which may already carry newer scores from the stream, is
+        kept (and returned) rather than overwritten.
+        """
+        now = int(time.time())
+        item = {
+            **self._key(date_str),
+            'seededAt': now,
+            'expiresAt': now + SCOREBOARD_TTL_SEC,
+        }
+        for game in games:
+            item[f'{GAME_ATTR_PREFIX}{game["id"]}'] = jsoncodec.dumps(game)
+        try:
+            self.table.put_item(
+                Item=item,
+                ConditionExpression='attribute_not_exists(#d) OR expiresAt <= :now',
+                ExpressionAttributeNames={'#d': 'date'},
+                ExpressionAttributeValues={':now': now},
+            )
+        except ClientError as e:
+            self._cache.pop(date_str, None)
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                print(f"Error seeding scoreboard for {date_str}: {e}")
+                return games
+            return self._read(date_str, consistent=True) or games
+        return self._remember(date_str, item)
+
+    def apply(self, date_str, changed_games):
+        """
+        Writes {gameId: summary or None} into the date's scoreboard and returns the
+        updated games, or None if there is no current scoreboard to update.
+        """
+        names, values, sets, removes = {}, {':now': int(time.time())}, [], []
+        for i, (game_id, summary) in enumerate(changed_games.items()):
+            names[f'#g{i}'] = f'{GAME_ATTR_PREFIX}{game_id}'
+            if summary is None:
+                removes.append(f'#g{i}')
+            else:
+                values[f':g{i}'] = jsoncodec.dumps(summary)
+                sets.append(f'#g{i} = :g{i}')
+        if not names:
+            return self.get(date_str)
+
+        expression = ''
+        if sets:
+            expression += 'SET ' + ', '.join(sets)
+        if removes:
+            expression += ' REMOVE ' + ', '.join(removes)
+        try:
+            item = self.table.update_item(
+                Key=self._key(date_str),
+                UpdateExpression=expression.strip(),
+                ConditionExpression='attribute_exists(seededAt) AND expiresAt > :now',
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values,
+                ReturnValues='ALL_NEW',
+            )['Attributes']
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                print(f"Error updating scoreboard for {date_str}: {e}")
+            self._cache.pop(date_str, None)
+            return None
+        return self._remember(date_str, item)
+
+    def _read(self, date_str, consistent=False):
+        try:
+            item = self.table.get_item(Key=self._key(date_str), ConsistentRead=consistent).get('Item')
+        except ClientError as e:
+            print(f"Error reading scoreboard for {date_str}: {e}")
+            return None
+        if not item or int(item.get('expiresAt', 0)) <= time.time():
+            return None
+        return self._remember(date_str, item)
+
+    def _key(self, date_str):
+        return {'date': date_str}
+
+    def _remember(self, date_str, item):
+        games = sort_games(
+            jsoncodec.loads(value) for name, value in item.items() if name.startswith(GAME_ATTR_PREFIX)
+        )
+        self._cache[date_str] = {'games': games, 'expires': self.clock() + self.cache_ttl_sec}
+        return games
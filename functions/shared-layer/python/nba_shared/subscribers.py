@@ -0,0 +1,121 @@
+import os
+import time
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+
+SUBSCRIBER_CACHE_TTL_SEC = float(os.environ.get('SUBSCRIBER_CACHE_TTL_SEC', '30'))
+
+# Each connection table also holds one marker item per subscription key (gameId or
+# dateString) whose `generation` is bumped by join/disconnect. The marker has no
+# index attribute, so it never shows up in the GSI queries below.
+MARKER_PREFIX = '#subscribers#'
+MARKER_TTL_SEC = 2 * 24 * 60 * 60
+
+
+def marker_key(value):
+    return {'connectionId': f'{MARKER_PREFIX}{value}'}
+
+
+def bump_generation(table, value):
+    """Marks the subscriber list for `value` as changed. Called by the join/disconnect handlers."""
+    if not value:
+        return
+    try:
+        table.update_item(
+            Key=marker_key(value),
+            UpdateExpression='ADD generation :one SET expiresAt = :exp',
+            ExpressionAttributeValues={':one': 1, ':exp': int(time.time()) + MARKER_TTL_SEC},
+        )
+    except ClientError as e:
+        print(f"Failed to bump subscriber generation for {value}: {e}")
+
+
+def read_generation(table, value):
+    """Current generation for `value` (0 if never bumped), or None if it couldn't be read."""
+    try:
+        resp = table.get_item(Key=marker_key(value), ConsistentRead=True)
+    except ClientError as e:
+        print(f"Failed to read subscriber generation for {value}: {e}")
+        return None
+    return int(resp.get('Item', {}).get('generation', 0))
+
+
+def query_pages(table, index_name, key_name, value):
+    """Yields each page of subscriber items, following LastEvaluatedKey."""
+    kwargs = {
+        'IndexName': index_name,
+        'KeyConditionExpression': Key(key_name).eq(value),
+        'ProjectionExpression': 'connectionId',
+    }
+    while True:
+        resp = table.query(**kwargs)
+        yield resp.get('Items', [])
+        last_key = resp.get('LastEvaluatedKey')
+        if not last_key:
+            return
+        kwargs['ExclusiveStartKey'] = last_key
+
+
+def iter_subscribers(table, index_name, key_name, value):
+    """
+    Lazily yields every subscribed connectionId, one page at a time, so a fan-out
+    can start posting before the last page arrives. Query errors end the stream early.
+    """
+    try:
+        for items in query_pages(table, index_name, key_name, value):
+            for item in items:
+                yield item['connectionId']
+    except ClientError as e:
+        print(f"Error querying subscribers for {value}: {e}")
+
+
+class SubscriberCache:
+    """
+    Per-container subscriber lists with a short TTL. An entry is only reused while
+    the marker generation still matches, so a join or disconnect anywhere forces the
+    next lookup back to the index.
+    """
+
+    def __init__(self, table, index_name, key_name, ttl_sec=None, clock=time.monotonic):
+        self.table = table
+        self.index_name = index_name
+        self.key_name = key_name
+        self.ttl_sec = SUBSCRIBER_CACHE_TTL_SEC if ttl_sec is None else ttl_sec
+        self.clock = clock
+        self._entries = {}
+
+    def subscribers(self, value):
+        """Iterator of connectionIds for `value`, from the cache or streamed from the index."""
+        generation = read_generation(self.table, value) if self.ttl_sec > 0 else None
+        entry = self._entries.get(value)
+        if (
+            entry is not None
+            and generation is not None
+            and entry['generation'] == generation
+            and self.clock() < entry['expires']
+        ):
+            return iter(entry['ids'])
+        self._entries.pop(value, None)
+        return self._fill(value, generation)
+
+    def invalidate(self, value):
+        self._entries.pop(value, None)
+
+    def _fill(self, value, generation):
+        ids = []
+        try:
+            for items in query_pages(self.table, self.index_name, self.key_name, value):
+                for item in items:
+                    ids.append(item['connectionId'])
+                    yield item['connectionId']
+        except ClientError as e:
+            print(f"Error querying subscribers for {value}: {e}")
+            return
+        # Only complete lists are cached.
+        if generation is not None:
+            self._entries[value] = {
+                'generation': generation,
+                'expires': self.clock() + self.ttl_sec,
+                'ids': ids,
+            }
@@ -6,6 +6,10 @@ import importlib.util
 # Add lambda directories to sys.path
 # Required for 'nba-game-poller' because it has a package structure we import from directly
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../nba-game-poller")))
+# Shared Lambda layer code (layers are mounted under /opt/python at runtime)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../shared-layer/python")))
+# Benchmark helpers (synthetic game generator, regression guard)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../benchmarks")))
 
 # Note: Other lambda directories are not added to sys.path to avoid namespace collisions
 # since they all contain 'lambda_function.py'. We use the 'lambda_loader' fixture below instead.
@@ -0,0 +1,145 @@
+import gzip
+import json
+import os
+import sys
+
+import boto3
+import pytest
+from moto import mock_aws
+from unittest.mock import MagicMock
+
+from synthetic_games import generate_boxscore, generate_game
+
+
+SCRIPT = os.path.join(os.path.dirname(__file__), "../scripts/backfill_playbyplay.py")
+POLLER = os.path.join(os.path.dirname(__file__), "../nba-game-poller/lambda_function.py")
+
+
+@pytest.fixture(scope="module")
+def backfill(lambda_loader):
+    module = lambda_loader(SCRIPT, "backfill_playbyplay")
+    # Pool workers unpickle reprocess_game by module name.
+    sys.modules["backfill_playbyplay"] = module
+    yield module
+    sys.modules.pop("backfill_playbyplay", None)
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    for i, profile in enumerate(("regulation", "multi_ot", "sub_heavy")):
+        (raw / f"00224000{i}.json.gz").write_bytes(gzip.compress(json.dumps(generate_game(profile)).encode()))
+    return raw
+
+
+def _config(tmp_path, source_dir, **overrides):
+    return {
+        "bucket": None,
+        "source_dir": str(source_dir),
+        "output_dir": str(tmp_path / "out"),
+        "schema_version": 1,
+        "games": None,
+        "checkpoint": str(tmp_path / "checkpoint"),
+        "dry_run": False,
+        "box_dir": None,
+        **overrides,
+    }
+
+
+def _stored(tmp_path, game_id):
+    return json.loads(gzip.decompress((tmp_path / "out" / f"{game_id}.json.gz").read_bytes()))
+
+
+def test_writes_then_skips_unchanged_and_checkpointed(backfill, tmp_path, source_dir):
+    config = _config(tmp_path, source_dir)
+    summary = backfill.run(config, workers=1, log=lambda *_: None)
+    assert summary["written"] == 3
+    assert _stored(tmp_path, "002240000")["numPeriods"] == 4
+    assert _stored(tmp_path, "002240001")["numPeriods"] == 7
+
+    # Everything is checkpointed, so a rerun has nothing to do.
+    assert backfill.run(config, workers=1, log=lambda *_: None)["games"] == 0
+    # Without the checkpoint the outputs are found unchanged rather than rewritten.
+    os.remove(config["checkpoint"])
+    assert backfill.run(config, workers=1, log=lambda *_: None)["unchanged"] == 3
+
+
+def test_output_matches_the_poller_with_the_stored_box_score(backfill, lambda_loader, monkeypatch, tmp_path, source_dir):
+    actions = generate_game("sub_heavy")
+    box_game = {**generate_boxscore(), "gameStatusText": "Final"}
+    box_dir = tmp_path / "box"
+    box_dir.mkdir()
+    (box_dir / "002240002.json.gz").write_bytes(gzip.compress(json.dumps(box_game).encode()))
+
+    for name in ("DATA_BUCKET", "DDB_TABLE", "POLLER_RULE_NAME", "LAMBDA_ARN", "SCHEDULER_ROLE_ARN"):
+        monkeypatch.setenv(name, "test")
+    poller = lambda_loader(POLLER, "nba_game_poller_lambda_backfill")
+    poller.PBP_STATE_SNAPSHOTS = False
+    poller.update_ddb_game = MagicMock()
+    poller.upload_json_to_s3 = MagicMock()
+    poller.fetch_nba_data_urllib = MagicMock(side_effect=[({"game": {"actions": actions}}, "p1"), ({"game": box_game}, "b1")])
+    poller.process_game({"id": "002240002", "date": "2025-01-01"})
+    uploads = {c.kwargs["key"]: c.kwargs["data"] for c in poller.upload_json_to_s3.call_args_list}
+    published = uploads["processed-data/playByPlayData/002240002.json"]
+
+    backfill.run(_config(tmp_path, source_dir, box_dir=str(box_dir)), workers=1, log=lambda *_: None)
+    stored = _stored(tmp_path, "002240002")
+    for payload in (published, stored):
+        for field in backfill.VOLATILE_FIELDS:
+            payload.pop(field, None)
+    assert stored == json.loads(json.dumps(published))
+    # Without the box score the substitutions resolve by name and the output differs.
+    assert backfill.build_processed("002240002", actions, 1) != backfill.build_processed("002240002", actions, 1, box_game)
+
+
+def test_dry_run_reports_diffs_without_writing(backfill, tmp_path, source_dir):
+    backfill.run(_config(tmp_path, source_dir), workers=1, log=lambda *_: None)
+    before = (tmp_path / "out" / "002240000.json.gz").read_bytes()
+
+    # Pretend the processing changed: the stored payloads now differ from what it produces.
+    summary = backfill.run(
+        _config(tmp_path, source_dir, dry_run=True, schema_version=2, checkpoint=None),
+        workers=1,
+        log=lambda *_: None,
+    )
+    assert summary["changed"] == 3
+    assert (tmp_path / "out" / "002240000.json.gz").read_bytes() == before
+
+
+def test_process_pool(backfill, tmp_path, source_dir):
+    summary = backfill.run(_config(tmp_path, source_dir), workers=2, log=lambda *_: None)
+    assert summary["written"] == 3
+    assert summary["gamesPerSecond"] > 0
+    assert len(backfill.read_checkpoint(str(tmp_path / "checkpoint"))) == 3
+
+
+def test_s3_round_trip(backfill, tmp_path):
+    with mock_aws():
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="test-bucket")
+        s3.put_object(
+            Bucket="test-bucket",
+            Key="data/playByPlayData/002240000.json.gz",
+            Body=gzip.compress(json.dumps(generate_game("regulation")).encode()),
+        )
+        backfill._s3_client = s3
+        try:
+            config = {
+                "bucket": "test-bucket",
+                "source_dir": None,
+                "output_dir": None,
+                "schema_version": 2,
+                "games": None,
+                "checkpoint": None,
+                "dry_run": False,
+            }
+            assert backfill.run(config, workers=1, log=lambda *_: None)["written"] == 1
+            obj = s3.get_object(Bucket="test-bucket", Key="data/processed-data/playByPlayData/002240000.json.gz")
+            assert json.loads(gzip.decompress(obj["Body"].read()))["schemaVersion"] == 2
+            assert obj["CacheControl"] == "public, max-age=604800"
+
+            dry = backfill.run({**config, "dry_run": True}, workers=1, log=lambda *_: None)
+            assert dry["unchanged"] == 1
+        finally:
+            backfill._s3_client = None
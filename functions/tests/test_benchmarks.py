@@ -0,0 +1,100 @@
+from collections import Counter
+
+import pytest
+
+import bench_cold_start
+import bench_json
+import bench_playbyplay
+import bench_roster
+from nba_game_poller.playbyplay_processing import process_playbyplay_payload
+from synthetic_games import AWAY_TEAM, HOME_TEAM, PROFILES, generate_game
+
+
+def _process(actions):
+    return process_playbyplay_payload(
+        game_id="bench", actions=actions, away_team_id=AWAY_TEAM[0], home_team_id=HOME_TEAM[0],
+    )
+
+
+class TestSyntheticGames:
+    def test_deterministic(self):
+        assert generate_game("regulation", seed=3) == generate_game("regulation", seed=3)
+        assert generate_game("regulation", seed=3) != generate_game("regulation", seed=4)
+
+    @pytest.mark.parametrize("profile", sorted(PROFILES))
+    def test_profiles_process_cleanly(self, profile, capsys):
+        actions = generate_game(profile)
+        payload = _process(actions)
+
+        # Every substitution and assist resolves to a known player.
+        assert "PROBLEM" not in capsys.readouterr().out
+        assert payload["numPeriods"] == 4 + PROFILES[profile]["overtimes"]
+        assert actions[-1]["description"].startswith("Game End")
+        assert payload["awayPlayerTimeline"] and payload["homePlayerTimeline"]
+
+    def test_profiles_stress_what_they_say(self):
+        counts = {p: Counter(a["actionType"] for a in generate_game(p)) for p in ("regulation", "sub_heavy")}
+        assert counts["sub_heavy"]["Substitution"] > 2 * counts["regulation"]["Substitution"]
+
+        assists = {p: sum("AST" in a["description"] for a in generate_game(p)) for p in ("regulation", "assist_heavy")}
+        assert assists["assist_heavy"] > assists["regulation"]
+
+
+class TestRegressionGuard:
+    def _report(self, calibration_ms, **stage_ms):
+        return {
+            "calibrationMs": calibration_ms,
+            "results": {"regulation": {"stages": {k: {"minMs": v} for k, v in stage_ms.items()}}},
+        }
+
+    def test_flags_only_slowdowns_past_both_limits(self):
+        baseline = self._report(10.0, create_players=2.0, sort_actions=0.2)
+        current = self._report(10.0, create_players=3.5, sort_actions=0.4)
+        # sort_actions doubled but by less than min_delta_ms.
+        assert bench_playbyplay.find_regressions(current, baseline) == [("regulation", "create_players", 2.0, 3.5)]
+
+    def test_scales_baseline_by_calibration(self):
+        baseline = self._report(10.0, create_players=2.0)
+        slower_machine = self._report(20.0, create_players=3.9)
+        assert bench_playbyplay.find_regressions(slower_machine, baseline) == []
+
+    def test_run_reports_every_stage(self):
+        report = bench_playbyplay.run(["regulation"], repeat=1)
+        stages = report["results"]["regulation"]["stages"]
+        assert set(stages) == {name for name, _ in bench_playbyplay.stages(generate_game("regulation"))}
+        assert all(s["peakKiB"] > 0 for s in stages.values())
+
+
+class TestColdStart:
+    def test_poller_task_builds_clients_on_first_use(self):
+        result = bench_cold_start.run(["poller"], repeat=1)["results"]["poller"]
+        assert result["importClients"] == []
+        assert "scheduler" not in result["invokeClients"]
+        assert result["coldStartMs"] == result["importMs"] + result["firstInvokeMs"]
+
+
+class TestJsonBench:
+    def test_run_covers_every_variant_and_codec(self):
+        report = bench_json.run(bench_json.load_corpus(bench_json.DEFAULT_CORPUS), repeat=1)
+        rows = {(r["codec"], r["variant"]): r for r in report["results"]}
+        assert {variant for _, variant in rows} == {"raw", "pbp-v1", "pbp-v2", "date"}
+        # Both jsoncodec backends write the same bytes.
+        if ("jsoncodec-orjson", "raw") in rows:
+            assert rows["jsoncodec-orjson", "raw"]["bytes"] == rows["jsoncodec-json", "raw"]["bytes"]
+
+
+class TestRosterBench:
+    def test_roster_attribution_matches_descriptions(self):
+        actions = generate_game("regulation", 0)
+        index = bench_roster.PlayerIndex(bench_roster.roster_from_boxscore(bench_roster.generate_boxscore()))
+        with_roster = bench_roster.attribute(actions, index)
+        without = bench_roster.attribute(actions, None)
+        for side in ("awayPlayers", "homePlayers"):
+            assert list(with_roster[side]) == list(without[side])
+
+    def test_run_reports_both_modes(self):
+        report = bench_roster.run(["regulation"], repeat=1)
+        entry = report["results"]["regulation"]
+        assert entry["descriptions"]["usPerAction"] > 0
+        assert entry["roster"]["usPerAction"] > 0
+
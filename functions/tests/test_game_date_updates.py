@@ -65,6 +65,14 @@ class TestGameDateUpdates:
                 ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1}
             )
 
+            # Per-date scoreboards (nba_shared.scoreboard)
+            self.scoreboard_table = self.dynamodb.create_table(
+                TableName="NBA_Scoreboards",
+                KeySchema=[{"AttributeName": "date", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "date", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+
             # Import module (re-import to pick up env vars if necessary, though mocked boto3 resource handles logic)
             self.module = lambda_loader(LAMBDA_PATH, "game_date_updates_lambda")
             # Patch the module's dynamodb resource to use our mocked one
@@ -175,7 +183,69 @@ class TestGameDateUpdates:
         self.module.handler(event, {})
         assert not self.module.process_date_update.called
 
-    def test_to_native_converts_decimal(self):
-        # Decimal values should convert to int/float for JSON serialization.
-        assert self.module.to_native(Decimal("10")) == 10
-        assert self.module.to_native(Decimal("10.5")) == 10.5
+    def _game_image(self, date_str, **fields):
+        image = {"PK": {"S": "GAME#1"}, "SK": {"S": f"DATE#{date_str}"}, "date": {"S": date_str}, "id": {"S": "1"}}
+        for name, value in fields.items():
+            image[name] = {"N": str(value)} if isinstance(value, int) else {"S": value}
+        return image
+
+    def test_etag_only_modify_skipped(self):
+        # A MODIFY that only touched poller bookkeeping should not fan out.
+        date_str = "2023-12-25"
+        self.date_conn_table.put_item(Item={"dateString": date_str, "connectionId": "conn123"})
+        mock_apigw = MagicMock()
+        self.module.apigw_client = mock_apigw
+
+        event = {"Records": [{"eventName": "MODIFY", "dynamodb": {
+            "OldImage": self._game_image(date_str, homescore=10, play_etag="a"),
+            "NewImage": self._game_image(date_str, homescore=10, play_etag="b"),
+        }}]}
+        self.module.handler(event, {})
+        assert not mock_apigw.post_to_connection.called
+
+    def test_visible_change_updates_scoreboard(self):
+        # After the first query seeds the scoreboard, later batches update it from the stream images.
+        date_str = "2023-12-25"
+        self.games_table.put_item(Item={
+            "PK": "GAME#1", "SK": f"DATE#{date_str}", "date": date_str, "id": "1", "homescore": 10,
+        })
+        self.date_conn_table.put_item(Item={"dateString": date_str, "connectionId": "conn123"})
+        mock_apigw = MagicMock()
+        self.module.apigw_client = mock_apigw
+
+        first = {"Records": [{"eventName": "MODIFY", "dynamodb": {"NewImage": self._game_image(date_str, homescore=10)}}]}
+        self.module.handler(first, {})
+
+        # The table isn't consulted again: a stale row here must not leak into the payload.
+        self.games_table.put_item(Item={
+            "PK": "GAME#1", "SK": f"DATE#{date_str}", "date": date_str, "id": "1", "homescore": 0,
+        })
+        second = {"Records": [{"eventName": "MODIFY", "dynamodb": {
+            "OldImage": self._game_image(date_str, homescore=10),
+            "NewImage": self._game_image(date_str, homescore=12),
+        }}]}
+        self.module.handler(second, {})
+
+        payload = json.loads(mock_apigw.post_to_connection.call_args.kwargs["Data"])
+        assert payload["data"] == [self.module.format_game({"id": "1", "date": date_str, "homescore": 12})]
+
+    def test_collect_changes_handles_moves_and_removals(self):
+        # A game moving dates leaves the old date and joins the new one; REMOVE drops it.
+        records = [
+            {"eventName": "MODIFY", "dynamodb": {
+                "OldImage": self._game_image("2023-12-25", status="Scheduled"),
+                "NewImage": self._game_image("2023-12-26", status="Scheduled"),
+            }},
+            {"eventName": "REMOVE", "dynamodb": {"OldImage": self._game_image("2023-12-27")}},
+        ]
+        changes = self.module.collect_changes(records)
+        assert changes["2023-12-25"] == {"1": None}
+        assert changes["2023-12-26"]["1"]["date"] == "2023-12-26"
+        assert changes["2023-12-27"] == {"1": None}
+
+    def test_date_payload_writes_decimals_as_numbers(self):
+        # Stream images carry Decimal scores; the payload has them as plain JSON numbers.
+        game = self.module.format_game({"id": "1", "homescore": Decimal("10"), "awayscore": Decimal("10.5")})
+        payload = self.module.date_payload([game])
+        assert '"homescore":10,' in payload
+        assert json.loads(payload)["data"][0]["awayscore"] == 10.5
@@ -0,0 +1,88 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from nba_game_poller.nba_api import KeepAliveHttpClient, fetch_nba_data_urllib
+
+
+class _FeedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            body = gzip.compress(json.dumps({"game": {"gameId": "001"}}).encode("utf-8"))
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        # Simulate the CDN dropping an idle keep-alive socket without telling us.
+        if server.drop_after_response:
+            self.close_connection = True
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+
+class TestKeepAliveHttpClient:
+    @pytest.fixture(autouse=True)
+    def server(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _FeedHandler)
+        self.httpd.requests = 0
+        self.httpd.connections = 0
+        self.httpd.drop_after_response = False
+        thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        thread.start()
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/static/json/liveData/playbyplay/playbyplay_001.json"
+        self.client = KeepAliveHttpClient(timeout=2)
+        yield
+        self.client.close()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_reuses_connection_across_requests(self):
+        # Sequential requests to one host should share a single socket.
+        for _ in range(3):
+            data, etag = fetch_nba_data_urllib(self.url, client=self.client)
+            assert data == {"game": {"gameId": "001"}}
+            assert etag == '"v1"'
+        assert self.client.connections_opened == 1
+        assert self.httpd.connections == 1
+
+    def test_etag_short_circuits_with_304(self):
+        # A matching ETag returns no data and keeps the ETag we sent.
+        data, etag = fetch_nba_data_urllib(self.url, etag='"v1"', client=self.client)
+        assert data is None
+        assert etag == '"v1"'
+
+    def test_reconnects_when_pooled_socket_is_stale(self):
+        # A socket the server closed while idle is replaced transparently.
+        self.httpd.drop_after_response = True
+        for _ in range(3):
+            data, _ = fetch_nba_data_urllib(self.url, client=self.client)
+            assert data == {"game": {"gameId": "001"}}
+        assert self.httpd.requests == 3
+        assert self.client.connections_opened >= 2
+
+    def test_network_failure_returns_original_etag(self):
+        # Unreachable hosts are logged and treated like "no new data".
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        data, etag = fetch_nba_data_urllib(self.url, etag='"old"', client=KeepAliveHttpClient(timeout=1))
+        assert data is None
+        assert etag == '"old"'
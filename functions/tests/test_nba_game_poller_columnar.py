@@ -0,0 +1,108 @@
+import copy
+import json
+import os
+import unittest
+from unittest import mock
+
+from nba_game_poller import playbyplay_columnar, playbyplay_incremental
+from nba_game_poller.patches import apply_patch, compute_patch
+from nba_game_poller.playbyplay_columnar import (
+    SCHEMA_VERSION,
+    decode_clock,
+    decode_playbyplay_v2,
+    encode_clock,
+    encode_playbyplay_v2,
+)
+from nba_game_poller.playbyplay_incremental import process_playbyplay_incremental
+from nba_game_poller.playbyplay_processing import process_playbyplay_payload
+
+
+def _without_none(value):
+    if isinstance(value, dict):
+        return {k: _without_none(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_without_none(v) for v in value]
+    return value
+
+
+class TestColumnarPlayByPlay(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        fixture_path = os.path.join(os.path.dirname(__file__), "fixtures/0012200039.json")
+        with open(fixture_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        cls.actions = payload["actions"] if isinstance(payload, dict) else payload
+
+    def _processed(self, actions, include_actions=False):
+        return process_playbyplay_payload(
+            game_id="0012200039",
+            actions=actions,
+            away_team_id="1610612740",
+            home_team_id="1610612759",
+            include_actions=include_actions,
+            include_all_actions=include_actions,
+        )
+
+    def test_round_trips_to_v1(self):
+        for include_actions in (False, True):
+            v1 = self._processed(self.actions, include_actions)
+            v2 = encode_playbyplay_v2(v1, self.actions)
+            self.assertEqual(v2["schemaVersion"], SCHEMA_VERSION)
+            self.assertEqual(_without_none(decode_playbyplay_v2(v2)), _without_none(v1))
+
+    def test_actions_are_not_serialized_to_match_rows(self):
+        # Rows are keyed by identity fields; only non-string dictionary values go through JSON.
+        v1 = self._processed(self.actions, include_actions=True)
+        dumps = json.dumps
+        with mock.patch.object(playbyplay_columnar.json, "dumps", side_effect=dumps) as spy:
+            v2 = encode_playbyplay_v2(v1, self.actions)
+        self.assertFalse([c for c in spy.call_args_list if isinstance(c.args[0], dict) and "clock" in c.args[0]])
+        self.assertEqual(_without_none(decode_playbyplay_v2(v2)), _without_none(v1))
+
+    def test_smaller_than_v1(self):
+        v1 = self._processed(self.actions)
+        v2 = encode_playbyplay_v2(v1, self.actions)
+        self.assertLess(len(json.dumps(v2)), len(json.dumps(v1)) / 2)
+
+    def test_successive_payloads_patch_by_appending(self):
+        prev = encode_playbyplay_v2(self._processed(self.actions[:400]), self.actions[:400])
+        new = encode_playbyplay_v2(self._processed(self.actions[:410]), self.actions[:410])
+        ops = compute_patch(prev, new, ignore=("generatedAt",))
+
+        patched = apply_patch(copy.deepcopy(prev), ops)
+        patched["generatedAt"] = new["generatedAt"]
+        self.assertEqual(patched, new)
+        row_ops = [op for op in ops if op["path"][:1] == ["rows"] and op["path"] != ["rows", "count"]]
+        self.assertTrue(row_ops)
+        self.assertTrue(all(op["op"] == "append" for op in row_ops))
+
+    def test_snapshot_restored_state_encodes_the_same(self):
+        playbyplay_incremental._STATE_CACHE.clear()
+        snapshots = {}
+        kwargs = {
+            "game_id": "0012200039",
+            "away_team_id": "1610612740",
+            "home_team_id": "1610612759",
+            "include_actions": False,
+            "include_all_actions": False,
+            "load_snapshot": lambda game_id: json.loads(snapshots[game_id]) if game_id in snapshots else None,
+            "save_snapshot": lambda game_id, snapshot: snapshots.__setitem__(game_id, json.dumps(snapshot)),
+        }
+        process_playbyplay_incremental(actions=copy.deepcopy(self.actions[:300]), **kwargs)
+        playbyplay_incremental._STATE_CACHE.clear()
+
+        actions = copy.deepcopy(self.actions[:350])
+        restored = process_playbyplay_incremental(actions=actions, **kwargs)
+        self.assertEqual(
+            encode_playbyplay_v2(restored, actions)["rows"],
+            encode_playbyplay_v2(self._processed(self.actions[:350]), self.actions[:350])["rows"],
+        )
+
+    def test_clock_encoding(self):
+        self.assertEqual(encode_clock("PT11M42.00S"), 702.0)
+        self.assertEqual(decode_clock(702.0), "PT11M42.00S")
+        self.assertEqual(encode_clock("PT00M00.50S"), 0.5)
+        # Clocks that wouldn't come back byte-for-byte are kept as strings.
+        self.assertEqual(encode_clock("PT12M"), "PT12M")
+        self.assertEqual(decode_clock("PT12M"), "PT12M")
+        self.assertIsNone(encode_clock(None))
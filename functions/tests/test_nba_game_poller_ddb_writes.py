@@ -0,0 +1,95 @@
+from decimal import Decimal
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+from unittest.mock import MagicMock
+
+from nba_game_poller.ddb_writes import (
+    STATE_ATTRS,
+    PendingWrites,
+    batch_get_items,
+    batch_put_items,
+    changed_attributes,
+    with_throttle_retry,
+)
+
+
+def _client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "UpdateItem")
+
+
+def test_changed_attributes_ignores_equal_decimals():
+    item = {"homescore": Decimal("98"), "status": "Q4 2:00", "clock": "PT02M00.00S"}
+    updates = {"homescore": 98, "status": "Q4 1:41", "awayscore": 95}
+    assert changed_attributes(item, updates) == {"status": "Q4 1:41", "awayscore": 95}
+
+
+class TestPendingWrites:
+    def test_splits_bookkeeping_and_skips_unchanged(self):
+        writes = PendingWrites(STATE_ATTRS)
+        game = {"id": "001", "date": "2025-01-01", "status": "Q2 5:00", "homescore": Decimal("50")}
+
+        changed = writes.record(game, {"status": "Q2 5:00", "homescore": 52, "box_etag": "e1"})
+        assert changed == {"homescore": 52}
+        update_game, put_states = MagicMock(), MagicMock()
+        assert writes.flush(update_game=update_game, put_states=put_states) == (1, 1)
+        update_game.assert_called_once_with("001", "2025-01-01", {"homescore": 52})
+        assert put_states.call_args.args[0] == [{"gameId": "001", "box_etag": "e1"}]
+
+        # Same values again: nothing to write anywhere.
+        writes.record(game, {"status": "Q2 5:00", "homescore": 52, "box_etag": "e1"})
+        assert len(writes) == 0
+
+    def test_without_state_attrs_everything_goes_to_the_game(self):
+        writes = PendingWrites(())
+        game = {"id": "001", "date": "2025-01-01"}
+        writes.record(game, {"box_etag": "e1"})
+        writes.record(game, {"status": "Q1 12:00"})
+        update_game, put_states = MagicMock(), MagicMock()
+        writes.flush(update_game=update_game, put_states=put_states)
+        update_game.assert_called_once_with("001", "2025-01-01", {"box_etag": "e1", "status": "Q1 12:00"})
+        put_states.assert_not_called()
+
+
+class TestThrottleRetry:
+    def test_retries_throttling_then_succeeds(self):
+        call = MagicMock(side_effect=[_client_error("ProvisionedThroughputExceededException"), "ok"])
+        sleep = MagicMock()
+        assert with_throttle_retry(call, sleep=sleep) == "ok"
+        assert call.call_count == 2
+        sleep.assert_called_once()
+
+    def test_other_errors_are_not_retried(self):
+        call = MagicMock(side_effect=_client_error("ValidationException"))
+        with pytest.raises(ClientError):
+            with_throttle_retry(call, sleep=MagicMock())
+        assert call.call_count == 1
+
+    def test_batch_put_resends_unprocessed_items(self):
+        dynamodb = MagicMock()
+        dynamodb.batch_write_item.side_effect = [
+            {"UnprocessedItems": {"State": [{"PutRequest": {"Item": {"gameId": "002"}}}]}},
+            {"UnprocessedItems": {}},
+        ]
+        items = [{"gameId": "001"}, {"gameId": "002"}]
+        assert batch_put_items(dynamodb, "State", items, sleep=MagicMock()) == 0
+        resent = dynamodb.batch_write_item.call_args_list[1].kwargs["RequestItems"]["State"]
+        assert resent == [{"PutRequest": {"Item": {"gameId": "002"}}}]
+
+
+@mock_aws
+def test_batch_roundtrip():
+    dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+    dynamodb.create_table(
+        TableName="State",
+        KeySchema=[{"AttributeName": "gameId", "KeyType": "HASH"}],
+        AttributeDefinitions=[{"AttributeName": "gameId", "AttributeType": "S"}],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    items = [{"gameId": f"{i:03d}", "box_etag": f"e{i}"} for i in range(30)]
+    assert batch_put_items(dynamodb, "State", items) == 0
+    found = batch_get_items(dynamodb, "State", "gameId", ["001", "029", "999"])
+    assert set(found) == {"001", "029"}
+    assert found["029"]["box_etag"] == "e29"
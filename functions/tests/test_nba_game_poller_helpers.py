@@ -49,3 +49,39 @@ class TestNbaGamePollerHelpers:
 
         now_before = datetime(2025, 1, 1, 18, 0, tzinfo=ET_ZONE)
         assert not self.module.has_game_started(game, now_before)
+
+
+class TestHostRateLimiter:
+    def _make(self, rps, jitter_ratio=0.0):
+        from nba_game_poller.nba_api import HostRateLimiter
+
+        self.now = 0.0
+        self.slept = []
+
+        def sleep(seconds):
+            self.slept.append(seconds)
+            self.now += seconds
+
+        return HostRateLimiter(rps, jitter_ratio=jitter_ratio, clock=lambda: self.now, sleep=sleep)
+
+    def test_spaces_requests_per_host(self):
+        # Requests to the same host are spaced by 1/rps; other hosts are independent.
+        limiter = self._make(2)
+        assert limiter.acquire("https://cdn.nba.com/a")
+        assert limiter.acquire("https://cdn.nba.com/b")
+        assert limiter.acquire("https://other.example.com/c")
+        assert self.slept == [0.5]
+
+    def test_refuses_slots_past_deadline(self):
+        # A slot that would start after the deadline is refused without sleeping.
+        limiter = self._make(1)
+        assert limiter.acquire("https://cdn.nba.com/a", deadline=0.5)
+        assert not limiter.acquire("https://cdn.nba.com/b", deadline=0.5)
+        assert self.slept == []
+
+    def test_jitter_stays_within_interval_fraction(self):
+        # Jitter delays a slot by at most jitter_ratio * interval.
+        limiter = self._make(1, jitter_ratio=0.5)
+        limiter.acquire("https://cdn.nba.com/a")
+        limiter.acquire("https://cdn.nba.com/b")
+        assert 1.0 <= self.now <= 2.0
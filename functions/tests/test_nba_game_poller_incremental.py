@@ -0,0 +1,125 @@
+import copy
+import json
+import os
+import unittest
+
+from nba_game_poller import playbyplay_incremental
+from nba_game_poller.playbyplay_incremental import PlayByPlayState, process_playbyplay_incremental
+from nba_game_poller.playbyplay_processing import process_playbyplay_payload
+
+
+def _comparable(payload):
+    payload = dict(payload)
+    payload.pop("generatedAt", None)
+    return json.dumps(payload)
+
+
+class TestIncrementalPlayByPlay(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        fixture_path = os.path.join(os.path.dirname(__file__), "fixtures/0012200039.json")
+        with open(fixture_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        cls.actions = payload["actions"] if isinstance(payload, dict) else payload
+
+        cls.home_team_id = "1610612759"  # SAS
+        cls.away_team_id = "1610612740"  # NOP
+
+    def setUp(self):
+        playbyplay_incremental._STATE_CACHE.clear()
+        self.snapshots = {}
+
+    def _full(self, actions):
+        return process_playbyplay_payload(
+            game_id="0012200039",
+            actions=actions,
+            away_team_id=self.away_team_id,
+            home_team_id=self.home_team_id,
+        )
+
+    def _incremental(self, actions, use_snapshots=False):
+        # Copy the feed so every poll sees freshly parsed dicts, like the real poller.
+        return process_playbyplay_incremental(
+            game_id="0012200039",
+            actions=copy.deepcopy(actions),
+            away_team_id=self.away_team_id,
+            home_team_id=self.home_team_id,
+            load_snapshot=self._load if use_snapshots else None,
+            save_snapshot=self._save if use_snapshots else None,
+        )
+
+    def _load(self, game_id):
+        snapshot = self.snapshots.get(game_id)
+        return json.loads(snapshot) if snapshot else None
+
+    def _save(self, game_id, snapshot):
+        self.snapshots[game_id] = json.dumps(snapshot)
+
+    def test_batched_polls_match_full_rebuild(self):
+        for end in range(7, len(self.actions) + 37, 37):
+            actions = self.actions[:end]
+            self.assertEqual(_comparable(self._incremental(actions)), _comparable(self._full(actions)))
+
+    def test_only_new_actions_are_applied(self):
+        self._incremental(self.actions[:200])
+        state = playbyplay_incremental._STATE_CACHE["0012200039"]
+        applied = []
+        original_apply = state.apply
+        state.apply = lambda new_actions: applied.append(len(new_actions)) or original_apply(new_actions)
+
+        self._incremental(self.actions[:230])
+        self.assertEqual(applied, [30])
+
+    def test_edited_action_falls_back_to_full_rebuild(self):
+        self._incremental(self.actions[:300])
+
+        edited = copy.deepcopy(self.actions)
+        edited[10]["description"] = "Williamson S.FOUL (P1.T1) (D.Richardson)"
+        edited[10]["subType"] = "Shooting"
+        self.assertEqual(_comparable(self._incremental(edited)), _comparable(self._full(edited)))
+
+    def test_edit_stamps_catch_a_mid_feed_correction(self):
+        stamped = copy.deepcopy(self.actions)
+        for a in stamped:
+            a["edited"] = "2022-10-05T00:00:00Z"
+        state = PlayByPlayState(self.away_team_id, self.home_team_id)
+        state.apply(stamped[:300])
+        self.assertTrue(state.can_extend(copy.deepcopy(stamped)))
+
+        corrected = copy.deepcopy(stamped)
+        corrected[10]["subType"] = "Shooting"
+        corrected[10]["edited"] = "2022-10-05T01:00:00Z"
+        self.assertFalse(state.can_extend(corrected))
+        self.assertFalse(state.can_extend(stamped[:299]))
+        self.assertFalse(state.can_extend(stamped[:150] + stamped[151:320]))
+
+    def test_removed_action_falls_back_to_full_rebuild(self):
+        self._incremental(self.actions[:300])
+
+        trimmed = self.actions[:150] + self.actions[151:320]
+        self.assertEqual(_comparable(self._incremental(trimmed)), _comparable(self._full(trimmed)))
+
+    def test_snapshot_restores_state_after_cold_start(self):
+        self._incremental(self.actions[:250], use_snapshots=True)
+        playbyplay_incremental._STATE_CACHE.clear()
+
+        restored = PlayByPlayState.from_snapshot(self._load("0012200039"), self.actions)
+        self.assertIsNotNone(restored)
+        self.assertEqual(len(restored.actions), 250)
+
+        result = self._incremental(self.actions, use_snapshots=True)
+        self.assertEqual(_comparable(result), _comparable(self._full(self.actions)))
+
+    def test_snapshot_rejected_when_prefix_changed(self):
+        self._incremental(self.actions[:250], use_snapshots=True)
+
+        edited = copy.deepcopy(self.actions)
+        edited[0]["description"] = "Jump Ball (corrected)"
+        self.assertIsNone(PlayByPlayState.from_snapshot(self._load("0012200039"), edited))
+
+    def test_snapshot_from_older_version_is_rebuilt(self):
+        # Version 2 states could hold duplicate scoreTimeline entries; they must not be resumed.
+        self._incremental(self.actions[:250], use_snapshots=True)
+        snapshot = self._load("0012200039")
+        snapshot["snapshotVersion"] = 2
+        self.assertIsNone(PlayByPlayState.from_snapshot(snapshot, self.actions))
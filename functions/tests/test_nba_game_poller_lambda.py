@@ -1,3 +1,5 @@
+import functools
+import json
 import os
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -5,6 +7,9 @@ from zoneinfo import ZoneInfo
 import pytest
 from unittest.mock import MagicMock
 
+from nba_game_poller.scoreboard_plan import scoreboard_fingerprint
+from nba_shared.metrics import Metrics
+
 
 UTC_ZONE = ZoneInfo("UTC")
 
@@ -54,3 +59,216 @@ class TestNbaGamePollerLambda:
 
         self.module.poller_logic(None)
         assert self.module.disable_self.called
+
+    def test_clients_are_built_on_first_use(self):
+        # Importing the handler builds no AWS clients; the poller task never needs the Scheduler.
+        assert self.module.s3_client is None and self.module.table is None
+        assert self.module.scheduler_client is None
+        self.module.get_nba_date = MagicMock(return_value="2025-01-01")
+        self.module.get_games_from_ddb = MagicMock(return_value=[])
+        self.module.events_client = MagicMock()
+
+        self.module.main_handler({"task": "poller"}, None)
+
+        self.module.events_client.disable_rule.assert_called_once_with(Name="test-rule")
+        assert self.module.scheduler_client is None
+        assert self.module.get_s3_client() is self.module.get_s3_client()
+
+    def test_manager_schedules_kickoff_before_first_tip_off(self):
+        self.module.get_nba_date = MagicMock(return_value="2099-01-01")
+        self.module.get_games_from_ddb = MagicMock(return_value=[{"starttime": "2099-01-01T19:00:00Z"}])
+        self.module.scheduler_client = MagicMock()
+        self.module.events_client = MagicMock()
+
+        self.module.main_handler({"task": "manager"}, None)
+
+        kwargs = self.module.scheduler_client.create_schedule.call_args.kwargs
+        assert kwargs["ScheduleExpression"] == "at(2099-01-01T23:45:00)"
+        assert json.loads(kwargs["Target"]["Input"]) == {"task": "enable_poller"}
+        assert not self.module.events_client.enable_rule.called
+
+    def test_manager_enables_poller_when_scheduling_fails(self):
+        self.module.get_nba_date = MagicMock(return_value="2099-01-01")
+        self.module.get_games_from_ddb = MagicMock(return_value=[{"starttime": "2099-01-01T19:00:00Z"}])
+        self.module.scheduler_client = MagicMock()
+        self.module.scheduler_client.create_schedule.side_effect = RuntimeError("boom")
+        self.module.events_client = MagicMock()
+
+        self.module.main_handler({"task": "manager"}, None)
+
+        self.module.events_client.enable_rule.assert_called_once_with(Name="test-rule")
+
+    def test_poller_logic_concurrent_mode_updates_manifest_serially(self):
+        # Concurrent mode should process every active game and record finals afterwards.
+        games = [
+            {"id": f"00{i}", "date": "2025-01-01", "status": "Q2 5:00"}
+            for i in range(4)
+        ]
+        self.module.get_nba_date = MagicMock(return_value="2025-01-01")
+        self.module.get_games_from_ddb = MagicMock(return_value=games)
+        self.module.POLLER_MAX_WORKERS = 3
+        # No scoreboard: every active game is polled.
+        self.module.fetch_scoreboard_games = MagicMock(return_value=None)
+        self.module.process_game = MagicMock(side_effect=lambda game, **kwargs: game["id"] == "002")
+        self.module.storage_update_manifest = MagicMock()
+
+        self.module.poller_logic(None)
+
+        assert self.module.process_game.call_count == 4
+        for call in self.module.process_game.call_args_list:
+            assert call.kwargs["rate_limiter"] is not None
+        self.module.storage_update_manifest.assert_called_once()
+        assert self.module.storage_update_manifest.call_args.kwargs["game_id"] == "002"
+
+    def test_poller_logic_polls_only_games_the_scoreboard_moved(self):
+        # Unchanged, recently polled games skip their per-game feeds.
+        def sb_game(game_id, score):
+            return {"gameId": game_id, "homeTeam": {"score": score}, "awayTeam": {"score": 0},
+                    "period": 2, "gameClock": "PT05M00.00S", "gameStatus": 2, "gameStatusText": "Q2 5:00"}
+
+        fingerprint = scoreboard_fingerprint
+        now = self.module.time.time()
+        games = [
+            {"id": "001", "date": "2025-01-01", "status": "Q2 5:00",
+             "sb_fingerprint": fingerprint(sb_game("001", 10)), "polled_at": now - 30},
+            {"id": "002", "date": "2025-01-01", "status": "Q2 5:00",
+             "sb_fingerprint": fingerprint(sb_game("002", 10)), "polled_at": now - 30},
+            {"id": "003", "date": "2025-01-01", "status": "Q2 5:00",
+             "sb_fingerprint": fingerprint(sb_game("003", 10)), "polled_at": now - 600},
+        ]
+        self.module.get_nba_date = MagicMock(return_value="2025-01-01")
+        self.module.get_games_from_ddb = MagicMock(return_value=games)
+        self.module.POLLER_MAX_WORKERS = 1
+        self.module.calculate_safe_sleep = MagicMock(return_value=0)
+        self.module.fetch_scoreboard_games = MagicMock(return_value={
+            "001": sb_game("001", 10), "002": sb_game("002", 12), "003": sb_game("003", 10),
+        })
+        self.module.process_game = MagicMock(return_value=False)
+
+        self.module.poller_logic(None)
+
+        plans = {call.args[0]["id"]: call.kwargs["plan"] for call in self.module.process_game.call_args_list}
+        # 002 scored; 003 is due a forced refresh.
+        assert set(plans) == {"002", "003"}
+        assert plans["002"] == {"fingerprint": fingerprint(sb_game("002", 12)), "forced": False}
+        assert plans["003"]["forced"] is True
+
+    def test_poll_loop_polls_close_games_more_often(self):
+        # One 50 s loop: a crunch-time game every 10 s, a blowout every 45 s.
+        class FakeTime:
+            def __init__(self):
+                self.now = 0.0
+
+            def monotonic(self):
+                return self.now
+
+            def time(self):
+                return 1_700_000_000 + self.now
+
+            def sleep(self, seconds):
+                self.now += seconds
+
+        fetches = []
+
+        def scoreboard(user_agent=None):
+            # A new score on every fetch, so no poll is skipped as unchanged.
+            fetches.append(1)
+            n = len(fetches)
+            return {
+                "001": {"gameId": "001", "homeTeam": {"score": 90 + n}, "awayTeam": {"score": 88 + n},
+                        "period": 4, "gameClock": "PT02M00.00S", "gameStatus": 2, "gameStatusText": "Q4 2:00"},
+                "002": {"gameId": "002", "homeTeam": {"score": 70 + n}, "awayTeam": {"score": 40},
+                        "period": 3, "gameClock": "PT05M00.00S", "gameStatus": 2, "gameStatusText": "Q3 5:00"},
+            }
+
+        games = [{"id": "001", "date": "2025-01-01"}, {"id": "002", "date": "2025-01-01"}]
+        self.module.time = FakeTime()
+        self.module.fetch_scoreboard_games = scoreboard
+        self.module.process_game = MagicMock(return_value=False)
+        self.module.POLLER_LOOP_SEC = 50
+        self.module.POLLER_REQUEST_BUDGET_PER_GAME = 20
+
+        assert self.module.run_poll_loop(games, None) == []
+        polled = [call.args[0]["id"] for call in self.module.process_game.call_args_list]
+        assert polled.count("001") == 5
+        assert polled.count("002") == 2
+
+        # With the fixed schedule's budget, the crunch game is served first and the loop stops when it runs out.
+        self.module.time = FakeTime()
+        self.module.process_game = MagicMock(return_value=False)
+        self.module.POLLER_REQUEST_BUDGET_PER_GAME = 3
+        self.module.run_poll_loop(games, None)
+        polled = [call.args[0]["id"] for call in self.module.process_game.call_args_list]
+        assert polled == ["001", "002", "001"]
+
+    def test_process_game_records_fingerprint_only_with_new_data(self):
+        # A 304 on both feeds leaves the fingerprint unrecorded so the game is retried.
+        game = {"id": "001", "date": "2025-01-01"}
+        self.module.update_ddb_game = MagicMock()
+        self.module.fetch_nba_data_urllib = MagicMock(return_value=(None, "etag"))
+
+        self.module.process_game(game, plan={"fingerprint": "fp", "forced": False})
+        self.module.update_ddb_game.assert_not_called()
+
+        self.module.process_game(game, plan={"fingerprint": "fp", "forced": True})
+        updates = self.module.update_ddb_game.call_args.args[2]
+        assert set(updates) == {"polled_at"}
+
+        self.module.fetch_nba_data_urllib = MagicMock(side_effect=[
+            (None, "play-etag"),
+            ({"game": {"gameStatusText": "Q2 5:00", "homeTeam": {}, "awayTeam": {}}}, "box-etag"),
+        ])
+        self.module.upload_json_to_s3 = MagicMock()
+        self.module.process_game(game, plan={"fingerprint": "fp", "forced": False})
+        updates = self.module.update_ddb_game.call_args.args[2]
+        assert updates["sb_fingerprint"] == "fp"
+        assert updates["box_etag"] == "box-etag"
+
+    def test_process_game_keeps_bookkeeping_off_the_game_item(self):
+        # With a state table, ETags go there; an identical box score writes nothing to NBA_Games.
+        self.module.POLLER_STATE_TABLE = "PollerState"
+        self.module.update_ddb_game = MagicMock()
+        self.module.save_poller_states = MagicMock()
+        self.module.upload_json_to_s3 = MagicMock()
+        box = {"game": {"gameStatusText": "Q2 5:00", "gameClock": "PT05M00.00S", "homeTeam": {}, "awayTeam": {}}}
+        game = {"id": "001", "date": "2025-01-01"}
+
+        self.module.fetch_nba_data_urllib = MagicMock(side_effect=[(None, "p1"), (box, "b1")])
+        self.module.process_game(game)
+        attrs = self.module.update_ddb_game.call_args.args[2]
+        assert attrs["status"] == "Q2 5:00"
+        assert "box_etag" not in attrs
+        assert self.module.save_poller_states.call_args.args[0] == [{"gameId": "001", "box_etag": "b1"}]
+
+        self.module.update_ddb_game.reset_mock()
+        self.module.fetch_nba_data_urllib = MagicMock(side_effect=[(None, "p1"), (box, "b2")])
+        self.module.process_game(game)
+        self.module.update_ddb_game.assert_not_called()
+        assert self.module.save_poller_states.call_args.args[0][0]["box_etag"] == "b2"
+
+    def test_process_game_emits_stage_metrics(self, capsys):
+        # One EMF line per game, with fetch, upload and DDB stages and the 304 flag per feed.
+        self.module.Metrics = functools.partial(Metrics, enabled=True)
+        self.module.update_ddb_game = MagicMock()
+        self.module.upload_json_to_s3 = MagicMock()
+        self.module.fetch_nba_data_urllib = MagicMock(side_effect=[
+            (None, "play-etag"),
+            ({"game": {"gameStatusText": "Q2 5:00", "homeTeam": {}, "awayTeam": {}}}, "box-etag"),
+        ])
+
+        self.module.process_game({"id": "001", "date": "2025-01-01"})
+
+        records = [json.loads(line) for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+        assert len(records) == 1
+        assert records[0]["gameId"] == "001"
+        assert "gameMs" in records[0] and "ddbFlushMs" in records[0]
+        assert self.module.upload_json_to_s3.call_args.kwargs["metrics"] is not None
+
+    def test_get_poll_deadline_reserves_buffer(self):
+        # The deadline should leave room for the safety buffer and one request.
+        context = MagicMock()
+        context.get_remaining_time_in_millis.return_value = 10000
+        deadline = self.module.get_poll_deadline(context)
+        remaining = deadline - self.module.time.monotonic()
+        assert 3.0 < remaining <= 3.5
+        assert self.module.get_poll_deadline(None) is None
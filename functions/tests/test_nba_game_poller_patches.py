@@ -0,0 +1,68 @@
+import copy
+import json
+import os
+import unittest
+
+from nba_game_poller.patches import apply_patch, compute_patch
+from nba_game_poller.playbyplay_processing import process_playbyplay_payload
+
+
+class TestPatches(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        fixture_path = os.path.join(os.path.dirname(__file__), "fixtures/0012200039.json")
+        with open(fixture_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        cls.actions = payload["actions"] if isinstance(payload, dict) else payload
+
+    def _processed(self, count):
+        return process_playbyplay_payload(
+            game_id="0012200039",
+            actions=self.actions[:count],
+            away_team_id="1610612740",
+            home_team_id="1610612759",
+            include_actions=False,
+            include_all_actions=False,
+        )
+
+    def test_playbyplay_patch_round_trips_and_is_small(self):
+        prev = self._processed(400)
+        new = self._processed(410)
+        ops = compute_patch(prev, new, ignore=("generatedAt",))
+
+        patched = apply_patch(copy.deepcopy(prev), ops)
+        patched["generatedAt"] = new["generatedAt"]
+        self.assertEqual(patched, new)
+        # New actions are appended rather than resending whole player lists.
+        self.assertTrue(any(op["op"] == "append" for op in ops))
+        self.assertLess(len(json.dumps(ops)), len(json.dumps(new)) / 5)
+
+    def test_box_player_stats_patched_in_place(self):
+        prev = {
+            "gameClock": "PT05M00.00S",
+            "homeTeam": {
+                "score": 50,
+                "players": [
+                    {"personId": 1, "statistics": {"points": 10, "assists": 2}},
+                    {"personId": 2, "statistics": {"points": 4, "assists": 0}},
+                ],
+            },
+        }
+        new = copy.deepcopy(prev)
+        new["gameClock"] = "PT04M41.00S"
+        new["homeTeam"]["score"] = 52
+        new["homeTeam"]["players"][1]["statistics"]["points"] = 6
+
+        ops = compute_patch(prev, new)
+        self.assertIn({"op": "set", "path": ["homeTeam", "players", 1, "statistics", "points"], "value": 6}, ops)
+        self.assertEqual(apply_patch(copy.deepcopy(prev), ops), new)
+
+    def test_append_rejects_mismatched_base(self):
+        with self.assertRaises(ValueError):
+            apply_patch({"a": [1]}, [{"op": "append", "path": ["a"], "from": 2, "values": [3]}])
+
+    def test_removed_keys_and_reordered_lists(self):
+        prev = {"a": 1, "b": [{"personId": 1}, {"personId": 2}]}
+        new = {"b": [{"personId": 2}, {"personId": 1}]}
+        ops = compute_patch(prev, new)
+        self.assertEqual(apply_patch(copy.deepcopy(prev), ops), new)
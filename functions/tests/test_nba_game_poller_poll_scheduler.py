@@ -0,0 +1,83 @@
+import unittest
+
+from nba_game_poller.poll_scheduler import (
+    BLOWOUT,
+    CRUNCH,
+    FINAL,
+    HALFTIME,
+    LIVE,
+    PERIOD_BREAK,
+    PREGAME,
+    PollScheduler,
+    game_phase,
+)
+
+
+def sb_game(home, away, period=2, clock="PT05M00.00S", status=2, text="Q2 5:00"):
+    return {
+        "homeTeam": {"score": home},
+        "awayTeam": {"score": away},
+        "period": period,
+        "gameClock": clock,
+        "gameStatus": status,
+        "gameStatusText": text,
+    }
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestGamePhase(unittest.TestCase):
+    def test_phases(self):
+        self.assertEqual(game_phase(None), LIVE)
+        self.assertEqual(game_phase(sb_game(50, 48)), LIVE)
+        self.assertEqual(game_phase(sb_game(0, 0, period=0, clock="", status=1, text="7:30 pm ET")), PREGAME)
+        self.assertEqual(game_phase(sb_game(99, 97, period=4, clock="PT00M00.00S", status=3, text="Final")), FINAL)
+        self.assertEqual(game_phase(sb_game(55, 50, clock="PT00M00.00S", text="Half")), HALFTIME)
+        self.assertEqual(game_phase(sb_game(30, 28, period=1, clock="PT00M00.00S", text="End Q1")), PERIOD_BREAK)
+        self.assertEqual(game_phase(sb_game(90, 86, period=4, clock="PT02M10.00S", text="Q4 2:10")), CRUNCH)
+        self.assertEqual(game_phase(sb_game(104, 104, period=5, clock="PT04M00.00S", text="OT 4:00")), CRUNCH)
+        # Close but early in the fourth is ordinary play.
+        self.assertEqual(game_phase(sb_game(80, 78, period=4, clock="PT09M00.00S", text="Q4 9:00")), LIVE)
+        self.assertEqual(game_phase(sb_game(70, 44, period=3)), BLOWOUT)
+        self.assertEqual(game_phase(sb_game(100, 80, period=4, clock="PT02M00.00S")), BLOWOUT)
+
+
+class TestPollScheduler(unittest.TestCase):
+    def test_due_orders_by_phase_then_time(self):
+        clock = FakeClock()
+        scheduler = PollScheduler(["a", "b", "c"], clock=clock)
+        scheduler.reschedule("a", BLOWOUT)
+        scheduler.reschedule("b", CRUNCH)
+        scheduler.reschedule("c", LIVE)
+        self.assertEqual(scheduler.due(), [])
+        self.assertEqual(scheduler.next_due(), 10)
+
+        clock.now = 60
+        self.assertEqual(scheduler.due(), ["b", "c", "a"])
+        clock.now = 19
+        self.assertEqual(scheduler.due(slack=1), ["b", "c"])
+
+    def test_final_games_are_dropped(self):
+        scheduler = PollScheduler(["a", "b"], clock=FakeClock())
+        scheduler.reschedule("a", FINAL)
+        self.assertEqual(len(scheduler), 1)
+        scheduler.drop("b")
+        self.assertIsNone(scheduler.next_due())
+
+    def test_charge_stops_at_budget(self):
+        scheduler = PollScheduler(["a"], request_budget=5, clock=FakeClock())
+        self.assertTrue(scheduler.charge(2))
+        self.assertTrue(scheduler.charge(2))
+        self.assertFalse(scheduler.charge(2))
+        self.assertEqual(scheduler.requests_left, 1)
+        self.assertTrue(PollScheduler(["a"], clock=FakeClock()).charge(100))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,13 @@ import json
 import os
 import unittest
 from datetime import datetime
-from nba_game_poller.playbyplay_processing import process_playbyplay_payload, time_to_seconds
+from nba_game_poller.playbyplay_processing import (
+    SCORE_SERIES_BUCKETS,
+    build_score_series,
+    process_playbyplay_payload,
+    process_score_timeline,
+    time_to_seconds,
+)
 
 class TestPlayByPlayProcessing(unittest.TestCase):
     @classmethod
@@ -106,3 +112,78 @@ class TestPlayByPlayProcessing(unittest.TestCase):
                     self.assertIsNotNone(seg["start"])
                     self.assertIsNotNone(seg["end"])
         self.assertGreater(checked, 0, "Expected at least one playtime segment to be produced")
+
+
+def _score(period, clock, away, home):
+    return {"period": period, "clock": clock, "scoreAway": str(away), "scoreHome": str(home)}
+
+
+class TestScoreSeries(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        fixture_path = os.path.join(os.path.dirname(__file__), "fixtures/0012200039.json")
+        with open(fixture_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        actions = payload["actions"] if isinstance(payload, dict) else payload
+        cls.processed = process_playbyplay_payload(
+            game_id="0012200039",
+            actions=actions,
+            away_team_id="1610612740",
+            home_team_id="1610612759",
+        )
+        cls.series = cls.processed["scoreSeries"]
+
+    def test_one_timeline_entry_per_scoring_action(self):
+        timeline = process_score_timeline([
+            _score(1, "PT11M00.00S", 2, 0),
+            # A correction that moves both scores at once is one change, not two.
+            _score(1, "PT10M00.00S", 3, 2),
+            _score(1, "PT09M00.00S", 3, 2),
+        ])
+        self.assertEqual([(s["away"], s["home"]) for s in timeline], [("2", "0"), ("3", "2")])
+
+    def test_exact_series_matches_the_timeline(self):
+        t, away, home = self.series["t"], self.series["away"], self.series["home"]
+        self.assertEqual(t, sorted(set(t)))
+        self.assertEqual((away[-1], home[-1]), (111, 97))
+        self.assertEqual(self.series["lastSecond"], 2880)
+
+    def test_levels_downsample_without_losing_peaks(self):
+        t, away, home = self.series["t"], self.series["away"], self.series["home"]
+        self.assertEqual([level["bucket"] for level in self.series["levels"]], list(SCORE_SERIES_BUCKETS))
+        for level in self.series["levels"]:
+            bucket = level["bucket"]
+            self.assertEqual(len(level["margin"]), 2880 // bucket + 1)
+            self.assertEqual(level["margin"][-1], 14)
+            for i, (margin, lead) in enumerate(zip(level["margin"], level["lead"])):
+                # The margin carried in from the previous bucket counts too.
+                margins = [level["margin"][i - 1] if i else 0]
+                margins += [a - h for s, a, h in zip(t, away, home) if i * bucket <= s < (i + 1) * bucket]
+                self.assertEqual(abs(lead), max(abs(m) for m in margins))
+                self.assertGreaterEqual(abs(lead), abs(margin))
+
+    def test_lead_changes_and_runs(self):
+        timeline = process_score_timeline([
+            _score(1, "PT11M30.00S", 2, 0),
+            _score(1, "PT11M00.00S", 2, 3),
+            _score(1, "PT10M30.00S", 4, 3),
+            _score(1, "PT10M00.00S", 7, 3),
+            _score(1, "PT09M30.00S", 10, 3),
+            _score(1, "PT09M00.00S", 12, 3),
+            _score(1, "PT08M30.00S", 12, 5),
+            _score(1, "PT08M00.00S", 12, 12),
+            _score(1, "PT07M30.00S", 12, 14),
+        ])
+        series = build_score_series(timeline, {"period": 1, "clock": "PT07M00.00S"})
+        # Home goes up 3-2, away retakes it, home ties at 12 and then leads.
+        self.assertEqual(series["leadChanges"], [60, -1, 90, 1, 270, -1])
+        # Away's 10-0 from 90 to 180, then home's 11-0 from 210 to 270.
+        self.assertEqual(series["runs"], [90, 180, 1, 10, 210, 270, -1, 11])
+        self.assertEqual(series["levels"][0]["margin"], [2, 1, 7, 7, -2, -2])
+        self.assertEqual(series["levels"][0]["lead"], [2, 2, 7, 9, 7, -2])
+
+    def test_empty_timeline(self):
+        series = build_score_series([], None)
+        self.assertEqual(series["t"], [])
+        self.assertEqual([level["margin"] for level in series["levels"]], [[0], [0]])
+        self.assertEqual((series["leadChanges"], series["runs"]), ([], []))
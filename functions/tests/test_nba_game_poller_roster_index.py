@@ -0,0 +1,180 @@
+import copy
+import json
+import os
+import unittest
+
+from nba_game_poller import playbyplay_incremental
+from nba_game_poller.playbyplay_incremental import PlayByPlayState, process_playbyplay_incremental
+from nba_game_poller.playbyplay_processing import process_playbyplay_payload
+from nba_game_poller.roster_index import PlayerIndex, roster_from_boxscore
+
+CLE = 1610612739
+DEN = 1610612743
+
+
+def _player(person_id, first, family, team_id):
+    return {"personId": person_id, "teamId": team_id, "firstName": first, "familyName": family,
+            "nameI": f"{first[0]}. {family}"}
+
+
+ROSTER = [
+    _player(1, "Kevin", "Love", CLE),
+    _player(2, "Kevin", "Porter Jr.", CLE),
+    _player(3, "Isaiah", "Jones", CLE),
+    _player(4, "Tyus", "Jones", CLE),
+    _player(5, "Nikola", "Jokić", DEN),
+    _player(6, "Jamal", "Murray", DEN),
+]
+
+
+def _action(n, team_id, tricode, person_id, name, description, action_type="", **extra):
+    return {
+        "actionNumber": n, "actionId": n, "clock": f"PT11M{60 - n:02d}.00S", "period": 1,
+        "teamId": team_id, "teamTricode": tricode, "personId": person_id, "playerName": name,
+        "playerNameI": "", "description": description, "actionType": action_type,
+        "scoreHome": "", "scoreAway": "", **extra,
+    }
+
+
+def _comparable(payload):
+    payload = dict(payload)
+    payload.pop("generatedAt", None)
+    return json.dumps(payload)
+
+
+class TestRosterIndex(unittest.TestCase):
+    def test_roster_from_boxscore(self):
+        box_game = {
+            "homeTeam": {"teamId": DEN, "players": [
+                {"personId": 5, "firstName": "Nikola", "familyName": "Jokić", "nameI": "N. Jokić", "name": "Nikola Jokić"},
+            ]},
+            "awayTeam": {"teamId": CLE, "players": [{"personId": 0, "familyName": "?"}]},
+        }
+        self.assertEqual(roster_from_boxscore(box_game), [
+            {"personId": 5, "teamId": DEN, "firstName": "Nikola", "familyName": "Jokić", "nameI": "N. Jokić"},
+        ])
+        self.assertEqual(roster_from_boxscore({}), [])
+
+    def test_description_spellings_resolve_to_the_roster_name(self):
+        index = PlayerIndex(ROSTER)
+        self.assertEqual(index.resolve(CLE, "Porter"), "Porter Jr.")
+        self.assertEqual(index.resolve(DEN, "Jokic"), "Jokić")
+        self.assertEqual(index.resolve(DEN, "Nikola Jokic"), "Jokić")
+        self.assertIsNone(index.resolve(CLE, "Jokic"))
+
+    def test_shared_family_names_resolve_by_initial_only(self):
+        index = PlayerIndex(ROSTER)
+        self.assertIsNone(index.find(CLE, "Jones"))
+        self.assertEqual(index.resolve(CLE, "T. Jones"), "T. Jones")
+        self.assertEqual(index.person_key(3), "I. Jones")
+
+    def test_first_key_sticks(self):
+        index = PlayerIndex(ROSTER, keys={2: "Porter"})
+        self.assertEqual(index.person_key(2), "Porter")
+        index.set_roster(ROSTER[:1])
+        self.assertEqual(index.person_key(2), "Porter")
+        self.assertIsNone(index.person_key(99))
+
+    def test_snapshot_round_trip(self):
+        index = PlayerIndex(ROSTER)
+        index.person_key(5)
+        restored = PlayerIndex.from_snapshot(json.loads(json.dumps(index.to_snapshot())))
+        self.assertEqual(restored.roster, ROSTER)
+        self.assertEqual(restored.keys, {5: "Jokić"})
+
+
+class TestRosterAttribution(unittest.TestCase):
+    def _process(self, actions, roster):
+        return process_playbyplay_payload(
+            game_id="g", actions=actions, away_team_id=CLE, home_team_id=DEN,
+            include_actions=False, include_all_actions=False, roster=roster,
+        )
+
+    def test_substitution_and_assist_use_roster_names(self):
+        actions = [
+            _action(1, CLE, "CLE", 1, "Love", "SUB: Porter FOR Love", "Substitution"),
+            _action(2, CLE, "CLE", 1, "Love", "Love 3' Layup (2 PTS) (Porter 1 AST)", "Made Shot"),
+            _action(3, CLE, "CLE", 2, "Porter Jr.", "Porter Jr. 25' 3PT (3 PTS)", "Made Shot"),
+        ]
+        processed = self._process(actions, ROSTER)
+        self.assertEqual(list(processed["awayActions"]), ["Love", "Porter Jr."])
+        assist = processed["awayActions"]["Porter Jr."][0]
+        self.assertEqual(assist["actionType"], "Assist")
+        self.assertEqual(assist["personId"], 2)
+        self.assertEqual(processed["awayPlayerTimeline"]["Porter Jr."][0]["start"], "PT11M59.00S")
+
+    def test_assist_person_id_wins_over_the_description(self):
+        actions = [
+            _action(1, DEN, "DEN", 6, "Murray", "Murray 3' Layup (2 PTS) (Jokic 1 AST)", "Made Shot",
+                    assistPersonId=5),
+        ]
+        processed = self._process(actions, ROSTER)
+        self.assertEqual(list(processed["homeActions"]), ["Murray", "Jokić"])
+        self.assertEqual(processed["homeActions"]["Jokić"][0]["playerNameI"], "N. Jokić")
+
+    def test_new_format_substitution_keys_on_the_actions_player(self):
+        actions = [
+            _action(1, DEN, "DEN", 5, "Jokić", "SUB in: Jokic", "substitution"),
+            _action(2, DEN, "DEN", 5, "Jokić", "Jokić REBOUND (Off:0 Def:1)", "Rebound"),
+            _action(3, DEN, "DEN", 5, "Jokić", "SUB out: Jokic", "substitution"),
+        ]
+        processed = self._process(actions, ROSTER)
+        self.assertEqual(list(processed["homePlayerTimeline"]), ["Jokić"])
+        self.assertEqual(processed["homePlayerTimeline"]["Jokić"],
+                         [{"start": "PT11M59.00S", "period": 1, "end": "PT11M57.00S"}])
+
+    def test_unresolved_names_fall_back_to_the_description(self):
+        actions = [_action(1, CLE, "CLE", 1, "Love", "SUB: Jones FOR Love", "Substitution")]
+        self.assertEqual(list(self._process(actions, ROSTER)["awayActions"]), ["Love", "Jones"])
+        self.assertEqual(list(self._process(actions, None)["awayActions"]), ["Love", "Jones"])
+
+
+class TestRosterOnFixture(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        fixture_path = os.path.join(os.path.dirname(__file__), "fixtures/0012200039.json")
+        with open(fixture_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        cls.actions = payload["actions"] if isinstance(payload, dict) else payload
+        players = {}
+        for a in cls.actions:
+            if a.get("personId") and a.get("playerName"):
+                players.setdefault(a["personId"], {
+                    "personId": a["personId"], "teamId": a["teamId"], "firstName": "",
+                    "familyName": a["playerName"], "nameI": a["playerNameI"],
+                })
+        cls.roster = list(players.values())
+
+    def setUp(self):
+        playbyplay_incremental._STATE_CACHE.clear()
+
+    def _full(self, actions, roster):
+        return process_playbyplay_payload(
+            game_id="0012200039", actions=actions, away_team_id=1610612740, home_team_id=1610612759, roster=roster,
+        )
+
+    def _incremental(self, actions, roster, **kwargs):
+        return process_playbyplay_incremental(
+            game_id="0012200039", actions=copy.deepcopy(actions), away_team_id=1610612740,
+            home_team_id=1610612759, roster=roster, **kwargs,
+        )
+
+    def test_same_player_keys_as_description_parsing(self):
+        with_roster = self._full(self.actions, self.roster)
+        without = self._full(self.actions, None)
+        for side in ("awayActions", "homeActions"):
+            self.assertEqual(list(with_roster[side]), list(without[side]))
+        self.assertEqual(with_roster["awayPlayerTimeline"], without["awayPlayerTimeline"])
+        self.assertEqual(with_roster["homePlayerTimeline"], without["homePlayerTimeline"])
+
+    def test_incremental_keeps_roster_between_polls(self):
+        snapshots = {}
+        self._incremental(self.actions[:200], self.roster,
+                          save_snapshot=lambda g, s: snapshots.__setitem__(g, json.dumps(s)))
+        # The next poll's box score was a 304: no roster passed.
+        result = self._incremental(self.actions, None)
+        self.assertEqual(_comparable(result), _comparable(self._full(self.actions, self.roster)))
+
+        restored = PlayByPlayState.from_snapshot(json.loads(snapshots["0012200039"]), self.actions)
+        self.assertEqual(restored.index.roster, self.roster)
+        self.assertTrue(restored.index.keys)
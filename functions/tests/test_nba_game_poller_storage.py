@@ -0,0 +1,290 @@
+import gzip
+import json
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+from unittest.mock import MagicMock
+
+from nba_game_poller import payload_codecs, storage
+from nba_shared.metrics import Metrics
+
+
+class TestUploadJsonToS3:
+    @pytest.fixture(autouse=True)
+    def setup_s3(self):
+        with mock_aws():
+            self.bucket = "test-bucket"
+            self.s3 = boto3.client("s3", region_name="us-east-1")
+            self.s3.create_bucket(Bucket=self.bucket)
+            storage._LAST_UPLOADED_DIGESTS.clear()
+            storage._LAST_UPLOADED_PAYLOADS.clear()
+            yield
+
+    def _upload(self, data, is_final=False):
+        return storage.upload_json_to_s3(
+            s3_client=self.s3,
+            bucket=self.bucket,
+            prefix="data/",
+            key="processed-data/playByPlayData/001.json",
+            data=data,
+            is_final=is_final,
+            skip_unchanged=True,
+        )
+
+    def _stored(self):
+        obj = self.s3.get_object(Bucket=self.bucket, Key="data/processed-data/playByPlayData/001.json.gz")
+        return json.loads(gzip.decompress(obj["Body"].read()))
+
+    def test_skips_when_only_volatile_fields_change(self):
+        # A new generatedAt alone should not produce a new object.
+        assert self._upload({"gameId": "001", "generatedAt": "t1", "scoreTimeline": [1]})
+        assert not self._upload({"gameId": "001", "generatedAt": "t2", "scoreTimeline": [1]})
+        assert self._stored()["generatedAt"] == "t1"
+
+    def test_stored_body_is_stamped_with_its_digest(self, monkeypatch):
+        # The digest hashes the same serialization that is uploaded; nothing is encoded twice.
+        calls = []
+        dumps_bytes = storage.jsoncodec.dumps_bytes
+        monkeypatch.setattr(storage.jsoncodec, "dumps_bytes", lambda obj: calls.append(obj) or dumps_bytes(obj))
+        data = {"gameId": "001", "generatedAt": "t1", "scoreTimeline": [1, 2]}
+        assert self._upload(data)
+        assert [set(c) for c in calls] == [{"gameId", "scoreTimeline"}, {"generatedAt", "contentVersion"}]
+        stored = self._stored()
+        assert stored == {**data, "contentVersion": storage.content_digest(data, "s-maxage=0, max-age=0, must-revalidate")}
+
+    def test_records_upload_metrics(self):
+        # Sizes and stage timings for a write, and the skip flag for an unchanged payload.
+        metrics = Metrics("Test", enabled=True)
+        data = {"gameId": "001", "scoreTimeline": [1]}
+        for _ in range(2):
+            storage.upload_json_to_s3(
+                s3_client=self.s3,
+                bucket=self.bucket,
+                prefix="data/",
+                key="processed-data/playByPlayData/001.json",
+                data=data,
+                skip_unchanged=True,
+                metrics=metrics.prefixed("play"),
+            )
+        record = metrics.to_record()
+        assert record["playUnchanged"] == [0, 1]
+        assert record["playPayloadBytes"] > 0
+        assert {"playSerializeMs", "playGzipMs", "playS3PutMs"} <= set(record)
+
+    def test_uploads_when_content_changes(self):
+        # Any visible change is written through.
+        assert self._upload({"gameId": "001", "generatedAt": "t1", "scoreTimeline": [1]})
+        assert self._upload({"gameId": "001", "generatedAt": "t2", "scoreTimeline": [1, 2]})
+        assert self._stored()["scoreTimeline"] == [1, 2]
+
+    def test_uploads_when_cache_control_changes(self):
+        # Going final changes Cache-Control, so the object must be rewritten.
+        data = {"gameId": "001", "generatedAt": "t1"}
+        assert self._upload(data)
+        assert self._upload(data, is_final=True)
+
+    def test_cold_start_uses_object_metadata(self):
+        # Without the warm cache, the digest is recovered from the stored object's metadata.
+        assert self._upload({"gameId": "001", "generatedAt": "t1"})
+        storage._LAST_UPLOADED_DIGESTS.clear()
+        assert not self._upload({"gameId": "001", "generatedAt": "t2"})
+
+    def test_default_always_uploads(self):
+        # Without skip_unchanged the previous behaviour (always PUT) is preserved.
+        for _ in range(2):
+            assert storage.upload_json_to_s3(
+                s3_client=self.s3,
+                bucket=self.bucket,
+                prefix="data/",
+                key="boxData/001.json",
+                data={"gameId": "001"},
+            )
+
+    def test_publish_patch_writes_delta_and_metadata(self):
+        # The second upload from a warm container publishes a delta against the first.
+        key = "processed-data/playByPlayData/001.json"
+        first = {"gameId": "001", "generatedAt": "t1", "scoreTimeline": [1]}
+        second = {"gameId": "001", "generatedAt": "t2", "scoreTimeline": [1, 2]}
+        for data in (first, second):
+            storage.upload_json_to_s3(
+                s3_client=self.s3,
+                bucket=self.bucket,
+                prefix="data/",
+                key=key,
+                data=data,
+                publish_patch=True,
+            )
+
+        head = self.s3.head_object(Bucket=self.bucket, Key=f"data/{key}.gz")
+        metadata = head["Metadata"]
+        patch_key = metadata["patch-key"]
+        assert patch_key.startswith("data/patches/processed-data/playByPlayData/001/")
+        assert not patch_key.endswith(".json.gz")
+
+        patch = json.loads(gzip.decompress(self.s3.get_object(Bucket=self.bucket, Key=patch_key)["Body"].read()))
+        assert patch["version"] == metadata["content-sha256"]
+        assert patch["baseVersion"] == metadata["patch-base-sha256"]
+        assert patch["ops"] == [{"op": "append", "path": ["scoreTimeline"], "from": 1, "values": [2]}]
+        assert self._stored()["contentVersion"] == patch["version"]
+
+    def test_final_upload_drops_the_patch_base(self):
+        key = "processed-data/playByPlayData/001.json"
+        for data, is_final in (({"gameId": "001", "period": 4}, False), ({"gameId": "001", "period": 5}, True)):
+            storage.upload_json_to_s3(
+                s3_client=self.s3,
+                bucket=self.bucket,
+                prefix="data/",
+                key=key,
+                data=data,
+                is_final=is_final,
+                publish_patch=True,
+            )
+        full_key = f"data/{key}.gz"
+        assert full_key not in storage._LAST_UPLOADED_PAYLOADS
+        assert full_key in storage._LAST_UPLOADED_DIGESTS
+
+    def test_sibling_codecs_written_before_gzip(self):
+        class ReversedCodec:
+            suffix = ".rev"
+            content_type = "application/octet-stream"
+            content_encoding = None
+
+            def compress(self, data):
+                return data[::-1]
+
+            def metadata(self):
+                return {"codec": "rev"}
+
+        puts = []
+        put_object = self.s3.put_object
+        self.s3.put_object = lambda **kwargs: puts.append(kwargs["Key"]) or put_object(**kwargs)
+        data = {"gameId": "001", "generatedAt": "t1"}
+        storage.upload_json_to_s3(
+            s3_client=self.s3,
+            bucket=self.bucket,
+            prefix="data/",
+            key="boxData/001.json",
+            data=data,
+            skip_unchanged=True,
+            sibling_codecs=[ReversedCodec()],
+        )
+
+        assert puts == ["data/boxData/001.json.rev", "data/boxData/001.json.gz"]
+        sibling = self.s3.get_object(Bucket=self.bucket, Key="data/boxData/001.json.rev")
+        assert json.loads(sibling["Body"].read()[::-1]) == {**data, "contentVersion": sibling["Metadata"]["content-sha256"]}
+        assert sibling["Metadata"]["codec"] == "rev"
+
+
+class TestPayloadCodecs:
+    def test_gzip_round_trips(self):
+        codec = payload_codecs.GzipCodec(level=6)
+        assert codec.decompress(codec.compress(b'{"a": 1}')) == b'{"a": 1}'
+
+    def test_unavailable_and_unknown_codecs_are_skipped(self, monkeypatch):
+        monkeypatch.setattr(payload_codecs, "zstd", None)
+        assert payload_codecs.sibling_codecs(["gzip", "zstd", "brotli"]) == []
+
+    @pytest.mark.skipif(not payload_codecs.zstd_available(), reason="compression.zstd needs Python 3.14+")
+    def test_zstd_dictionary_round_trips(self):
+        samples = [json.dumps({"gameId": f"00{i}", "homeScore": i, "players": ["A", "B"] * i}).encode() for i in range(200)]
+        dictionary = payload_codecs.train_zstd_dictionary(samples, size=4096)
+        codec = payload_codecs.ZstdCodec(dictionary=dictionary, dictionary_key="data/codecs/zstd/1.dict")
+        assert codec.decompress(codec.compress(samples[7])) == samples[7]
+        assert codec.metadata() == {"zstd-dict": "data/codecs/zstd/1.dict"}
+
+
+class TestSnapshots:
+    def test_round_trips_and_missing_is_none(self):
+        with mock_aws():
+            s3 = boto3.client("s3", region_name="us-east-1")
+            s3.create_bucket(Bucket="test-bucket")
+            assert storage.load_json_snapshot(s3_client=s3, bucket="test-bucket", key="state/1.gz") is None
+            storage.save_json_snapshot(s3_client=s3, bucket="test-bucket", key="state/1.gz", data={"a": [1]})
+            assert storage.load_json_snapshot(s3_client=s3, bucket="test-bucket", key="state/1.gz") == {"a": [1]}
+
+    def test_access_denied_reads_as_missing(self):
+        # Without s3:ListBucket a missing key comes back as 403, not NoSuchKey.
+        s3 = MagicMock()
+        s3.get_object.side_effect = ClientError({"Error": {"Code": "AccessDenied"}}, "GetObject")
+        assert storage.load_json_snapshot(s3_client=s3, bucket="b", key="k") is None
+
+        s3.get_object.side_effect = ClientError({"Error": {"Code": "SlowDown"}}, "GetObject")
+        with pytest.raises(ClientError):
+            storage.load_json_snapshot(s3_client=s3, bucket="b", key="k")
+
+
+class TestManifest:
+    @pytest.fixture(autouse=True)
+    def setup_s3(self):
+        with mock_aws():
+            self.bucket = "test-bucket"
+            self.s3 = boto3.client("s3", region_name="us-east-1")
+            self.s3.create_bucket(Bucket=self.bucket)
+            storage._KNOWN_MANIFEST_SHARDS.clear()
+            yield
+
+    def _read(self, key):
+        return json.loads(self.s3.get_object(Bucket=self.bucket, Key=key)["Body"].read())
+
+    def test_shard_for_game_id(self):
+        assert storage.manifest_shard_for("0022400123") == "2024-25"
+        assert storage.manifest_shard_for("0049900001") == "2099-00"
+        assert storage.manifest_shard_for("x") == "other"
+
+    def test_appends_to_season_shard_and_registers_it(self):
+        for game_id in ("0022400001", "0022400002", "0022400001", "0022300999"):
+            storage.update_manifest(s3_client=self.s3, bucket=self.bucket, prefix="data/", game_id=game_id)
+
+        assert self._read("data/manifest/2024-25.json") == ["0022400001", "0022400002"]
+        assert self._read("data/manifest/2023-24.json") == ["0022300999"]
+        index = self._read("data/manifest/index.json")
+        assert index["shards"] == {
+            "2024-25": "data/manifest/2024-25.json",
+            "2023-24": "data/manifest/2023-24.json",
+        }
+
+    def test_concurrent_writer_is_not_lost(self):
+        # Another poller appends between our read and write; the conditional PUT retries instead of clobbering it.
+        storage.update_manifest(s3_client=self.s3, bucket=self.bucket, prefix="data/", game_id="0022400001")
+        real_put = self.s3.put_object
+        raced = []
+
+        def racing_put(**kwargs):
+            if not raced and kwargs["Key"] == "data/manifest/2024-25.json":
+                raced.append(True)
+                real_put(Bucket=self.bucket, Key=kwargs["Key"], Body=json.dumps(["0022400001", "0022400050"]))
+            return real_put(**kwargs)
+
+        self.s3.put_object = racing_put
+        storage.update_manifest(s3_client=self.s3, bucket=self.bucket, prefix="data/", game_id="0022400002")
+
+        assert self._read("data/manifest/2024-25.json") == ["0022400001", "0022400050", "0022400002"]
+
+    def test_access_denied_first_read_creates_the_object(self):
+        # Without s3:ListBucket, S3 answers a GET on a missing key with 403 instead of NoSuchKey.
+        real_get = self.s3.get_object
+
+        def denied_get(**kwargs):
+            if not self.s3.list_objects_v2(Bucket=self.bucket, Prefix=kwargs["Key"]).get("KeyCount"):
+                raise ClientError({"Error": {"Code": "AccessDenied"}}, "GetObject")
+            return real_get(**kwargs)
+
+        self.s3.get_object = denied_get
+        storage.update_manifest(s3_client=self.s3, bucket=self.bucket, prefix="data/", game_id="0022400001")
+        storage.update_manifest(s3_client=self.s3, bucket=self.bucket, prefix="data/", game_id="0022400002")
+
+        assert self._read("data/manifest/2024-25.json") == ["0022400001", "0022400002"]
+        assert self._read("data/manifest/index.json")["shards"] == {"2024-25": "data/manifest/2024-25.json"}
+
+    def test_gives_up_after_max_attempts(self):
+        always_conflict = {"Error": {"Code": "PreconditionFailed"}}
+        s3 = MagicMock()
+        s3.get_object.side_effect = ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        s3.put_object.side_effect = ClientError(always_conflict, "PutObject")
+        with pytest.raises(RuntimeError):
+            storage.conditional_update_json(
+                s3_client=s3, bucket="b", key="k", mutate=lambda d: d + [1], empty=list, sleep=lambda _s: None
+            )
+        assert s3.put_object.call_count == storage.MANIFEST_MAX_ATTEMPTS
@@ -0,0 +1,58 @@
+from nba_game_poller.nba_api import KeepAliveHttpClient, fetch_nba_data_urllib
+from replay_cdn import SCOREBOARD_PATH, ReplayCDN
+from replay_harness import Harness
+from synthetic_games import generate_game
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestReplayCDN:
+    def test_serves_versions_with_etags_and_304s(self):
+        clock = FakeClock()
+        cdn = ReplayCDN({"0022400001": generate_game("regulation", 1)}, speed=10, clock=clock).start()
+        client = KeepAliveHttpClient()
+        url = f"{cdn.base_url}/static/json/liveData/playbyplay/playbyplay_0022400001.json"
+        try:
+            clock.now += 30
+            data, etag = fetch_nba_data_urllib(url, None, "test", client=client)
+            version = len(data["game"]["actions"])
+            assert version > 0
+            assert etag == f'"0022400001-{version}"'
+            assert cdn.published_at("0022400001", version) <= clock.now
+
+            # Same version: 304; later: a new version.
+            assert fetch_nba_data_urllib(url, etag, "test", client=client) == (None, etag)
+            clock.now += 30
+            newer, newer_etag = fetch_nba_data_urllib(url, etag, "test", client=client)
+            assert len(newer["game"]["actions"]) > version
+            assert cdn.requests[304] == 1
+
+            status, _, body = client.get(f"{cdn.base_url}{SCOREBOARD_PATH}")
+            assert status == 200 and b"0022400001" in body
+        finally:
+            client.close()
+            cdn.stop()
+
+    def test_game_goes_final(self):
+        clock = FakeClock()
+        cdn = ReplayCDN({"0022400001": generate_game("regulation", 1)}, speed=10, clock=clock)
+        cdn.started_at = clock()
+        game = cdn.games["0022400001"]
+        assert game.status(0)[0] == 1
+        clock.now += 48 * 60 / 10 + 1
+        assert cdn.all_final()
+        assert game.boxscore(game.version_at(cdn.elapsed()))["game"]["gameStatusText"] == "Final"
+
+
+def test_harness_delivers_updates_end_to_end():
+    report = Harness(games=2, speed=300, duration=3, cadence_scale=0.01, subscribers=2, log=lambda *a: None).run()
+    assert report["s3Puts"] > 0
+    assert report["deliveredVersions"] > 0
+    assert report["websocketPosts"] >= report["deliveredVersions"]
+    assert report["lagMs"]["all"]["p50"] >= 0
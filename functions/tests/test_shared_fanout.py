@@ -0,0 +1,89 @@
+import boto3
+import pytest
+from moto import mock_aws
+from unittest.mock import MagicMock
+
+from nba_shared.fanout import FanOutStats, fan_out
+from nba_shared.subscribers import read_generation
+
+
+class GoneException(Exception):
+    pass
+
+
+class TestFanOut:
+    @pytest.fixture(autouse=True)
+    def setup_table(self):
+        with mock_aws():
+            self.dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+            self.table = self.dynamodb.create_table(
+                TableName="GameConnections",
+                KeySchema=[{"AttributeName": "connectionId", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "connectionId", "AttributeType": "S"}],
+                ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
+            )
+            yield
+
+    def _apigw(self, gone=(), failed=()):
+        apigw = MagicMock()
+        apigw.exceptions.GoneException = GoneException
+
+        def post(ConnectionId, Data):
+            if ConnectionId in gone:
+                raise GoneException("Gone")
+            if ConnectionId in failed:
+                raise RuntimeError("boom")
+
+        apigw.post_to_connection.side_effect = post
+        return apigw
+
+    def test_counts_outcomes_and_latency(self):
+        # Every connection is attempted and classified as sent, gone or failed.
+        ids = [f"c{i}" for i in range(50)]
+        apigw = self._apigw(gone={"c1", "c2"}, failed={"c3"})
+
+        stats = fan_out(apigw_client=apigw, connection_ids=ids, payload="{}", conn_table=self.table, max_workers=4)
+
+        summary = stats.summary()
+        assert apigw.post_to_connection.call_count == 50
+        assert (summary["sent"], summary["gone"], summary["failed"]) == (47, 2, 1)
+        assert summary["p50Ms"] is not None and summary["p99Ms"] >= summary["p50Ms"]
+
+    def test_gone_connections_deleted_in_batches(self):
+        # More stale connections than one BatchWriteItem chunk (25) are all removed.
+        ids = [f"c{i}" for i in range(60)]
+        for cid in ids:
+            self.table.put_item(Item={"connectionId": cid})
+        apigw = self._apigw(gone=set(ids[:40]))
+
+        fan_out(apigw_client=apigw, connection_ids=ids, payload="{}", conn_table=self.table, max_workers=8)
+
+        remaining = {item["connectionId"] for item in self.table.scan()["Items"]}
+        assert remaining == set(ids[40:])
+
+    def test_gone_cleanup_bumps_subscriber_generation(self):
+        # Other containers' cached subscriber lists must not keep the deleted IDs.
+        apigw = self._apigw(gone={"c1"})
+        fan_out(apigw_client=apigw, connection_ids=["c0", "c1"], payload="{}", conn_table=self.table,
+                subscription="0022400001")
+        assert read_generation(self.table, "0022400001") == 1
+
+        fan_out(apigw_client=self._apigw(), connection_ids=["c0"], payload="{}", conn_table=self.table,
+                subscription="0022400001")
+        assert read_generation(self.table, "0022400001") == 1
+
+    def test_consumes_lazy_iterators_and_accumulates_stats(self):
+        # Generators are accepted and a shared stats object aggregates several fan-outs.
+        stats = FanOutStats()
+        apigw = self._apigw()
+        fan_out(apigw_client=apigw, connection_ids=(f"a{i}" for i in range(10)), payload="{}", stats=stats, max_workers=2)
+        fan_out(apigw_client=apigw, connection_ids=iter(["b1"]), payload="{}", stats=stats, max_workers=2)
+        assert stats.summary()["sent"] == 11
+
+    def test_percentile_nearest_rank(self):
+        stats = FanOutStats()
+        for ms in range(1, 101):
+            stats.record("sent", float(ms))
+        assert stats.percentile(50) == 50.0
+        assert stats.percentile(99) == 99.0
+        assert FanOutStats().percentile(50) is None
@@ -0,0 +1,83 @@
+import importlib.util
+import json
+import os
+import sys
+from decimal import Decimal
+
+import pytest
+
+from nba_game_poller.playbyplay_columnar import encode_playbyplay_v2
+from nba_game_poller.playbyplay_processing import infer_team_ids_from_actions, process_playbyplay_payload
+from nba_shared import jsoncodec
+
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures/0012200039.json")
+
+
+def _load_stdlib_codec():
+    """A second copy of jsoncodec that can't import orjson."""
+    spec = importlib.util.spec_from_file_location("jsoncodec_stdlib", jsoncodec.__file__)
+    module = importlib.util.module_from_spec(spec)
+    saved = sys.modules.get("orjson")
+    sys.modules["orjson"] = None
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        if saved is None:
+            del sys.modules["orjson"]
+        else:
+            sys.modules["orjson"] = saved
+    return module
+
+
+@pytest.fixture(scope="module")
+def payloads():
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    actions = raw["actions"] if isinstance(raw, dict) else raw
+    away_team_id, home_team_id = infer_team_ids_from_actions(actions)
+    v1 = process_playbyplay_payload(
+        game_id="0012200039", actions=actions, away_team_id=away_team_id, home_team_id=home_team_id,
+        include_actions=False, include_all_actions=False,
+    )
+    return {"raw": raw, "pbp-v1": v1, "pbp-v2": encode_playbyplay_v2(v1, actions)}
+
+
+class TestJsonCodec:
+    @pytest.fixture(autouse=True)
+    def stdlib_codec(self):
+        self.stdlib = _load_stdlib_codec()
+
+    def test_fallback_uses_stdlib(self):
+        assert self.stdlib.BACKEND == "json"
+
+    @pytest.mark.parametrize("name", ["raw", "pbp-v1", "pbp-v2"])
+    def test_backends_write_the_same_bytes(self, payloads, name):
+        encoded = jsoncodec.dumps_bytes(payloads[name])
+        assert encoded == self.stdlib.dumps_bytes(payloads[name])
+        assert jsoncodec.loads(encoded) == json.loads(encoded) == payloads[name]
+
+    def test_decimals_non_ascii_and_int_keys(self):
+        doc = {"homescore": Decimal("101"), "pct": Decimal("0.5"), "name": "Nikola Jokić", 3: [True, None]}
+        expected = '{"homescore":101,"pct":0.5,"name":"Nikola Jokić","3":[true,null]}'
+        for codec in (jsoncodec, self.stdlib):
+            assert codec.dumps(doc) == expected
+            assert codec.dumps_bytes(doc) == expected.encode("utf-8")
+
+    def test_to_native_converts_decimal(self):
+        assert jsoncodec.to_native(Decimal("4")) == 4
+        assert jsoncodec.to_native(Decimal("4.25")) == 4.25
+
+    def test_loads_accepts_bytes_and_str(self):
+        for codec in (jsoncodec, self.stdlib):
+            assert codec.loads(b'{"a":[1,2]}') == codec.loads('{"a":[1,2]}') == {"a": [1, 2]}
+
+    def test_decode_errors_share_one_type(self):
+        for codec in (jsoncodec, self.stdlib):
+            with pytest.raises(jsoncodec.JSONDecodeError):
+                codec.loads(b"<html>")
+
+    def test_unsupported_types_raise(self):
+        for codec in (jsoncodec, self.stdlib):
+            with pytest.raises(TypeError):
+                codec.dumps({"when": object()})
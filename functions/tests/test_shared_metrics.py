@@ -0,0 +1,65 @@
+import json
+
+from nba_shared.fanout import FanOutStats
+from nba_shared.metrics import MAX_VALUES_PER_METRIC, Metrics
+
+
+class TestMetrics:
+    def test_disabled_records_nothing(self):
+        metrics = Metrics("Test", enabled=False)
+        with metrics.timer("stage"):
+            pass
+        metrics.put("count", 1)
+        metrics.prefixed("box").put("bytes", 10, "Bytes")
+        lines = []
+        metrics.flush(emit=lines.append)
+        assert lines == []
+        assert metrics.to_record() is None
+
+    def test_flush_emits_one_emf_line_and_resets(self):
+        metrics = Metrics("Test", properties={"gameId": "001"}, enabled=True, namespace="NS")
+        with metrics.timer("process"):
+            pass
+        box = metrics.prefixed("box")
+        box.put("payloadBytes", 120, "Bytes")
+        box.put("notModified", 0)
+        box.put("notModified", 1)
+
+        lines = []
+        metrics.flush(emit=lines.append)
+        record = json.loads(lines[0])
+        emf = record["_aws"]["CloudWatchMetrics"][0]
+        assert emf["Namespace"] == "NS"
+        assert emf["Dimensions"] == [["Service"]]
+        units = {m["Name"]: m["Unit"] for m in emf["Metrics"]}
+        assert units == {
+            "processMs": "Milliseconds",
+            "boxPayloadBytes": "Bytes",
+            "boxNotModified": "Count",
+        }
+        assert record["Service"] == "Test"
+        assert record["gameId"] == "001"
+        assert record["boxPayloadBytes"] == 120
+        assert record["boxNotModified"] == [0, 1]
+        assert record["processMs"] >= 0
+
+        metrics.flush(emit=lines.append)
+        assert len(lines) == 1
+
+    def test_values_per_metric_are_capped(self):
+        metrics = Metrics("Test", enabled=True)
+        for i in range(MAX_VALUES_PER_METRIC + 5):
+            metrics.put("n", i)
+        assert len(metrics.to_record()["n"]) == MAX_VALUES_PER_METRIC
+
+    def test_fan_out_stats_become_metrics(self):
+        stats = FanOutStats()
+        stats.record("sent", 12.0)
+        stats.record("gone", 30.0)
+        metrics = Metrics("Test", enabled=True)
+        stats.put_metrics(metrics)
+        record = metrics.to_record()
+        assert record["sentConnections"] == 1
+        assert record["goneConnections"] == 1
+        assert record["failedConnections"] == 0
+        assert record["postP99Ms"] == 30.0
@@ -0,0 +1,64 @@
+import boto3
+import pytest
+from moto import mock_aws
+
+from nba_shared.scoreboard import ScoreboardStore, format_game
+
+
+class TestScoreboardStore:
+    @pytest.fixture(autouse=True)
+    def setup_table(self):
+        with mock_aws():
+            dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+            self.table = dynamodb.create_table(
+                TableName="NBA_Scoreboards",
+                KeySchema=[{"AttributeName": "date", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "date", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+            self.now = [0.0]
+            self.store = ScoreboardStore(self.table, cache_ttl_sec=5, clock=lambda: self.now[0])
+            yield
+
+    def _game(self, game_id, starttime, homescore=0):
+        return format_game({"id": game_id, "date": "2024-01-01", "starttime": starttime, "homescore": homescore})
+
+    def test_missing_scoreboard(self):
+        assert self.store.get("2024-01-01") is None
+
+    def test_seed_then_get_sorted_by_start(self):
+        late, early = self._game("2", "T20"), self._game("1", "T19")
+        self.store.seed("2024-01-01", [late, early])
+        fresh = ScoreboardStore(self.table)
+        assert fresh.get("2024-01-01") == [early, late]
+
+    def test_apply_requires_seeded_scoreboard(self):
+        # Stream updates alone never create a partial scoreboard.
+        assert self.store.apply("2024-01-01", {"1": self._game("1", "T19")}) is None
+        assert "Item" not in self.table.get_item(Key={"date": "2024-01-01"})
+
+    def test_seed_keeps_a_current_scoreboard(self):
+        # A late seed from an eventually consistent query must not undo stream updates.
+        self.store.seed("2024-01-01", [self._game("1", "T19")])
+        self.store.apply("2024-01-01", {"1": self._game("1", "T19", homescore=7)})
+        stale = ScoreboardStore(self.table)
+        assert stale.seed("2024-01-01", [self._game("1", "T19")]) == [self._game("1", "T19", homescore=7)]
+        assert ScoreboardStore(self.table).get("2024-01-01") == [self._game("1", "T19", homescore=7)]
+
+    def test_seed_replaces_an_expired_scoreboard(self):
+        self.table.put_item(Item={"date": "2024-01-01", "seededAt": 1, "expiresAt": 2, "g#1": "{}"})
+        assert self.store.seed("2024-01-01", [self._game("1", "T19")]) == [self._game("1", "T19")]
+        assert ScoreboardStore(self.table).get("2024-01-01") == [self._game("1", "T19")]
+
+    def test_apply_updates_and_removes_games(self):
+        self.store.seed("2024-01-01", [self._game("1", "T19"), self._game("2", "T20")])
+        games = self.store.apply("2024-01-01", {"1": self._game("1", "T19", homescore=3), "2": None})
+        assert games == [self._game("1", "T19", homescore=3)]
+        assert ScoreboardStore(self.table).get("2024-01-01") == games
+
+    def test_get_served_from_container_cache(self):
+        self.store.seed("2024-01-01", [self._game("1", "T19")])
+        self.table.delete_item(Key={"date": "2024-01-01"})
+        assert self.store.get("2024-01-01") == [self._game("1", "T19")]
+        self.now[0] = 6.0
+        assert self.store.get("2024-01-01") is None
@@ -0,0 +1,131 @@
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from moto import mock_aws
+from unittest.mock import MagicMock
+
+from nba_shared import subscribers
+from nba_shared.subscribers import SubscriberCache, bump_generation, iter_subscribers
+
+
+class _PagedTable:
+    """Stands in for a table whose GSI query spans several 1 MB pages."""
+
+    def __init__(self, pages, fail_on_page=None):
+        self.pages = pages
+        self.fail_on_page = fail_on_page
+        self.queries = []
+        self.generation = 0
+
+    def query(self, **kwargs):
+        page = kwargs.get("ExclusiveStartKey", {}).get("page", 0)
+        self.queries.append(page)
+        if page == self.fail_on_page:
+            raise ClientError({"Error": {"Code": "ProvisionedThroughputExceededException"}}, "Query")
+        resp = {"Items": [{"connectionId": cid} for cid in self.pages[page]]}
+        if page + 1 < len(self.pages):
+            resp["LastEvaluatedKey"] = {"page": page + 1}
+        return resp
+
+    def get_item(self, **kwargs):
+        return {"Item": {"generation": self.generation}}
+
+
+class TestIterSubscribers:
+    def test_follows_every_page(self):
+        # Subscribers past the first page are no longer dropped.
+        table = _PagedTable([["c1", "c2"], ["c3"], ["c4"]])
+        assert list(iter_subscribers(table, "gameId-index", "gameId", "001")) == ["c1", "c2", "c3", "c4"]
+        assert table.queries == [0, 1, 2]
+
+    def test_streams_lazily(self):
+        # Only the first page is read before the consumer asks for more.
+        table = _PagedTable([["c1"], ["c2"]])
+        stream = iter_subscribers(table, "gameId-index", "gameId", "001")
+        assert next(stream) == "c1"
+        assert table.queries == [0]
+
+    def test_query_error_ends_stream(self):
+        table = _PagedTable([["c1"], ["c2"]], fail_on_page=1)
+        assert list(iter_subscribers(table, "gameId-index", "gameId", "001")) == ["c1"]
+
+
+class TestSubscriberCache:
+    def _cache(self, table, now):
+        return SubscriberCache(table, "gameId-index", "gameId", ttl_sec=30, clock=lambda: now[0])
+
+    def test_reuses_list_while_generation_and_ttl_hold(self):
+        table = _PagedTable([["c1"], ["c2"]])
+        now = [0.0]
+        cache = self._cache(table, now)
+        assert list(cache.subscribers("001")) == ["c1", "c2"]
+        assert list(cache.subscribers("001")) == ["c1", "c2"]
+        assert table.queries == [0, 1]
+
+        # Expired entries go back to the index.
+        now[0] = 31.0
+        list(cache.subscribers("001"))
+        assert table.queries == [0, 1, 0, 1]
+
+    def test_generation_change_invalidates(self):
+        # A join/disconnect elsewhere bumps the marker, so the cached list is dropped.
+        table = _PagedTable([["c1"]])
+        cache = self._cache(table, [0.0])
+        list(cache.subscribers("001"))
+        table.generation = 1
+        table.pages = [["c1", "c2"]]
+        assert list(cache.subscribers("001")) == ["c1", "c2"]
+
+    def test_partial_results_not_cached(self):
+        table = _PagedTable([["c1"], ["c2"]], fail_on_page=1)
+        cache = self._cache(table, [0.0])
+        assert list(cache.subscribers("001")) == ["c1"]
+        table.fail_on_page = None
+        assert list(cache.subscribers("001")) == ["c1", "c2"]
+
+    def test_partially_consumed_stream_not_cached(self):
+        table = _PagedTable([["c1"], ["c2"]])
+        cache = self._cache(table, [0.0])
+        next(cache.subscribers("001"))
+        list(cache.subscribers("001"))
+        assert table.queries == [0, 0, 1]
+
+
+class TestGenerationMarker:
+    @pytest.fixture(autouse=True)
+    def setup_table(self):
+        with mock_aws():
+            dynamodb = boto3.resource("dynamodb", region_name="us-east-1")
+            self.table = dynamodb.create_table(
+                TableName="GameConnections",
+                KeySchema=[{"AttributeName": "connectionId", "KeyType": "HASH"}],
+                AttributeDefinitions=[
+                    {"AttributeName": "connectionId", "AttributeType": "S"},
+                    {"AttributeName": "gameId", "AttributeType": "S"},
+                ],
+                GlobalSecondaryIndexes=[{
+                    "IndexName": "gameId-index",
+                    "KeySchema": [{"AttributeName": "gameId", "KeyType": "HASH"}],
+                    "Projection": {"ProjectionType": "ALL"},
+                    "ProvisionedThroughput": {"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
+                }],
+                ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1},
+            )
+            yield
+
+    def test_bump_invalidates_and_marker_stays_out_of_index(self):
+        self.table.put_item(Item={"connectionId": "c1", "gameId": "001"})
+        cache = SubscriberCache(self.table, "gameId-index", "gameId", ttl_sec=30)
+        assert list(cache.subscribers("001")) == ["c1"]
+
+        self.table.put_item(Item={"connectionId": "c2", "gameId": "001"})
+        assert list(cache.subscribers("001")) == ["c1"]
+
+        bump_generation(self.table, "001")
+        assert sorted(cache.subscribers("001")) == ["c1", "c2"]
+        assert subscribers.read_generation(self.table, "001") == 1
+
+    def test_bump_ignores_missing_value(self):
+        table = MagicMock()
+        bump_generation(table, None)
+        assert not table.update_item.called
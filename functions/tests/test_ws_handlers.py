@@ -38,6 +38,18 @@ class TestWsJoinGame:
         assert "connectedAt" in item
         assert "expiresAt" in item
 
+    def test_join_game_bumps_subscriber_generations(self):
+        # Joining invalidates the new game's subscriber cache, and the old one's when switching.
+        for game_id in ("game1", "game2"):
+            self.module.handler({
+                "requestContext": {"connectionId": "conn1"},
+                "body": json.dumps({"gameId": game_id})
+            }, {})
+
+        marker = lambda g: self.table.get_item(Key={"connectionId": f"#subscribers#{g}"})["Item"]["generation"]
+        assert marker("game1") == 2
+        assert marker("game2") == 1
+
 class TestWsJoinDate:
     @pytest.fixture(autouse=True)
     def setup_env(self, lambda_loader):
@@ -89,6 +101,13 @@ class TestWsJoinDate:
                 ProvisionedThroughput={"ReadCapacityUnits": 1, "WriteCapacityUnits": 1}
             )
             
+            self.scoreboard_table = self.dynamodb.create_table(
+                TableName="NBA_Scoreboards",
+                KeySchema=[{"AttributeName": "date", "KeyType": "HASH"}],
+                AttributeDefinitions=[{"AttributeName": "date", "AttributeType": "S"}],
+                BillingMode="PAY_PER_REQUEST",
+            )
+
             path = os.path.join(os.path.dirname(__file__), "../ws-joinDate-handler/lambda_function.py")
             self.module = lambda_loader(path, "ws_join_date")
             self.module.dynamodb = self.dynamodb
@@ -125,6 +144,23 @@ class TestWsJoinDate:
         assert payload["type"] == "date"
         assert payload["data"][0]["hometeam"] == "MIA"
 
+    def test_join_date_served_from_scoreboard(self):
+        # A seeded scoreboard answers the join without querying NBA_Games.
+        from nba_shared.scoreboard import ScoreboardStore
+        mock_apigw = MagicMock()
+        self.module.apigw_client = mock_apigw
+
+        date_str = "2023-10-31"
+        game = {"id": "G9", "hometeam": "NYK", "date": date_str}
+        ScoreboardStore(self.scoreboard_table).seed(date_str, [game])
+        self.games_table.put_item(Item={"PK": "G1", "SK": f"D#{date_str}", "date": date_str, "id": "G1"})
+
+        event = {"requestContext": {"connectionId": "conn3"}, "body": json.dumps({"date": date_str})}
+        assert self.module.handler(event, {})["statusCode"] == 200
+
+        payload = json.loads(mock_apigw.post_to_connection.call_args.kwargs["Data"])
+        assert payload["data"] == [game]
+
     def test_join_date_send_failure_returns_500(self):
         # Send failures should return 500 but still persist the subscription.
         mock_apigw = MagicMock()
@@ -143,10 +179,21 @@ class TestWsJoinDate:
         item = self.conn_table.get_item(Key={"connectionId": "conn_fail"})["Item"]
         assert item["dateString"] == date_str
 
-    def test_to_native_converts_decimal(self):
-        # Decimal values should be cast to int/float for JSON serialization.
-        assert self.module.to_native(Decimal("4")) == 4
-        assert self.module.to_native(Decimal("4.25")) == 4.25
+    def test_join_date_sends_scores_as_numbers(self):
+        # Scores come back from DynamoDB as Decimals and go out as JSON numbers.
+        mock_apigw = MagicMock()
+        self.module.apigw_client = mock_apigw
+
+        date_str = "2023-11-02"
+        self.games_table.put_item(Item={
+            "PK": "G4", "SK": f"D#{date_str}", "date": date_str, "id": "G4",
+            "homescore": Decimal("101"), "awayscore": Decimal("99"),
+        })
+        event = {"requestContext": {"connectionId": "conn4"}, "body": json.dumps({"date": date_str})}
+        assert self.module.handler(event, {})["statusCode"] == 200
+
+        data = mock_apigw.post_to_connection.call_args.kwargs["Data"]
+        assert '"homescore":101,"awayscore":99' in data
 
 class TestWsDisconnect:
     @pytest.fixture(autouse=True)
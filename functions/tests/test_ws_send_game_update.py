@@ -36,6 +36,14 @@ class TestWsSendGameUpdate:
             self.module.dynamodb = self.dynamodb
             yield
 
+    def test_apigw_client_not_built_without_subscribers(self):
+        # The API Gateway client is built on first use, so a game nobody watches never needs it.
+        assert self.module.apigw_client is None
+        event = {"Records": [{"s3": {"object": {"key": "data/boxData/777.json", "eTag": "\"e1\""}}}]}
+
+        assert self.module.handler(event, {})["statusCode"] == 200
+        assert self.module.apigw_client is None
+
     def test_processed_playbyplay_key_fanout(self):
         # Ensures processed play-by-play keys notify subscribers with clean ETag.
         self.table.put_item(Item={"connectionId": "c1", "gameId": "12345"})
@@ -95,3 +103,162 @@ class TestWsSendGameUpdate:
         self.module.handler(event, {})
         resp = self.table.get_item(Key={"connectionId": "stale1"})
         assert "Item" not in resp
+
+    def test_inline_patch_included_when_published(self):
+        # Objects carrying patch metadata should push the delta inline with its versions.
+        self.table.put_item(Item={"connectionId": "c1", "gameId": "12345"})
+        mock_apigw = MagicMock()
+        self.module.apigw_client = mock_apigw
+
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="data-bucket")
+        patch = {"baseVersion": "v1", "version": "v2", "ops": [{"op": "set", "path": ["gameClock"], "value": "PT01M00.00S"}]}
+        s3.put_object(Bucket="data-bucket", Key="data/patches/boxData/12345/v2.json", Body=json.dumps(patch))
+        s3.put_object(
+            Bucket="data-bucket",
+            Key="data/boxData/12345.json.gz",
+            Body=b"{}",
+            Metadata={
+                "content-sha256": "v2",
+                "patch-key": "data/patches/boxData/12345/v2.json",
+                "patch-base-sha256": "v1",
+            },
+        )
+        self.module.s3_client = s3
+
+        event = {
+            "Records": [{
+                "s3": {
+                    "bucket": {"name": "data-bucket"},
+                    "object": {"key": "data/boxData/12345.json.gz", "eTag": "\"etag2\""},
+                }
+            }]
+        }
+        self.module.handler(event, {})
+
+        payload = json.loads(mock_apigw.post_to_connection.call_args.kwargs["Data"])
+        assert payload["version"] == "etag2"
+        assert payload["contentVersion"] == "v2"
+        assert payload["baseVersion"] == "v1"
+        assert payload["patch"] == patch
+
+    def test_large_patch_sent_by_key(self):
+        # Patches over the inline limit are referenced by key instead.
+        self.table.put_item(Item={"connectionId": "c1", "gameId": "12345"})
+        mock_apigw = MagicMock()
+        self.module.apigw_client = mock_apigw
+        self.module.INLINE_PATCH_MAX_BYTES = 10
+
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="data-bucket")
+        s3.put_object(Bucket="data-bucket", Key="data/patches/boxData/12345/v2.json", Body=json.dumps({"ops": [1] * 50}))
+        s3.put_object(
+            Bucket="data-bucket",
+            Key="data/boxData/12345.json.gz",
+            Body=b"{}",
+            Metadata={"content-sha256": "v2", "patch-key": "data/patches/boxData/12345/v2.json", "patch-base-sha256": "v1"},
+        )
+        self.module.s3_client = s3
+
+        event = {"Records": [{"s3": {"bucket": {"name": "data-bucket"}, "object": {"key": "data/boxData/12345.json.gz", "eTag": "\"e\""}}}]}
+        self.module.handler(event, {})
+
+        payload = json.loads(mock_apigw.post_to_connection.call_args.kwargs["Data"])
+        assert "patch" not in payload
+        assert payload["patchKey"] == "data/patches/boxData/12345/v2.json"
+
+    def test_records_for_one_game_combined(self):
+        # Box + play-by-play writes in one batch become a single message per subscriber.
+        self.table.put_item(Item={"connectionId": "c1", "gameId": "12345"})
+        mock_apigw = MagicMock()
+        self.module.apigw_client = mock_apigw
+
+        event = {"Records": [
+            {"s3": {"object": {"key": "data/boxData/12345.json.gz", "eTag": "\"box1\"", "sequencer": "0A"}}},
+            {"s3": {"object": {"key": "data/processed-data/playByPlayData/12345.json.gz", "eTag": "\"pbp1\""}}},
+            {"s3": {"object": {"key": "data/boxData/12345.json.gz", "eTag": "\"box2\"", "sequencer": "0B"}}},
+        ]}
+        self.module.handler(event, {})
+
+        assert mock_apigw.post_to_connection.call_count == 1
+        payload = json.loads(mock_apigw.post_to_connection.call_args.kwargs["Data"])
+        assert payload["gameId"] == "12345"
+        assert payload["updates"] == [
+            {"key": "data/boxData/12345.json.gz", "version": "box2"},
+            {"key": "data/processed-data/playByPlayData/12345.json.gz", "version": "pbp1"},
+        ]
+
+    def test_debounce_defers_to_open_window(self):
+        # With an open window, the keys are recorded on the marker for its owner to send.
+        self.table.put_item(Item={"connectionId": "c1", "gameId": "12345"})
+        self.table.put_item(Item={"connectionId": "#debounce#12345", "windowEndsAt": 2 ** 50})
+        mock_apigw = MagicMock()
+        self.module.apigw_client = mock_apigw
+        self.module.DEBOUNCE_MS = 50
+
+        event = {"Records": [{"s3": {"object": {"key": "data/boxData/12345.json.gz", "eTag": "\"e1\""}}}]}
+        self.module.handler(event, {})
+
+        assert not mock_apigw.post_to_connection.called
+        marker = self.table.get_item(Key={"connectionId": "#debounce#12345"})["Item"]
+        assert marker["pending"] == {"data/boxData/12345.json.gz"}
+
+    def test_debounce_window_opened_once_under_a_race(self, monkeypatch):
+        # Another invocation opens the window between our join and open attempts:
+        # our conditional open loses, and the keys join its window instead.
+        self.table.put_item(Item={"connectionId": "c1", "gameId": "12345"})
+        mock_apigw = MagicMock()
+        self.module.apigw_client = mock_apigw
+        self.module.DEBOUNCE_MS = 50
+        table = self.module.get_subscriber_cache().table
+        update_item = table.update_item
+
+        def racing_update_item(**kwargs):
+            if kwargs["UpdateExpression"].startswith("SET windowEndsAt"):
+                self.table.put_item(Item={"connectionId": "#debounce#12345", "windowEndsAt": 2 ** 50})
+            return update_item(**kwargs)
+
+        monkeypatch.setattr(table, "update_item", racing_update_item)
+        event = {"Records": [{"s3": {"object": {"key": "data/boxData/12345.json.gz", "eTag": "\"e1\""}}}]}
+        self.module.handler(event, {})
+
+        assert not mock_apigw.post_to_connection.called
+        marker = self.table.get_item(Key={"connectionId": "#debounce#12345"})["Item"]
+        assert marker["windowEndsAt"] == 2 ** 50
+        assert marker["pending"] == {"data/boxData/12345.json.gz"}
+
+    def test_debounce_owner_sends_pending_keys(self, monkeypatch):
+        # The window owner picks up keys recorded while it waited, at their current version.
+        self.table.put_item(Item={"connectionId": "c1", "gameId": "12345"})
+        mock_apigw = MagicMock()
+        self.module.apigw_client = mock_apigw
+        self.module.DEBOUNCE_MS = 1
+
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket="data-bucket")
+        pbp_key = "data/processed-data/playByPlayData/12345.json.gz"
+        pbp_etag = s3.put_object(Bucket="data-bucket", Key=pbp_key, Body=b"{}")["ETag"].strip('"')
+        s3.put_object(Bucket="data-bucket", Key="data/boxData/12345.json.gz", Body=b"{}")
+        self.module.s3_client = s3
+
+        def late_write(_seconds):
+            # Another invocation lands inside the window.
+            self.table.update_item(
+                Key={"connectionId": "#debounce#12345"},
+                UpdateExpression="ADD pending :k",
+                ExpressionAttributeValues={":k": {pbp_key}},
+            )
+
+        monkeypatch.setattr(self.module.time, "sleep", late_write)
+        event = {"Records": [{"s3": {
+            "bucket": {"name": "data-bucket"},
+            "object": {"key": "data/boxData/12345.json.gz", "eTag": "\"box1\""},
+        }}]}
+        self.module.handler(event, {})
+
+        payload = json.loads(mock_apigw.post_to_connection.call_args.kwargs["Data"])
+        assert [(u["key"], u["version"]) for u in payload["updates"]] == [
+            ("data/boxData/12345.json.gz", "box1"),
+            (pbp_key, pbp_etag),
+        ]
+        assert "Item" not in self.table.get_item(Key={"connectionId": "#debounce#12345"})
@@ -2,6 +2,8 @@ import boto3
 import os
 from botocore.exceptions import ClientError
 
+from nba_shared.subscribers import bump_generation
+
 # Initialize DynamoDB resource
 dynamodb = boto3.resource('dynamodb')
 
@@ -14,15 +16,20 @@ def handler(event, context):
     try:
         # Delete from GameConnections
         table_games = dynamodb.Table(GAME_TABLE_NAME)
-        table_games.delete_item(
-            Key={'connectionId': connection_id}
-        )
+        old_game = table_games.delete_item(
+            Key={'connectionId': connection_id},
+            ReturnValues='ALL_OLD'
+        ).get('Attributes', {})
+        # Invalidate cached subscriber lists (see nba_shared.subscribers)
+        bump_generation(table_games, old_game.get('gameId'))
 
         # Delete from DateConnections
         table_dates = dynamodb.Table(DATE_TABLE_NAME)
-        table_dates.delete_item(
-            Key={'connectionId': connection_id}
-        )
+        old_date = table_dates.delete_item(
+            Key={'connectionId': connection_id},
+            ReturnValues='ALL_OLD'
+        ).get('Attributes', {})
+        bump_generation(table_dates, old_date.get('dateString'))
 
         return {
             'statusCode': 200,
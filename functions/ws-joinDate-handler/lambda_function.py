@@ -3,18 +3,37 @@ import time
 import os
 import boto3
 from datetime import datetime, timezone
-from boto3.dynamodb.conditions import Key
-from decimal import Decimal
+from botocore.exceptions import ClientError
+
+from nba_shared.scoreboard import ScoreboardStore, date_payload, query_date_games
+from nba_shared.subscribers import bump_generation
 
 # Constants
 DATE_CONN_TABLE = os.environ.get('DATE_CONN_TABLE')
 GAMES_TABLE = os.environ.get('GAMES_TABLE')
 GAMES_GSI = os.environ.get('GAMES_GSI')
+SCOREBOARD_TABLE = os.environ.get('SCOREBOARD_TABLE', 'NBA_Scoreboards')
 WS_API_ENDPOINT = os.environ.get('WS_API_ENDPOINT')
 
 # Initialize clients
 dynamodb = boto3.resource('dynamodb')
-apigw_client = boto3.client('apigatewaymanagementapi', endpoint_url=WS_API_ENDPOINT)
+# API Gateway Client, built on first use (get_apigw_client)
+apigw_client = None
+
+def get_apigw_client():
+    global apigw_client
+    if apigw_client is None:
+        apigw_client = boto3.client('apigatewaymanagementapi', endpoint_url=WS_API_ENDPOINT)
+    return apigw_client
+
+# Per-date scoreboards maintained by gameDateUpdates (see nba_shared.scoreboard)
+scoreboard_store = None
+
+def get_scoreboard_store():
+    global scoreboard_store
+    if scoreboard_store is None:
+        scoreboard_store = ScoreboardStore(dynamodb.Table(SCOREBOARD_TABLE))
+    return scoreboard_store
 
 def handler(event, context):
     connection_id = event['requestContext']['connectionId']
@@ -28,47 +47,35 @@ def handler(event, context):
 
     # Record the subscription
     table_conn = dynamodb.Table(DATE_CONN_TABLE)
-    table_conn.put_item(
+    previous = table_conn.put_item(
         Item={
             'dateString': date_str,
             'connectionId': connection_id,
             'connectedAt': connected_at,
             'expiresAt': expires_at
-        }
-    )
-
-    # Fetch all games on that date from NBA_Games using GSI
-    table_games = dynamodb.Table(GAMES_TABLE)
-    response = table_games.query(
-        IndexName=GAMES_GSI,
-        KeyConditionExpression=Key('date').eq(date_str)
-    )
-    games = response.get('Items', [])
+        },
+        ReturnValues='ALL_OLD'
+    ).get('Attributes', {})
 
-    # Format and Send games to client
-    formatted_games = []
-    for g in games:
-        formatted_games.append({
-            'id': g.get('id'),
-            'homescore': to_native(g.get('homescore')),
-            'awayscore': to_native(g.get('awayscore')),
-            'hometeam': g.get('hometeam'),
-            'awayteam': g.get('awayteam'),
-            'starttime': g.get('starttime'),
-            'clock': g.get('clock'),
-            'status': g.get('status'),
-            'date': g.get('date'),
-            'homerecord': g.get('homerecord'),
-            'awayrecord': g.get('awayrecord')
-        })
+    # Invalidate cached subscriber lists for the date joined (and the one left, when switching)
+    bump_generation(table_conn, date_str)
+    if previous.get('dateString') not in (None, date_str):
+        bump_generation(table_conn, previous['dateString'])
 
-    payload = json.dumps({
-        'type': "date",
-        'data': formatted_games
-    })
+    # Send the date's precomputed scoreboard; build it from the GSI on a miss
+    store = get_scoreboard_store()
+    games = store.get(date_str)
+    if games is None:
+        try:
+            games = query_date_games(dynamodb.Table(GAMES_TABLE), GAMES_GSI, date_str)
+        except ClientError as e:
+            print(f"Error querying games: {e}")
+            return {'statusCode': 500, 'body': str(e)}
+        games = store.seed(date_str, games)
+    payload = date_payload(games)
 
     try:
-        apigw_client.post_to_connection(
+        get_apigw_client().post_to_connection(
             ConnectionId=connection_id,
             Data=payload
         )
@@ -80,9 +87,3 @@ def handler(event, context):
         'statusCode': 200,
         'body': "Subscribed to date and sent initial games"
     }
-
-def to_native(val):
-    """Helper to convert DynamoDB Decimals to int/float for JSON serialization"""
-    if isinstance(val, Decimal):
-        return int(val) if val % 1 == 0 else float(val)
-    return val
\ No newline at end of file
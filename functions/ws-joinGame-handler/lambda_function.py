@@ -4,6 +4,8 @@ import boto3
 import os
 from datetime import datetime, timezone
 
+from nba_shared.subscribers import bump_generation
+
 # Initialize DynamoDB resource outside the handler for connection reuse
 dynamodb = boto3.resource('dynamodb')
 TABLE_NAME = os.environ.get('CONNECTIONS_TABLE')
@@ -26,14 +28,20 @@ def handler(event, context):
     # Write to DynamoDB
     table = dynamodb.Table(TABLE_NAME)
     
-    table.put_item(
+    previous = table.put_item(
         Item={
             'connectionId': connection_id,
             'gameId': game_id,
             'connectedAt': connected_at,
             'expiresAt': expires_at
-        }
-    )
+        },
+        ReturnValues='ALL_OLD'
+    ).get('Attributes', {})
+
+    # Invalidate cached subscriber lists for the game joined (and the one left, when switching)
+    bump_generation(table, game_id)
+    if previous.get('gameId') not in (None, game_id):
+        bump_generation(table, previous['gameId'])
 
     return {
         'statusCode': 200
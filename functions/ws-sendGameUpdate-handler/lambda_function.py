@@ -1,80 +1,283 @@
-import json
+import gzip
+import itertools
 import os
 import re
+import time
 import urllib.parse
 import boto3
-from boto3.dynamodb.conditions import Key
 from botocore.exceptions import ClientError
 
+from nba_shared import jsoncodec
+from nba_shared.fanout import GONE, FanOutStats, fan_out
+from nba_shared.metrics import Metrics
+from nba_shared.subscribers import SubscriberCache
+
 # Initialize Clients
 dynamodb = boto3.resource('dynamodb')
+# Only read for patch metadata; built on first use (get_s3_client)
+s3_client = None
 CONN_TABLE_NAME = os.environ.get('CONN_TABLE')
 WS_API_ENDPOINT = os.environ.get('WS_API_ENDPOINT')
 
-# API Gateway Client
-apigw_client = boto3.client('apigatewaymanagementapi', endpoint_url=WS_API_ENDPOINT)
+# Patches up to this size (encoded) ride inside the WebSocket message; larger ones
+# are referenced by key. API Gateway caps a message at 128 KB.
+INLINE_PATCH_MAX_BYTES = int(os.environ.get('INLINE_PATCH_MAX_BYTES', '32768'))
+
+# Optional: hold a game's broadcast open this long to absorb writes landing in
+# later invocations (0 = off; records within one invocation are always combined)
+DEBOUNCE_MS = int(os.environ.get('DEBOUNCE_MS', '0'))
+DEBOUNCE_MARKER_PREFIX = '#debounce#'
+
+# Service name on the EMF metric records (nba_shared.metrics; METRICS_ENABLED=1 turns them on)
+METRICS_SERVICE = 'SendGameUpdate'
+
+# Regex to match relevant S3 keys
+BOX_PATTERN = re.compile(r"^data/boxData/(.+?)\.json")
+PBP_PROCESSED_PATTERN = re.compile(r"^data/processed-data/playByPlayData/(.+?)\.json")
+
+# API Gateway Client, built on first use so cold starts with nothing to send skip it
+apigw_client = None
+
+def get_apigw_client():
+    global apigw_client
+    if apigw_client is None:
+        apigw_client = boto3.client('apigatewaymanagementapi', endpoint_url=WS_API_ENDPOINT)
+    return apigw_client
+
+def get_s3_client():
+    global s3_client
+    if s3_client is None:
+        s3_client = boto3.client('s3')
+    return s3_client
+
+# Subscriber lists survive across invocations in a warm container (see nba_shared.subscribers)
+subscriber_cache = None
+
+def get_subscriber_cache():
+    global subscriber_cache
+    if subscriber_cache is None:
+        subscriber_cache = SubscriberCache(dynamodb.Table(CONN_TABLE_NAME), "gameId-index", "gameId")
+    return subscriber_cache
 
 def handler(event, context):
-    # Regex to match relevant S3 keys. Note: the S3 event key is URL-encoded.
-    box_pattern = re.compile(r"^data/boxData/(.+?)\.json")
-    pbp_processed_pattern = re.compile(r"^data/processed-data/playByPlayData/(.+?)\.json")
-
-    for record in event.get('Records', []):
-        s3_object = record.get('s3', {}).get('object', {})
-        key = urllib.parse.unquote_plus(s3_object.get('key', ''))
-        raw_etag = s3_object.get('eTag', '')
-        
+    stats = FanOutStats()
+    metrics = Metrics(METRICS_SERVICE)
+
+    # One message per game, however many of its objects changed in this batch
+    games = 0
+    with metrics.timer('invocation'):
+        for game_id, updates in group_updates(event.get('Records', [])).items():
+            if DEBOUNCE_MS > 0:
+                updates = debounce(game_id, updates)
+                if not updates:
+                    continue
+            games += 1
+            broadcast(game_id, updates, stats, metrics)
+
+    print(f"Fan-out summary: {stats.summary()}")
+    metrics.put('games', games)
+    stats.put_metrics(metrics)
+    metrics.flush()
+    return {'statusCode': 200}
+
+def parse_record(record):
+    """Returns (game_id, update) for a relevant S3 record, else None."""
+    # Note: the S3 event key is URL-encoded.
+    s3_object = record.get('s3', {}).get('object', {})
+    key = urllib.parse.unquote_plus(s3_object.get('key', ''))
+    raw_etag = s3_object.get('eTag', '')
+
+    # Determine which kind of update this is.
+    # - Box score: keep legacy location `data/boxData/...`
+    # - Play-by-play: ONLY notify for the processed slim payload under `data/processed-data/...`
+    match = PBP_PROCESSED_PATTERN.match(key) or BOX_PATTERN.match(key)
+    if not match:
+        return None
+
+    return match.group(1), {
+        'key': key,
         # Clean eTag (remove quotes)
-        version = raw_etag.replace('"', '')
-
-        # Determine which kind of update this is.
-        # - Box score: keep legacy location `data/boxData/...`
-        # - Play-by-play: ONLY notify for the processed slim payload under `data/processed-data/...`
-        match = pbp_processed_pattern.match(key)
-        if match:
-            game_id = match.group(1)
-        else:
-            match = box_pattern.match(key)
-            if not match:
-                continue
-            game_id = match.group(1)
-
-        # Find all subscribers for this game
-        table = dynamodb.Table(CONN_TABLE_NAME)
-        try:
-            response = table.query(
-                IndexName="gameId-index",
-                KeyConditionExpression=Key('gameId').eq(game_id)
-            )
-        except ClientError as e:
-            print(f"Error querying subscribers for game {game_id}: {e}")
+        'version': raw_etag.replace('"', ''),
+        'bucket': record.get('s3', {}).get('bucket', {}).get('name'),
+        'sequencer': s3_object.get('sequencer', ''),
+    }
+
+def group_updates(records):
+    """
+    Groups records by gameId, keeping only the newest event per key
+    (S3 sequencers are hex strings that order writes to the same key).
+    """
+    groups = {}
+    for record in records:
+        parsed = parse_record(record)
+        if parsed is None:
             continue
+        game_id, update = parsed
+        by_key = groups.setdefault(game_id, {})
+        current = by_key.get(update['key'])
+        if current is None or _sequencer_order(update) >= _sequencer_order(current):
+            by_key[update['key']] = update
+    return {game_id: list(by_key.values()) for game_id, by_key in groups.items()}
 
-        connections = response.get('Items', [])
-
-        # Broadcast key + version to every subscriber
-        payload = json.dumps({
-            "gameId": game_id,
-            "key": key,
-            "version": version
-        })
-
-        for item in connections:
-            connection_id = item['connectionId']
-            try:
-                apigw_client.post_to_connection(
-                    ConnectionId=connection_id,
-                    Data=payload
-                )
-            except apigw_client.exceptions.GoneException:
-                # 410 Gone: The connection is no longer valid. Delete it.
-                try:
-                    table.delete_item(
-                        Key={'connectionId': connection_id}
-                    )
-                except ClientError as e:
-                    print(f"Failed to delete stale connection {connection_id}: {e}")
-            except Exception as e:
-                print(f"Failed to send update to {connection_id}: {e}")
+def _sequencer_order(update):
+    sequencer = update.get('sequencer') or ''
+    return (len(sequencer), sequencer)
 
-    return {'statusCode': 200}
+def _conditional_update(table, **kwargs):
+    """True if the update applied, False if its condition failed."""
+    try:
+        table.update_item(**kwargs)
+        return True
+    except ClientError as e:
+        if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+            raise
+        return False
+
+def debounce(game_id, updates):
+    """
+    Optional cross-invocation debounce (DEBOUNCE_MS > 0). The first invocation for a
+    game opens a window with a marker item and sleeps; invocations landing inside the
+    window only record their keys on the marker and return. When the window closes
+    the owner deletes the marker and broadcasts everything recorded on it.
+    Opening is conditional on there being no open window, so of two invocations that
+    both found none, one owns it and the other joins it.
+    Returns the updates this invocation should send (empty if another owns the window).
+    """
+    table = get_subscriber_cache().table
+    marker = {'connectionId': f'{DEBOUNCE_MARKER_PREFIX}{game_id}'}
+    keys = {u['key'] for u in updates}
+
+    try:
+        # Two rounds: if another invocation opens the window between our join and
+        # open attempts, the second join lands in it.
+        for _ in range(2):
+            now_ms = int(time.time() * 1000)
+            if _conditional_update(
+                table,
+                Key=marker,
+                UpdateExpression='ADD pending :keys',
+                ConditionExpression='windowEndsAt > :now',
+                ExpressionAttributeValues={':keys': keys, ':now': now_ms},
+            ):
+                return []
+            # No open window: open one. Pending keys left by a late joiner are kept.
+            if _conditional_update(
+                table,
+                Key=marker,
+                UpdateExpression='SET windowEndsAt = :end, expiresAt = :exp',
+                ConditionExpression='attribute_not_exists(windowEndsAt) OR windowEndsAt <= :now',
+                ExpressionAttributeValues={
+                    ':end': now_ms + DEBOUNCE_MS,
+                    ':exp': int(time.time()) + 3600,
+                    ':now': now_ms,
+                },
+            ):
+                break
+        else:
+            return updates
+        time.sleep(DEBOUNCE_MS / 1000.0)
+        closed = table.delete_item(Key=marker, ReturnValues='ALL_OLD').get('Attributes', {})
+    except ClientError as e:
+        print(f"Debounce marker error for {game_id}: {e}")
+        return updates
+
+    pending = closed.get('pending') or set()
+    bucket = next((u['bucket'] for u in updates if u.get('bucket')), None)
+    known = {u['key']: u for u in updates}
+    for key in sorted(pending):
+        if not bucket:
+            break
+        # Re-read the current version: the object may have been rewritten in the window
+        update = known.get(key)
+        if update is None:
+            update = {'key': key, 'bucket': bucket}
+            updates.append(update)
+        update['version'] = None
+    return updates
+
+def broadcast(game_id, updates, stats, metrics=None):
+    metrics = metrics or Metrics(METRICS_SERVICE, enabled=False)
+
+    # Stream all subscribers for this game (every page, or the cached list)
+    cache = get_subscriber_cache()
+    with metrics.timer('subscriberLookup'):
+        connections = cache.subscribers(game_id)
+        first = next(connections, None)
+    if first is None:
+        return
+
+    # Key + version of every changed object, plus the delta when the poller published one.
+    # Inline patches share one budget so the combined message stays small.
+    entries = []
+    inline_budget = INLINE_PATCH_MAX_BYTES
+    for update in updates:
+        entry = {'key': update['key'], 'version': update.get('version')}
+        if update.get('bucket'):
+            with metrics.timer('patchFields'):
+                fields = get_patch_fields(update['bucket'], update['key'], inline_max=inline_budget)
+            if entry['version'] is None:
+                entry['version'] = fields.pop('etag', None)
+            fields.pop('etag', None)
+            if 'patch' in fields:
+                inline_budget -= len(jsoncodec.dumps(fields['patch']))
+            entry.update(fields)
+        entries.append(entry)
+
+    # A single change keeps the original flat message shape
+    if len(entries) == 1:
+        message = {"gameId": game_id, **entries[0]}
+    else:
+        message = {"gameId": game_id, "updates": entries}
+    payload = jsoncodec.dumps(message)
+    metrics.put('messageBytes', len(payload), 'Bytes')
+
+    gone_before = stats.counts[GONE]
+    with metrics.timer('fanOut'):
+        fan_out(
+            apigw_client=get_apigw_client(),
+            connection_ids=itertools.chain([first], connections),
+            payload=payload,
+            conn_table=cache.table,
+            subscription=game_id,
+            stats=stats,
+        )
+    if stats.counts[GONE] > gone_before:
+        cache.invalidate(game_id)
+
+def get_patch_fields(bucket, key, inline_max=None):
+    """
+    Reads the patch metadata the poller attached to the object. Returns the extra
+    message fields: contentVersion, and either the patch inline (up to `inline_max`
+    bytes) or its key. Also returns the object's current `etag`.
+    """
+    inline_max = INLINE_PATCH_MAX_BYTES if inline_max is None else inline_max
+    try:
+        head = get_s3_client().head_object(Bucket=bucket, Key=key)
+    except ClientError as e:
+        print(f"Error reading metadata for {key}: {e}")
+        return {}
+
+    metadata = head.get('Metadata') or {}
+    fields = {'etag': head.get('ETag', '').replace('"', '')}
+    if metadata.get('content-sha256'):
+        fields['contentVersion'] = metadata['content-sha256']
+
+    patch_key = metadata.get('patch-key')
+    if not patch_key:
+        return fields
+    fields['baseVersion'] = metadata.get('patch-base-sha256')
+
+    try:
+        body = get_s3_client().get_object(Bucket=bucket, Key=patch_key)['Body'].read()
+        if body.startswith(b"\x1f\x8b"):
+            body = gzip.decompress(body)
+    except ClientError as e:
+        print(f"Error reading patch {patch_key}: {e}")
+        fields['patchKey'] = patch_key
+        return fields
+
+    if len(body) <= inline_max:
+        fields['patch'] = jsoncodec.loads(body)
+    else:
+        fields['patchKey'] = patch_key
+    return fields
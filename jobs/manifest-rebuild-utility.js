@@ -6,11 +6,12 @@ import {
   S3Client,
   PutObjectCommand
 } from "@aws-sdk/client-s3";
+import { indexKey, shardForGameId, shardKey } from "./manifest.js";
 
 const REGION      = "us-east-1";
 const DDB_TABLE   = "NBA_Games";
 const BUCKET      = "roryeagan.com-nba-processed-data";
-const MANIFEST_KEY = "data/manifest.json";
+const PREFIX      = "data/";
 
 const ddb = new DynamoDBClient({ region: REGION });
 const s3  = new S3Client({ region: REGION });
@@ -48,16 +49,31 @@ async function fetchAllFinalGameIds() {
   return finalIds;
 }
 
-// 2) Serialize and upload to S3
-async function writeManifest(ids) {
-  const body = JSON.stringify(ids);
+async function putJson(key, doc) {
   await s3.send(new PutObjectCommand({
     Bucket:      BUCKET,
-    Key:         MANIFEST_KEY,
-    Body:        body,
+    Key:         key,
+    Body:        JSON.stringify(doc),
     ContentType: "application/json"
   }));
-  console.log(`Wrote ${ids.length} IDs to s3://${BUCKET}/${MANIFEST_KEY}`);
+}
+
+// 2) Serialize and upload to S3: one shard per season, then the root index
+async function writeManifest(ids) {
+  const bySeason = new Map();
+  for (const id of ids) {
+    const shard = shardForGameId(id);
+    if (!bySeason.has(shard)) bySeason.set(shard, []);
+    bySeason.get(shard).push(id);
+  }
+
+  const shards = {};
+  for (const [shard, shardIds] of bySeason) {
+    shards[shard] = shardKey(PREFIX, shard);
+    await putJson(shards[shard], shardIds);
+  }
+  await putJson(indexKey(PREFIX), { schemaVersion: 1, shards });
+  console.log(`Wrote ${ids.length} IDs in ${bySeason.size} shards to s3://${BUCKET}/${indexKey(PREFIX)}`);
 }
 
 (async () => {
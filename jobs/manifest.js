@@ -0,0 +1,101 @@
+import { GetObjectCommand, PutObjectCommand } from "@aws-sdk/client-s3";
+
+// Manifest of final game IDs, partitioned by season (mirrors
+// functions/nba-game-poller/nba_game_poller/storage.py):
+//   manifest/index.json      {"schemaVersion": 1, "shards": {"2024-25": "data/manifest/2024-25.json", ...}}
+//   manifest/<season>.json   ["0022400001", ...]
+const SCHEMA_VERSION = 1;
+const MAX_ATTEMPTS = 5;
+
+export function shardForGameId(gameId) {
+  const yy = typeof gameId === 'string' ? gameId.slice(3, 5) : '';
+  if (!/^\d\d$/.test(yy)) return 'other';
+  const year = 2000 + Number(yy);
+  return `${year}-${String((year + 1) % 100).padStart(2, '0')}`;
+}
+
+export const indexKey = (prefix) => `${prefix}manifest/index.json`;
+export const shardKey = (prefix, shard) => `${prefix}manifest/${shard}.json`;
+
+async function readJson(s3, bucket, key) {
+  try {
+    const res = await s3.send(new GetObjectCommand({ Bucket: bucket, Key: key }));
+    return { doc: JSON.parse(await res.Body.transformToString()), etag: res.ETag };
+  } catch (err) {
+    if (err.$metadata?.httpStatusCode === 404) return { doc: null, etag: null };
+    throw err;
+  }
+}
+
+/**
+ * Conditional read-modify-write: the PUT only lands if nobody wrote the object
+ * since we read it (If-Match), or created it (If-None-Match), retrying otherwise.
+ * `mutate(doc)` returns the new document, or null when nothing needs writing.
+ */
+export async function conditionalUpdate(s3, bucket, key, mutate, empty) {
+  for (let attempt = 0; attempt < MAX_ATTEMPTS; attempt += 1) {
+    const { doc, etag } = await readJson(s3, bucket, key);
+    const updated = mutate(doc ?? empty());
+    if (updated === null) return false;
+    try {
+      await s3.send(new PutObjectCommand({
+        Bucket:      bucket,
+        Key:         key,
+        Body:        JSON.stringify(updated),
+        ContentType: 'application/json',
+        ...(etag ? { IfMatch: etag } : { IfNoneMatch: '*' }),
+      }));
+      return true;
+    } catch (err) {
+      const status = err.$metadata?.httpStatusCode;
+      if (status !== 412 && status !== 409) throw err;
+      await new Promise((r) => setTimeout(r, (50 + Math.random() * 150) * (attempt + 1)));
+    }
+  }
+  throw new Error(`Gave up updating ${key} after ${MAX_ATTEMPTS} conflicting writes`);
+}
+
+/**
+ * Adds game IDs to their season shards and registers any new shards in the index
+ */
+export async function addToManifest(s3, bucket, prefix, gameIds) {
+  const bySeason = new Map();
+  for (const id of gameIds) {
+    const shard = shardForGameId(id);
+    if (!bySeason.has(shard)) bySeason.set(shard, []);
+    bySeason.get(shard).push(id);
+  }
+
+  for (const [shard, ids] of bySeason) {
+    await conditionalUpdate(s3, bucket, shardKey(prefix, shard), (current) => {
+      const missing = ids.filter((id) => !current.includes(id));
+      return missing.length ? [...current, ...missing] : null;
+    }, () => []);
+  }
+
+  await conditionalUpdate(s3, bucket, indexKey(prefix), (index) => {
+    const shards = { ...(index.shards || {}) };
+    let changed = false;
+    for (const shard of bySeason.keys()) {
+      if (shards[shard] !== shardKey(prefix, shard)) {
+        shards[shard] = shardKey(prefix, shard);
+        changed = true;
+      }
+    }
+    return changed ? { schemaVersion: SCHEMA_VERSION, shards } : null;
+  }, () => ({}));
+}
+
+/**
+ * Every final game ID, or only those in `seasons` when given
+ */
+export async function loadManifestIds(s3, bucket, prefix, seasons = null) {
+  const { doc: index } = await readJson(s3, bucket, indexKey(prefix));
+  const ids = new Set();
+  for (const [shard, key] of Object.entries(index?.shards || {})) {
+    if (seasons && !seasons.includes(shard)) continue;
+    const { doc } = await readJson(s3, bucket, key);
+    for (const id of doc || []) ids.add(id);
+  }
+  return ids;
+}
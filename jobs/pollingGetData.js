@@ -10,13 +10,14 @@ import {
   QueryCommand,
   ScanCommand,
 } from "@aws-sdk/lib-dynamodb";
-import { S3Client, GetObjectCommand, PutObjectCommand } from "@aws-sdk/client-s3";
+import { S3Client, PutObjectCommand } from "@aws-sdk/client-s3";
+
+import { addToManifest, loadManifestIds } from './manifest.js';
 
 const gzipAsync = promisify(gzip);
 const REGION       = 'us-east-1';
 const BUCKET       = 'roryeagan.com-nba-processed-data';
 const PREFIX       = 'data/';
-const MANIFEST_KEY = `${PREFIX}manifest.json`;
 
 const DDB_TABLE = 'NBA_Games';
 const DDB_GSI   = 'ByDate';
@@ -24,38 +25,16 @@ const ddbClient = new DynamoDBClient({ region: REGION });
 const ddb       = DynamoDBDocumentClient.from(ddbClient);
 const s3        = new S3Client({ region: REGION });
 
-// Utility to convert stream to string
-async function streamToString(stream) {
-  const chunks = [];
-  for await (const chunk of stream) chunks.push(chunk);
-  return Buffer.concat(chunks).toString('utf-8');
-}
-
 // --- Manifest Cache ---
 let manifestSet = null;
 async function loadManifest() {
   if (manifestSet) return manifestSet;
-  try {
-    const res  = await s3.send(new GetObjectCommand({ Bucket: BUCKET, Key: MANIFEST_KEY }));
-    const text = await streamToString(res.Body);
-    manifestSet = new Set(JSON.parse(text));
-  } catch (err) {
-    if (err.$metadata?.httpStatusCode === 404) {
-      manifestSet = new Set();
-    } else {
-      throw err;
-    }
-  }
+  manifestSet = await loadManifestIds(s3, BUCKET, PREFIX);
   return manifestSet;
 }
-async function uploadManifest() {
-  const arr = Array.from(manifestSet);
-  await s3.send(new PutObjectCommand({
-    Bucket:      BUCKET,
-    Key:         MANIFEST_KEY,
-    Body:        JSON.stringify(arr),
-    ContentType: 'application/json',
-  }));
+async function uploadManifest(gameIds) {
+  gameIds.forEach((id) => manifestSet?.add(id));
+  await addToManifest(s3, BUCKET, PREFIX, gameIds);
 }
 
 // --- Deduplicate & upload payloads ---
@@ -152,6 +131,7 @@ async function recoverStuckGames() {
 
   if (!stuck.length) return;
   console.log(`Recovering ${stuck.length} stuck games…`);
+  const recovered = [];
   for (const gameId of stuck) {
     try {
       const urls = {
@@ -181,13 +161,13 @@ async function recoverStuckGames() {
         box     && uploadJsonToS3(`boxData/${gameId}.json`, box, true),
         box     && putGameToDDB(box)
       ]);
-      manifestSet.add(gameId);
+      recovered.push(gameId);
       console.log(`Recovered ${gameId}`);
     } catch (e) {
       console.error(`Failed to recover ${gameId}:`, e);
     }
   }
-  await uploadManifest();
+  await uploadManifest(recovered);
 }
 
 // Map to store ETags for conditional GET
@@ -228,8 +208,7 @@ function startPollingGame(gameId) {
         ]);
       }
       if (last?.description?.trim().startsWith('Game End') && box?.gameStatusText?.trim().startsWith('Final')) {
-        manifestSet.add(gameId);
-        await uploadManifest();
+        await uploadManifest([gameId]);
         console.log(`✅ Polling complete for ${gameId}`);
         return;
       }
@@ -12,7 +12,7 @@ resource "aws_dynamodb_table" "nba_games" {
   range_key      = "SK"
 
   stream_enabled   = true
-  stream_view_type = "NEW_IMAGE"
+  stream_view_type = "NEW_AND_OLD_IMAGES" # gameDateUpdates diffs old vs new
 
   attribute {
     name = "PK"
@@ -48,10 +48,9 @@ resource "aws_dynamodb_table" "nba_games" {
 # 2. GameConnections Table (WebSocket Sessions)
 resource "aws_dynamodb_table" "game_connections" {
   name         = "GameConnections"
-  # billing_mode = "PAY_PER_REQUEST"
-  billing_mode   = "PROVISIONED" 
-  read_capacity  = 1
-  write_capacity = 1
+  # On demand: every join/disconnect also bumps a #subscribers# marker and every
+  # fan-out reads one consistently, which 1 WCU / 1 RCU can't absorb at tip-off.
+  billing_mode = "PAY_PER_REQUEST"
   hash_key     = "connectionId"
 
   attribute {
@@ -68,19 +67,24 @@ resource "aws_dynamodb_table" "game_connections" {
   global_secondary_index {
     name            = "gameId-index"
     hash_key        = "gameId"
-    write_capacity  = 1
-    read_capacity   = 1
     projection_type = "ALL"
   }
+
+  # Connections carry expiresAt (set on join), as do the #subscribers# markers
+  # (nba_shared/subscribers.py) that track each subscription's generation and
+  # the #debounce# window markers of ws-sendGameUpdate.
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
 }
 
 # TABLE 3: DateConnections (WebSocket Sessions for Schedule/Dates)
 resource "aws_dynamodb_table" "date_connections" {
   name         = "DateConnections"
-  # billing_mode = "PAY_PER_REQUEST"
-  billing_mode   = "PROVISIONED" 
-  read_capacity  = 1
-  write_capacity = 1
+  # On demand: every join/disconnect also bumps a #subscribers# marker and every
+  # fan-out reads one consistently, which 1 WCU / 1 RCU can't absorb at tip-off.
+  billing_mode = "PAY_PER_REQUEST"
   hash_key     = "connectionId"
 
   attribute {
@@ -96,8 +100,49 @@ resource "aws_dynamodb_table" "date_connections" {
   global_secondary_index {
     name            = "date-index"
     hash_key        = "dateString"
-    write_capacity  = 1
-    read_capacity   = 1
     projection_type = "ALL"
   }
-}
\ No newline at end of file
+
+  # Connections carry expiresAt (set on join), as do the #subscribers# markers
+  # (nba_shared/subscribers.py) that track each subscription's generation.
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
+}
+# TABLE 4: NBA_PollerState (poller bookkeeping: ETags, scoreboard fingerprint, last poll)
+# Kept off NBA_Games so ETag-only changes don't use its 1 WCU or fire its stream.
+resource "aws_dynamodb_table" "poller_state" {
+  name         = "NBA_PollerState"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "gameId"
+
+  attribute {
+    name = "gameId"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
+}
+
+# TABLE 5: NBA_Scoreboards (per-date scoreboard items, nba_shared/scoreboard.py)
+# Rewritten on every NBA_Games stream batch, so those multi-KB writes get their
+# own on-demand table instead of sharing the connection tables the fan-outs query.
+resource "aws_dynamodb_table" "scoreboards" {
+  name         = "NBA_Scoreboards"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "date"
+
+  attribute {
+    name = "date"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expiresAt"
+    enabled        = true
+  }
+}
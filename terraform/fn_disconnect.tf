@@ -38,7 +38,8 @@ resource "aws_iam_role_policy" "ws_disconnect_dynamo" {
       {
         Effect = "Allow"
         Action = [
-          "dynamodb:DeleteItem"
+          "dynamodb:DeleteItem",
+          "dynamodb:UpdateItem" # Bumps the subscriber generation marker
         ]
         # This function needs to delete from BOTH connection tables
         Resource = [
@@ -69,6 +70,7 @@ resource "aws_lambda_function" "ws_disconnect" {
 
   filename         = data.archive_file.zip_ws_disconnect.output_path
   source_code_hash = data.archive_file.zip_ws_disconnect.output_base64sha256
+  layers           = [aws_lambda_layer_version.nba_shared.arn]
 
   environment {
     variables = {
@@ -58,6 +58,12 @@ resource "aws_iam_role_policy" "nba_poller_policy" {
             "${aws_dynamodb_table.nba_games.arn}/index/*"
         ]
       },
+      {
+        Sid      = "DynamoDbPollerState"
+        Action   = ["dynamodb:BatchGetItem", "dynamodb:BatchWriteItem"]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.poller_state.arn
+      },
       # 3. S3 Access
       {
         Sid      = "S3ReadWriteOnlyDataPrefix"
@@ -65,6 +71,17 @@ resource "aws_iam_role_policy" "nba_poller_policy" {
         Effect   = "Allow"
         Resource = "arn:aws:s3:::roryeagan.com-nba-processed-data/data/*"
       },
+      {
+        # Lets a GET on a missing key under data/ answer 404 instead of 403, which
+        # the conditional manifest writes and snapshot loads read as "not there yet".
+        Sid       = "S3ListOnlyDataPrefix"
+        Action    = "s3:ListBucket"
+        Effect    = "Allow"
+        Resource  = "arn:aws:s3:::roryeagan.com-nba-processed-data"
+        Condition = {
+          StringLike = { "s3:prefix" = ["data/*"] }
+        }
+      },
       # 4. EventBridge Rule Control
       {
         Sid      = "EventBridgeTogglePollerRule"
@@ -123,6 +140,7 @@ resource "aws_lambda_function" "nba_poller" {
   
   filename         = data.archive_file.zip_nba_poller.output_path
   source_code_hash = data.archive_file.zip_nba_poller.output_base64sha256
+  layers           = [aws_lambda_layer_version.nba_shared.arn]
 
   environment {
     variables = {
@@ -132,6 +150,21 @@ resource "aws_lambda_function" "nba_poller" {
       DDB_TABLE        = aws_dynamodb_table.nba_games.name
       POLLER_RULE_NAME = aws_cloudwatch_event_rule.nba_poller_rule.name
       DDB_GSI          = "ByDate" 
+      POLLER_STATE_TABLE = aws_dynamodb_table.poller_state.name
+      POLLER_MAX_WORKERS = "6"
+      POLLER_HOST_RPS    = "4"
+      POLLER_SCOREBOARD_FIRST  = "1"
+      POLLER_FORCE_REFRESH_SEC = "180"
+      # Per-game cadence loop; keep POLLER_LOOP_SEC under the 1-minute rule and the timeout
+      POLLER_INNER_LOOP              = "1"
+      POLLER_LOOP_SEC                = "50"
+      POLLER_REQUEST_BUDGET_PER_GAME = "2"
+      # Processed play-by-play layout; "2" (columnar) once clients decode it everywhere
+      PBP_SCHEMA_VERSION = "1"
+      # zstd siblings ("gzip,zstd" + ZSTD_DICT_KEY) need a python3.14 runtime
+      PAYLOAD_CODECS     = "gzip"
+      # Per-stage EMF metrics in the NBA namespace (nba_shared.metrics)
+      METRICS_ENABLED    = "1"
     }
   }
 }
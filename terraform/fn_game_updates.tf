@@ -53,8 +53,20 @@ resource "aws_iam_role_policy" "game_date_updates_dynamo_data" {
       {
         # Permission to delete stale connections
         Effect   = "Allow"
-        Action   = ["dynamodb:DeleteItem"]
+        Action   = ["dynamodb:DeleteItem", "dynamodb:BatchWriteItem"]
         Resource = aws_dynamodb_table.date_connections.arn
+      },
+      {
+        # Bumps the subscriber generation after deleting stale connections
+        Effect   = "Allow"
+        Action   = ["dynamodb:UpdateItem"]
+        Resource = aws_dynamodb_table.date_connections.arn
+      },
+      {
+        # Per-date scoreboard items (nba_shared.scoreboard)
+        Effect   = "Allow"
+        Action   = ["dynamodb:GetItem", "dynamodb:PutItem", "dynamodb:UpdateItem"]
+        Resource = aws_dynamodb_table.scoreboards.arn
       }
     ]
   })
@@ -120,6 +132,7 @@ resource "aws_lambda_function" "game_date_updates" {
 
   filename         = data.archive_file.zip_game_date_updates.output_path
   source_code_hash = data.archive_file.zip_game_date_updates.output_base64sha256
+  layers           = [aws_lambda_layer_version.nba_shared.arn]
 
   environment {
     variables = {
@@ -127,7 +140,11 @@ resource "aws_lambda_function" "game_date_updates" {
       DATE_INDEX_NAME = "date-index"
       GAMES_GSI       = "ByDate"
       GAMES_TABLE     = aws_dynamodb_table.nba_games.name
-      
+      SCOREBOARD_TABLE = aws_dynamodb_table.scoreboards.name
+      FANOUT_MAX_WORKERS = "16"
+      SUBSCRIBER_CACHE_TTL_SEC = "30"
+      METRICS_ENABLED          = "1"
+
       WS_API_ENDPOINT = "${replace(aws_apigatewayv2_api.websocket_api.api_endpoint, "wss://", "https://")}/production"
     }
   }
@@ -40,10 +40,20 @@ resource "aws_iam_role_policy" "ws_join_date_dynamo" {
         # Permission to register the user in DateConnections
         Effect = "Allow"
         Action = [
-          "dynamodb:PutItem"
+          "dynamodb:PutItem",
+          "dynamodb:UpdateItem" # Bumps the subscriber generation marker
         ]
         Resource = aws_dynamodb_table.date_connections.arn
       },
+      {
+        # Reads the per-date scoreboard, and seeds it on a miss
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem"
+        ]
+        Resource = aws_dynamodb_table.scoreboards.arn
+      },
       {
         # Permission to look up games in NBA_Games using the ByDate index
         Effect = "Allow"
@@ -97,12 +107,15 @@ resource "aws_lambda_function" "ws_join_date" {
 
   filename         = data.archive_file.zip_ws_join_date.output_path
   source_code_hash = data.archive_file.zip_ws_join_date.output_base64sha256
+  layers           = [aws_lambda_layer_version.nba_shared.arn]
 
   environment {
     variables = {
       DATE_CONN_TABLE = aws_dynamodb_table.date_connections.name
       GAMES_TABLE     = aws_dynamodb_table.nba_games.name
       GAMES_GSI       = "ByDate"
+      SCOREBOARD_TABLE = aws_dynamodb_table.scoreboards.name
+      SCOREBOARD_CACHE_TTL_SEC = "5"
       WS_API_ENDPOINT = "${replace(aws_apigatewayv2_api.websocket_api.api_endpoint, "wss://", "https://")}/production"
     }
   }
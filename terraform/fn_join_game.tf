@@ -39,7 +39,8 @@ resource "aws_iam_role_policy" "ws_join_game_dynamo" {
       {
         Effect = "Allow"
         Action = [
-          "dynamodb:PutItem"
+          "dynamodb:PutItem",
+          "dynamodb:UpdateItem" # Bumps the subscriber generation marker
         ]
         Resource = aws_dynamodb_table.game_connections.arn
       }
@@ -67,6 +68,7 @@ resource "aws_lambda_function" "ws_join_game" {
 
   filename         = data.archive_file.zip_ws_join_game.output_path
   source_code_hash = data.archive_file.zip_ws_join_game.output_base64sha256
+  layers           = [aws_lambda_layer_version.nba_shared.arn]
 
   environment {
     variables = {
@@ -39,9 +39,10 @@ resource "aws_iam_role_policy" "ws_send_update_dynamo" {
       {
         Effect = "Allow"
         Action = [
-          "dynamodb:Query"
+          "dynamodb:Query",
+          "dynamodb:GetItem"
         ]
-        # Must allow access specifically to the Index used in the Python code
+        # GetItem reads the subscriber generation marker; Query must allow access specifically to the Index used in the Python code
         Resource = [
           aws_dynamodb_table.game_connections.arn,
           "${aws_dynamodb_table.game_connections.arn}/index/gameId-index"
@@ -50,7 +51,9 @@ resource "aws_iam_role_policy" "ws_send_update_dynamo" {
       {
         Effect = "Allow"
         Action = [
-          "dynamodb:DeleteItem"
+          "dynamodb:DeleteItem",
+          "dynamodb:BatchWriteItem",
+          "dynamodb:UpdateItem" # Debounce marker (DEBOUNCE_MS)
         ]
         # Deletion happens on the main table
         Resource = aws_dynamodb_table.game_connections.arn
@@ -59,7 +62,24 @@ resource "aws_iam_role_policy" "ws_send_update_dynamo" {
   })
 }
 
-# E. API Gateway Access (Sending messages)
+# E. S3 Read Access (object metadata + published patches)
+resource "aws_iam_role_policy" "ws_send_update_s3" {
+  name = "s3_read_patches"
+  role = aws_iam_role.ws_send_update_role.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["s3:GetObject"]
+        Resource = "${aws_s3_bucket.data_bucket.arn}/data/*"
+      }
+    ]
+  })
+}
+
+# F. API Gateway Access (Sending messages)
 resource "aws_iam_role_policy" "ws_send_update_apigateway" {
   name = "apigateway_manage_connections"
   role = aws_iam_role.ws_send_update_role.id
@@ -97,10 +117,16 @@ resource "aws_lambda_function" "ws_send_update" {
 
   filename         = data.archive_file.zip_ws_send_update.output_path
   source_code_hash = data.archive_file.zip_ws_send_update.output_base64sha256
+  layers           = [aws_lambda_layer_version.nba_shared.arn]
 
   environment {
     variables = {
       CONN_TABLE      = aws_dynamodb_table.game_connections.name
+      INLINE_PATCH_MAX_BYTES = "32768"
+      FANOUT_MAX_WORKERS     = "16"
+      SUBSCRIBER_CACHE_TTL_SEC = "30"
+      DEBOUNCE_MS              = "0"
+      METRICS_ENABLED          = "1"
       WS_API_ENDPOINT = "${replace(aws_apigatewayv2_api.websocket_api.api_endpoint, "wss://", "https://")}/production"
     }
   }
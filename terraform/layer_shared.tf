@@ -0,0 +1,17 @@
+# --- Shared Lambda Layer: nba_shared ---
+# Code used by more than one Lambda (fan-out engine, subscriber lookups, EMF metrics, ...).
+# Lambda mounts layers at /opt, and /opt/python is on the Python path.
+# Optional: orjson pip-installed into the source dir makes nba_shared.jsoncodec use it (see README).
+
+data "archive_file" "zip_shared_layer" {
+  type        = "zip"
+  source_dir  = local.src_shared_layer
+  output_path = "${local.build_dir}/shared-layer.zip"
+}
+
+resource "aws_lambda_layer_version" "nba_shared" {
+  layer_name          = "nba-shared"
+  filename            = data.archive_file.zip_shared_layer.output_path
+  source_code_hash    = data.archive_file.zip_shared_layer.output_base64sha256
+  compatible_runtimes = ["python3.11"]
+}
@@ -6,6 +6,7 @@ locals {
   src_ws_join_game      = "${path.module}/../functions/ws-joinGame-handler"
   src_fetch_scoreboard  = "${path.module}/../functions/FetchTodaysScoreboard"
   src_nba_poller        = "${path.module}/../functions/nba-game-poller"
+  src_shared_layer      = "${path.module}/../functions/shared-layer"
   
   # Where to store temporary build artifacts
   build_dir = "${path.module}/build_artifacts"
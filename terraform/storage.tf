@@ -9,6 +9,24 @@ resource "aws_s3_bucket" "data_bucket" {
   bucket = "roryeagan.com-nba-processed-data"
 }
 
+# Patches are only useful to clients that are a version behind; expire them quickly.
+resource "aws_s3_bucket_lifecycle_configuration" "data_bucket_lifecycle" {
+  bucket = aws_s3_bucket.data_bucket.id
+
+  rule {
+    id     = "expire-patches"
+    status = "Enabled"
+
+    filter {
+      prefix = "data/patches/"
+    }
+
+    expiration {
+      days = 1
+    }
+  }
+}
+
 resource "aws_s3_bucket_notification" "data_bucket_trigger" {
   bucket = aws_s3_bucket.data_bucket.id
 